@@ -0,0 +1,50 @@
+"""Add generated sort-key and keyset-index to table Card
+
+Revision ID: 0b5e3c7a9d21
+Revises: 360628a1fd85
+Create Date: 2026-10-18 09:12:41.204518
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0b5e3c7a9d21"
+down_revision: Union[str, None] = "360628a1fd85"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+GERMAN_SORT_KEY = (
+    "CASE"
+    " WHEN german LIKE 'der %' THEN substr(german, 5)"
+    " WHEN german LIKE 'die %' THEN substr(german, 5)"
+    " WHEN german LIKE 'das %' THEN substr(german, 5)"
+    " ELSE german"
+    " END"
+)
+
+
+def upgrade() -> None:
+    op.add_column(
+        "Card",
+        sa.Column(
+            "german_sort",
+            sa.String(),
+            sa.Computed(GERMAN_SORT_KEY, persisted=True),
+        ),
+    )
+    op.create_index(
+        "ix_card_german_sort_id",
+        "Card",
+        ["german_sort", "id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_card_german_sort_id", table_name="Card")
+    op.drop_column("Card", "german_sort")
@@ -0,0 +1,30 @@
+"""Add index on (id_tag, id_card) to table Card_has_Tag
+
+Revision ID: 4e8b1d6f2a93
+Revises: 9c41e7b2d0f3
+Create Date: 2026-10-18 16:21:08.913274
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "4e8b1d6f2a93"
+down_revision: Union[str, None] = "9c41e7b2d0f3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_card_has_tag_id_tag_id_card",
+        "Card_has_Tag",
+        ["id_tag", "id_card"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_card_has_tag_id_tag_id_card", table_name="Card_has_Tag")
@@ -0,0 +1,94 @@
+"""Add full-text search-index to table Card
+
+Revision ID: 5d2f8a61c4e7
+Revises: 0b5e3c7a9d21
+Create Date: 2026-10-18 14:03:27.518342
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "5d2f8a61c4e7"
+down_revision: Union[str, None] = "0b5e3c7a9d21"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (copy of core.db.tables.card_search at the time of this migration)
+SQLITE_UPGRADE = [
+    """
+    CREATE VIRTUAL TABLE "Card_fts" USING fts5(
+        german,
+        italian,
+        content='Card',
+        content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2',
+        prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER card_fts_after_insert AFTER INSERT ON "Card" BEGIN
+        INSERT INTO "Card_fts" (rowid, german, italian)
+        VALUES (new.id, new.german, new.italian);
+    END
+    """,
+    """
+    CREATE TRIGGER card_fts_after_delete AFTER DELETE ON "Card" BEGIN
+        INSERT INTO "Card_fts" ("Card_fts", rowid, german, italian)
+        VALUES ('delete', old.id, old.german, old.italian);
+    END
+    """,
+    """
+    CREATE TRIGGER card_fts_after_update AFTER UPDATE OF german, italian
+    ON "Card" BEGIN
+        INSERT INTO "Card_fts" ("Card_fts", rowid, german, italian)
+        VALUES ('delete', old.id, old.german, old.italian);
+        INSERT INTO "Card_fts" (rowid, german, italian)
+        VALUES (new.id, new.german, new.italian);
+    END
+    """,
+    # index the existing cards:
+    """INSERT INTO "Card_fts" ("Card_fts") VALUES ('rebuild')""",
+]
+SQLITE_DOWNGRADE = [
+    "DROP TRIGGER card_fts_after_insert",
+    "DROP TRIGGER card_fts_after_delete",
+    "DROP TRIGGER card_fts_after_update",
+    'DROP TABLE "Card_fts"',
+]
+
+POSTGRES_UPGRADE = [
+    """
+    ALTER TABLE "Card" ADD COLUMN search_vector tsvector
+    GENERATED ALWAYS AS (to_tsvector('simple', german || ' ' || italian)) STORED
+    """,
+    'CREATE INDEX ix_card_search_vector ON "Card" USING GIN (search_vector)',
+]
+POSTGRES_DOWNGRADE = [
+    "DROP INDEX ix_card_search_vector",
+    'ALTER TABLE "Card" DROP COLUMN search_vector',
+]
+
+
+def _execute(sqlite_statements: list[str], postgres_statements: list[str]) -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == "sqlite":
+        statements = sqlite_statements
+    elif dialect == "postgresql":
+        statements = postgres_statements
+    else:
+        raise NotImplementedError(f"No search-index for dialect {dialect}.")
+    for statement in statements:
+        op.execute(statement)
+
+
+def upgrade() -> None:
+    _execute(SQLITE_UPGRADE, POSTGRES_UPGRADE)
+
+
+def downgrade() -> None:
+    _execute(SQLITE_DOWNGRADE, POSTGRES_DOWNGRADE)
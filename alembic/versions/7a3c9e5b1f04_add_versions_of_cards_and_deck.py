@@ -0,0 +1,158 @@
+"""Add versions of cards and of the deck for conditional requests
+
+Revision ID: 7a3c9e5b1f04
+Revises: 4e8b1d6f2a93
+Create Date: 2026-10-18 18:02:44.671920
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "7a3c9e5b1f04"
+down_revision: Union[str, None] = "4e8b1d6f2a93"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (copy of core.db.tables.card_versioning at the time of this migration)
+SQLITE_UPGRADE = [
+    """
+    CREATE TRIGGER card_version_after_update
+    AFTER UPDATE OF word_type, id_relevance, german, italian ON "Card" BEGIN
+        UPDATE "Card" SET version = old.version + 1 WHERE id = new.id;
+    END
+    """,
+    """
+    CREATE TRIGGER relevance_card_versions_after_update
+    AFTER UPDATE OF description ON "Relevance" BEGIN
+        UPDATE "Card" SET version = version + 1 WHERE id_relevance = new.id;
+    END
+    """,
+    """
+    CREATE TRIGGER card_deck_version_after_insert
+    AFTER INSERT ON "Card" BEGIN
+        UPDATE "Deck_Version"
+        SET version = version + 1, modified_at = CURRENT_TIMESTAMP
+        WHERE id = 1;
+    END
+    """,
+    """
+    CREATE TRIGGER card_deck_version_after_update
+    AFTER UPDATE ON "Card" BEGIN
+        UPDATE "Deck_Version"
+        SET version = version + 1, modified_at = CURRENT_TIMESTAMP
+        WHERE id = 1;
+    END
+    """,
+    """
+    CREATE TRIGGER card_deck_version_after_delete
+    AFTER DELETE ON "Card" BEGIN
+        UPDATE "Deck_Version"
+        SET version = version + 1, modified_at = CURRENT_TIMESTAMP
+        WHERE id = 1;
+    END
+    """,
+]
+SQLITE_DOWNGRADE = [
+    "DROP TRIGGER card_deck_version_after_delete",
+    "DROP TRIGGER card_deck_version_after_update",
+    "DROP TRIGGER card_deck_version_after_insert",
+    "DROP TRIGGER relevance_card_versions_after_update",
+    "DROP TRIGGER card_version_after_update",
+]
+
+POSTGRES_UPGRADE = [
+    """
+    CREATE OR REPLACE FUNCTION bump_card_version() RETURNS trigger AS $$
+    BEGIN
+        NEW.version := OLD.version + 1;
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER card_version_before_update
+    BEFORE UPDATE OF word_type, id_relevance, german, italian ON "Card"
+    FOR EACH ROW EXECUTE FUNCTION bump_card_version()
+    """,
+    """
+    CREATE OR REPLACE FUNCTION bump_relevance_card_versions() RETURNS trigger AS $$
+    BEGIN
+        UPDATE "Card" SET version = version + 1 WHERE id_relevance = NEW.id;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER relevance_card_versions_after_update
+    AFTER UPDATE OF description ON "Relevance"
+    FOR EACH ROW EXECUTE FUNCTION bump_relevance_card_versions()
+    """,
+    """
+    CREATE OR REPLACE FUNCTION bump_deck_version() RETURNS trigger AS $$
+    BEGIN
+        UPDATE "Deck_Version"
+        SET version = version + 1, modified_at = now()
+        WHERE id = 1;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER card_deck_version_after_change
+    AFTER INSERT OR UPDATE OR DELETE ON "Card"
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_deck_version()
+    """,
+]
+POSTGRES_DOWNGRADE = [
+    'DROP TRIGGER card_deck_version_after_change ON "Card"',
+    "DROP FUNCTION bump_deck_version()",
+    'DROP TRIGGER relevance_card_versions_after_update ON "Relevance"',
+    "DROP FUNCTION bump_relevance_card_versions()",
+    'DROP TRIGGER card_version_before_update ON "Card"',
+    "DROP FUNCTION bump_card_version()",
+]
+
+
+def _execute(sqlite_statements: list[str], postgres_statements: list[str]) -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == "sqlite":
+        statements = sqlite_statements
+    elif dialect == "postgresql":
+        statements = postgres_statements
+    else:
+        raise NotImplementedError(f"No version-triggers for dialect {dialect}.")
+    for statement in statements:
+        op.execute(statement)
+
+
+def upgrade() -> None:
+    op.add_column(
+        "Card",
+        sa.Column("version", sa.Integer(), nullable=False, server_default="1"),
+    )
+    deck_version = op.create_table(
+        "Deck_Version",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("version", sa.Integer(), nullable=False),
+        sa.Column("modified_at", sa.DateTime(timezone=True), nullable=False),
+    )
+    op.execute(
+        deck_version.insert().values(
+            id=1,
+            version=1,
+            modified_at=sa.func.current_timestamp(),
+        )
+    )
+    _execute(SQLITE_UPGRADE, POSTGRES_UPGRADE)
+
+
+def downgrade() -> None:
+    _execute(SQLITE_DOWNGRADE, POSTGRES_DOWNGRADE)
+    op.drop_table("Deck_Version")
+    op.drop_column("Card", "version")
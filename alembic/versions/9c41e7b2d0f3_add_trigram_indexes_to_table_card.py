@@ -0,0 +1,43 @@
+"""Add trigram-indexes for fuzzy lookups to table Card
+
+Revision ID: 9c41e7b2d0f3
+Revises: 5d2f8a61c4e7
+Create Date: 2026-10-18 16:27:55.930418
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "9c41e7b2d0f3"
+down_revision: Union[str, None] = "5d2f8a61c4e7"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Only for Postgres: on SQLite the app keeps a trigram-index in memory.
+POSTGRES_UPGRADE = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    'CREATE INDEX ix_card_german_sort_trgm ON "Card"'
+    " USING GIN (german_sort gin_trgm_ops)",
+    'CREATE INDEX ix_card_italian_trgm ON "Card" USING GIN (italian gin_trgm_ops)',
+]
+POSTGRES_DOWNGRADE = [
+    "DROP INDEX ix_card_italian_trgm",
+    "DROP INDEX ix_card_german_sort_trgm",
+]
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        for statement in POSTGRES_UPGRADE:
+            op.execute(statement)
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        for statement in POSTGRES_DOWNGRADE:
+            op.execute(statement)
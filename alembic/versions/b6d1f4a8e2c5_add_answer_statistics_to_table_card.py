@@ -0,0 +1,104 @@
+"""Add the statistics of the answers to table Card
+
+Revision ID: b6d1f4a8e2c5
+Revises: 7a3c9e5b1f04
+Create Date: 2026-10-18 21:14:06.385127
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b6d1f4a8e2c5"
+down_revision: Union[str, None] = "7a3c9e5b1f04"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# The statistics are written all the time, so from now on only updates of the
+# content of a card bump the version of the deck (copy of
+# core.db.tables.card_versioning at the time of this migration).
+SQLITE_UPGRADE = [
+    "DROP TRIGGER card_deck_version_after_update",
+    """
+    CREATE TRIGGER card_deck_version_after_update
+    AFTER UPDATE OF word_type, id_relevance, german, italian ON "Card" BEGIN
+        UPDATE "Deck_Version"
+        SET version = version + 1, modified_at = CURRENT_TIMESTAMP
+        WHERE id = 1;
+    END
+    """,
+]
+SQLITE_DOWNGRADE = [
+    "DROP TRIGGER card_deck_version_after_update",
+    """
+    CREATE TRIGGER card_deck_version_after_update
+    AFTER UPDATE ON "Card" BEGIN
+        UPDATE "Deck_Version"
+        SET version = version + 1, modified_at = CURRENT_TIMESTAMP
+        WHERE id = 1;
+    END
+    """,
+]
+
+POSTGRES_UPGRADE = [
+    """
+    CREATE OR REPLACE TRIGGER card_deck_version_after_change
+    AFTER INSERT OR UPDATE OF word_type, id_relevance, german, italian OR DELETE
+    ON "Card"
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_deck_version()
+    """,
+]
+POSTGRES_DOWNGRADE = [
+    """
+    CREATE OR REPLACE TRIGGER card_deck_version_after_change
+    AFTER INSERT OR UPDATE OR DELETE ON "Card"
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_deck_version()
+    """,
+]
+
+
+def _execute(sqlite_statements: list[str], postgres_statements: list[str]) -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == "sqlite":
+        statements = sqlite_statements
+    elif dialect == "postgresql":
+        statements = postgres_statements
+    else:
+        raise NotImplementedError(f"No version-triggers for dialect {dialect}.")
+    for statement in statements:
+        op.execute(statement)
+
+
+def upgrade() -> None:
+    op.add_column(
+        "Card",
+        sa.Column("times_played", sa.Integer(), nullable=False, server_default="0"),
+    )
+    op.add_column(
+        "Card",
+        sa.Column("correct_answers", sa.Integer(), nullable=False, server_default="0"),
+    )
+    op.add_column(
+        "Card",
+        sa.Column(
+            "last_answer_correct",
+            sa.Boolean(),
+            nullable=False,
+            server_default=sa.false(),
+        ),
+    )
+    op.add_column("Card", sa.Column("last_played", sa.DateTime(), nullable=True))
+    _execute(SQLITE_UPGRADE, POSTGRES_UPGRADE)
+
+
+def downgrade() -> None:
+    _execute(SQLITE_DOWNGRADE, POSTGRES_DOWNGRADE)
+    op.drop_column("Card", "last_played")
+    op.drop_column("Card", "last_answer_correct")
+    op.drop_column("Card", "correct_answers")
+    op.drop_column("Card", "times_played")
@@ -0,0 +1,87 @@
+"""Bump the versions of cards and deck when cards are tagged or untagged
+
+Revision ID: c9f2a4d7b381
+Revises: e3a7c2f95b18
+Create Date: 2026-10-19 09:12:37.518406
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c9f2a4d7b381"
+down_revision: Union[str, None] = "e3a7c2f95b18"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (copy of core.db.tables.card_versioning at the time of this migration)
+SQLITE_UPGRADE = [
+    f"""
+    CREATE TRIGGER card_has_tag_versions_after_{name}
+    AFTER {name.upper()} ON "Card_has_Tag" BEGIN
+        UPDATE "Card" SET version = version + 1 WHERE id = {row}.id_card;
+        UPDATE "Deck_Version"
+        SET version = version + 1, modified_at = CURRENT_TIMESTAMP
+        WHERE id = 1;
+    END
+    """
+    for name, row in (("insert", "new"), ("delete", "old"))
+]
+SQLITE_DOWNGRADE = [
+    "DROP TRIGGER card_has_tag_versions_after_delete",
+    "DROP TRIGGER card_has_tag_versions_after_insert",
+]
+
+POSTGRES_UPGRADE = [
+    """
+    CREATE OR REPLACE FUNCTION bump_tagged_card_version() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'DELETE' THEN
+            UPDATE "Card" SET version = version + 1 WHERE id = OLD.id_card;
+        ELSE
+            UPDATE "Card" SET version = version + 1 WHERE id = NEW.id_card;
+        END IF;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER card_has_tag_card_version_after_change
+    AFTER INSERT OR DELETE ON "Card_has_Tag"
+    FOR EACH ROW EXECUTE FUNCTION bump_tagged_card_version()
+    """,
+    """
+    CREATE TRIGGER card_has_tag_deck_version_after_change
+    AFTER INSERT OR DELETE ON "Card_has_Tag"
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_deck_version()
+    """,
+]
+POSTGRES_DOWNGRADE = [
+    'DROP TRIGGER card_has_tag_deck_version_after_change ON "Card_has_Tag"',
+    'DROP TRIGGER card_has_tag_card_version_after_change ON "Card_has_Tag"',
+    "DROP FUNCTION bump_tagged_card_version()",
+]
+
+
+def _execute(sqlite_statements: list[str], postgres_statements: list[str]) -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == "sqlite":
+        statements = sqlite_statements
+    elif dialect == "postgresql":
+        statements = postgres_statements
+    else:
+        raise NotImplementedError(f"No version-triggers for dialect {dialect}.")
+    for statement in statements:
+        op.execute(statement)
+
+
+def upgrade() -> None:
+    _execute(SQLITE_UPGRADE, POSTGRES_UPGRADE)
+
+
+def downgrade() -> None:
+    _execute(SQLITE_DOWNGRADE, POSTGRES_DOWNGRADE)
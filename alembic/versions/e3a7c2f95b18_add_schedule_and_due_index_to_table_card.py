@@ -0,0 +1,43 @@
+"""Add the schedule of the spaced repetition and its index to table Card
+
+Revision ID: e3a7c2f95b18
+Revises: b6d1f4a8e2c5
+Create Date: 2026-10-18 22:37:51.604219
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e3a7c2f95b18"
+down_revision: Union[str, None] = "b6d1f4a8e2c5"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "Card",
+        sa.Column("box", sa.Integer(), nullable=False, server_default="0"),
+    )
+    # (all existing cards are due right away)
+    op.add_column(
+        "Card",
+        sa.Column(
+            "due_at",
+            sa.DateTime(),
+            nullable=False,
+            server_default="1970-01-01 00:00:00",
+        ),
+    )
+    op.create_index("ix_card_due_at_id", "Card", ["due_at", "id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_card_due_at_id", table_name="Card")
+    op.drop_column("Card", "due_at")
+    op.drop_column("Card", "box")
@@ -0,0 +1,63 @@
+"""Match the articles of the german sort-key regardless of their case
+
+Revision ID: f1d8b3e6a2c4
+Revises: c9f2a4d7b381
+Create Date: 2026-10-19 10:41:08.273951
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "f1d8b3e6a2c4"
+down_revision: Union[str, None] = "c9f2a4d7b381"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Only for Postgres: LIKE ignores the case (of ASCII-letters) on SQLite anyway,
+# so there the sort-key stays the same. A generated column can't be altered,
+# so it is added again (dropping it drops its indexes, too).
+# (copy of GERMAN_SORT_KEY in core.db.tables.card_table at this migration)
+GERMAN_SORT_KEY = (
+    "CASE"
+    " WHEN lower(german) LIKE 'der %' THEN substr(german, 5)"
+    " WHEN lower(german) LIKE 'die %' THEN substr(german, 5)"
+    " WHEN lower(german) LIKE 'das %' THEN substr(german, 5)"
+    " ELSE german"
+    " END"
+)
+OLD_GERMAN_SORT_KEY = (
+    "CASE"
+    " WHEN german LIKE 'der %' THEN substr(german, 5)"
+    " WHEN german LIKE 'die %' THEN substr(german, 5)"
+    " WHEN german LIKE 'das %' THEN substr(german, 5)"
+    " ELSE german"
+    " END"
+)
+
+
+def _postgres_statements(sort_key: str) -> list[str]:
+    return [
+        'ALTER TABLE "Card" DROP COLUMN german_sort',
+        'ALTER TABLE "Card" ADD COLUMN german_sort VARCHAR'
+        f" GENERATED ALWAYS AS ({sort_key}) STORED",
+        'CREATE INDEX ix_card_german_sort_id ON "Card" (german_sort, id)',
+        'CREATE INDEX ix_card_german_sort_trgm ON "Card"'
+        " USING GIN (german_sort gin_trgm_ops)",
+    ]
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        for statement in _postgres_statements(GERMAN_SORT_KEY):
+            op.execute(statement)
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        for statement in _postgres_statements(OLD_GERMAN_SORT_KEY):
+            op.execute(statement)
@@ -0,0 +1,129 @@
+"""
+Benchmark: serializing a page of cards to JSON, the way GET /cards did it
+before (a PydCard per card, validated once more by FastAPI against the
+response-model list[PydCardResponse] and encoded with the json-module) and
+with app.schemas.card.dump_cards_json.
+
+The cards are loaded by DbCardRepository.get_slice from a seeded database-file
+and detached, as the router gets them from the unit of work; only the
+serialization is measured.
+
+Run from the project-root:
+
+    python benchmarks/card_serialization.py --sizes 1000 10000 100000
+"""
+
+import argparse
+import asyncio
+from pathlib import Path
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from fastapi.responses import JSONResponse  # noqa: E402
+from fastapi.routing import serialize_response  # noqa: E402
+from fastapi.utils import create_model_field  # noqa: E402
+from sqlalchemy import Engine, create_engine, insert  # noqa: E402
+from sqlalchemy.orm import Session, clear_mappers  # noqa: E402
+
+import app.schemas.card as card_schemas  # noqa: E402
+import core.db as db  # noqa: E402
+import core.db.orm as orm  # noqa: E402
+from core.db.tables import card_table, relevance_table  # noqa: E402
+from core.domain.card import Card  # noqa: E402
+from core.domain.card_repository import DbCardRepository  # noqa: E402
+
+RESPONSE_FIELD = create_model_field(
+    name="Response_read_cards",
+    type_=list[card_schemas.PydCardResponse],
+    mode="serialization",
+)
+
+
+def seed(engine: Engine, count_cards: int) -> None:
+    db.metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.execute(
+            insert(relevance_table),
+            [
+                {"id": "A", "description": "Beginner"},
+                {"id": "B", "description": "Intermediate"},
+                {"id": "C", "description": "Professional"},
+            ],
+        )
+        connection.execute(
+            insert(card_table),
+            [
+                {
+                    "id": i + 1,
+                    "word_type": "NOUN",
+                    "id_relevance": "ABC"[i % 3],
+                    "german": f"der Unterschied {i}",
+                    "italian": f"la differenza {i}",
+                }
+                for i in range(count_cards)
+            ],
+        )
+
+
+def load_cards(engine: Engine, count_cards: int) -> list[Card]:
+    with Session(engine, expire_on_commit=False) as session:
+        cards, _ = DbCardRepository(session).get_slice(skip=0, limit=count_cards)
+        session.expunge_all()
+    return cards
+
+
+def serialize_validated(cards: list[Card]) -> bytes:
+    records = list(map(card_schemas.convert_to_pydantic, cards))
+    content = asyncio.run(
+        serialize_response(field=RESPONSE_FIELD, response_content=records)
+    )
+    return JSONResponse(content).body
+
+
+def bench(serializer, cards: list[Card], repetitions: int) -> float:
+    """Returns the milliseconds per serialization of all cards."""
+    best = float("inf")
+    for _ in range(repetitions):
+        start = time.perf_counter()
+        serializer(cards)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000]
+    )
+    parser.add_argument("--repetitions", type=int, default=5)
+    args = parser.parse_args()
+
+    orm.start_mappers()
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"sqlite:///{Path(directory) / 'cards.db'}")
+        seed(engine, max(args.sizes))
+        for size in args.sizes:
+            cards = load_cards(engine, size)
+            assert serialize_validated(cards) == card_schemas.dump_cards_json(cards)
+            results.append(
+                (
+                    size,
+                    bench(serialize_validated, cards, args.repetitions),
+                    bench(card_schemas.dump_cards_json, cards, args.repetitions),
+                )
+            )
+        engine.dispose()
+    clear_mappers()
+
+    print(f"ms per page (best of {args.repetitions}):")
+    print(f"{'cards':>8}{'validated':>12}{'fast path':>12}{'speedup':>10}")
+    for size, validated, fast in results:
+        print(f"{size:>8}{validated:>12.1f}{fast:>12.1f}{validated / fast:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,545 @@
+"""
+Benchmark-suite: the use cases of core.services.cards.crud and the methods of
+DbCardRepository and FakeCardRepository on decks of 10k, 100k and 1M cards.
+
+For each size a deck is seeded into a fresh SQLite-file (with the production-
+profile of core.db.sqlite_profile): cards with made-up german and italian
+words, three relevance-levels and one to four of 50 tags per card (some tags
+far more popular than others). The FakeCardRepository gets the same deck in
+memory. Each case is repeated up to --repetitions times, but not much longer
+than --budget seconds (at least once); the first run is reported separately,
+since it fills caches (e.g. the count of cards or the trigram-index).
+
+Writing use cases commit their changes (each run writes other cards), writing
+repository-methods only flush and roll back, so all cases see the same deck.
+DbCardRepository.all and FakeCardRepository.all load every card, they are
+skipped for decks larger than --max-all.
+
+The results are written as JSON (by default into benchmarks/results, named
+after the current commit), --compare prints the ratio of the medians to the
+results of an earlier run:
+
+    python benchmarks/crud_suite.py --sizes 10000 100000 1000000
+    python benchmarks/crud_suite.py --sizes 10000 --compare old.json
+"""
+
+import argparse
+import datetime
+from itertools import count
+import json
+from pathlib import Path
+import platform
+import random
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+import sqlalchemy  # noqa: E402
+from sqlalchemy import Engine, create_engine, insert  # noqa: E402
+from sqlalchemy.orm import Session, clear_mappers, sessionmaker  # noqa: E402
+
+import core.db as db  # noqa: E402
+import core.db.orm as orm  # noqa: E402
+from core.db.sqlite_profile import (  # noqa: E402
+    PRODUCTION_PROFILE,
+    apply_sqlite_profile,
+)
+from core.db.tables import (  # noqa: E402
+    card_has_tag_table,
+    card_table,
+    relevance_table,
+    tag_table,
+)
+from core.domain.card import Card  # noqa: E402
+from core.domain.card_repository import (  # noqa: E402
+    DbCardRepository,
+    FakeCardRepository,
+    card_count_cache,
+    card_trigram_index,
+)
+from core.domain.relevance import Relevance  # noqa: E402
+from core.domain.tag import Tag  # noqa: E402
+from core.domain.word_type import WordType  # noqa: E402
+import core.services.cards.crud as crud  # noqa: E402
+from core.services.unit_of_work import DbUnitOfWork  # noqa: E402
+from core.utils.pagination import Cursor  # noqa: E402
+
+PATH_RESULTS = Path(__file__).parent / "results"
+
+RELEVANCE_LEVELS = {"A": "Beginner", "B": "Intermediate", "C": "Professional"}
+COUNT_TAGS = 50
+BATCH_SIZE = 50_000
+STUDY_NOW = datetime.datetime(2026, 1, 1, 12, 0)
+
+GERMAN_SYLLABLES = (
+    "ba be bi bo bu da de di do du fa fe fi fo ga ge "
+    "ha he hi ka ke ki ko la le li lo ma me mi mo na"
+).split()
+ITALIAN_SYLLABLES = (
+    "ca ce ci co ra re ri ro sa se si so ta te ti to "
+    "va ve vi vo za ze zi zo pa pe pi po ga go gi nu"
+).split()
+ARTICLES = ("der", "die", "das")
+WORD_TYPES = [word_type.value for word_type in WordType if word_type.name != "NONE"]
+
+
+def make_word(number: int, syllables: list[str]) -> str:
+    """A unique made-up word per number (its digits to the base of syllables)."""
+    parts = []
+    while True:
+        number, digit = divmod(number, len(syllables))
+        parts.append(syllables[digit])
+        if number == 0 and len(parts) >= 2:
+            break
+    return "".join(parts)
+
+
+def german_of(index: int) -> str:
+    word = make_word(index, GERMAN_SYLLABLES).capitalize()
+    return f"{ARTICLES[index % 3]} {word}" if index % 2 else word.lower()
+
+
+def italian_of(index: int) -> str:
+    return make_word(index * 7 + 3, ITALIAN_SYLLABLES)
+
+
+def tag_value(index: int) -> str:
+    return f"tag {index}"
+
+
+def card_rows(count_cards: int):
+    for i in range(count_cards):
+        yield {
+            "id": i + 1,
+            "word_type": WORD_TYPES[i % len(WORD_TYPES)],
+            "id_relevance": "ABC"[i % 3],
+            "german": german_of(i),
+            "italian": italian_of(i),
+            "box": i % 5,
+            "due_at": due_at_of(i, count_cards),
+        }
+
+
+def due_at_of(index: int, count_cards: int) -> datetime.datetime:
+    """Spread over a minute per card, half of the deck is due at STUDY_NOW."""
+    minutes = (index * 7919) % count_cards - count_cards // 2
+    return STUDY_NOW + datetime.timedelta(minutes=minutes)
+
+
+def card_tags(count_cards: int):
+    """The tag-indexes of each card: 1 to 4 tags, weighted like 1/rank."""
+    rnd = random.Random(0)
+    weights = [1 / rank for rank in range(1, COUNT_TAGS + 1)]
+    for _ in range(count_cards):
+        yield set(rnd.choices(range(COUNT_TAGS), weights, k=rnd.randint(1, 4)))
+
+
+def _batches(rows, size: int = BATCH_SIZE):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def seed_database(engine: Engine, count_cards: int) -> None:
+    db.metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.execute(
+            insert(relevance_table),
+            [{"id": id, "description": text} for id, text in RELEVANCE_LEVELS.items()],
+        )
+        connection.execute(
+            insert(tag_table),
+            [{"id": i + 1, "value": tag_value(i)} for i in range(COUNT_TAGS)],
+        )
+        for batch in _batches(card_rows(count_cards)):
+            connection.execute(insert(card_table), batch)
+        associations = (
+            {"id_card": id_card, "id_tag": tag + 1}
+            for id_card, tags in enumerate(card_tags(count_cards), start=1)
+            for tag in tags
+        )
+        for batch in _batches(associations):
+            connection.execute(insert(card_has_tag_table), batch)
+
+
+def seed_fake_repository(count_cards: int) -> FakeCardRepository:
+    relevance_levels = {
+        id: Relevance(id, text) for id, text in RELEVANCE_LEVELS.items()
+    }
+    tags = [Tag(value=tag_value(i)) for i in range(COUNT_TAGS)]
+    cards = []
+    for row, tag_indexes in zip(card_rows(count_cards), card_tags(count_cards)):
+        card = Card(
+            word_type=WordType(row["word_type"]),
+            relevance=relevance_levels[row["id_relevance"]],
+            german=row["german"],
+            italian=row["italian"],
+            id=row["id"],
+            id_relevance=row["id_relevance"],
+        )
+        card.box = row["box"]
+        card.due_at = row["due_at"]
+        card.tags = {tags[index] for index in tag_indexes}
+        cards.append(card)
+    return FakeCardRepository(set(cards))
+
+
+def with_typo(word: str) -> str:
+    """The word with two of its letters swapped."""
+    middle = len(word) // 2
+    return word[: middle - 1] + word[middle] + word[middle - 1] + word[middle + 1 :]
+
+
+def queries_for(count_cards: int) -> dict:
+    """Arguments of the reading cases, which find something in any deck."""
+    probe = count_cards // 2
+    german = german_of(probe)
+    word = german.split()[-1]
+    return {
+        "id": probe + 1,
+        "search": word[:4],
+        "tags_all": [tag_value(0), tag_value(1)],
+        "tags_any": [tag_value(COUNT_TAGS - 2), tag_value(COUNT_TAGS - 1)],
+        "fuzzy": with_typo(word.lower()),
+        "due_now": STUDY_NOW,
+        "deep_page": max(1, count_cards // 100 // 2),  # in the middle of the deck
+        "cursor": Cursor(sort_key=word, id=probe + 1),
+    }
+
+
+def crud_cases(session_factory: sessionmaker, count_cards: int) -> dict:
+    q = queries_for(count_cards)
+    new_numbers = count(count_cards)  # (words that aren't in the deck yet)
+    created_ids: list[int] = []
+    updated = count()
+
+    def uow():
+        return DbUnitOfWork(session_factory=session_factory)
+
+    def read_uow():
+        return DbUnitOfWork(session_factory=session_factory, read_only=True)
+
+    def create_card():
+        number = next(new_numbers)
+        card = crud.create_card_in_db(
+            word_type=WordType.NOUN,
+            relevance_id="A",
+            german=german_of(number),
+            italian=italian_of(number),
+            uow=uow(),
+        )
+        created_ids.append(card.id)
+
+    def update_card():
+        number = next(updated)
+        crud.update_card_in_db(
+            id_card=created_ids[number % len(created_ids)],
+            word_type=WordType.VERB,
+            relevance_id="B",
+            german=f"geändert {number}",
+            italian=f"cambiato {number}",
+            uow=uow(),
+        )
+
+    def delete_card():
+        crud.delete_card_in_db(id_card=created_ids.pop(), uow=uow())
+
+    return {
+        "create_card_in_db": create_card,
+        "read_card_from_db": lambda: crud.read_card_from_db(q["id"], read_uow()),
+        "read_card_version_from_db": lambda: crud.read_card_version_from_db(
+            q["id"], read_uow()
+        ),
+        "read_deck_version_from_db": lambda: crud.read_deck_version_from_db(
+            read_uow()
+        ),
+        "read_cards_from_db(page=1)": lambda: crud.read_cards_from_db(read_uow()),
+        "read_cards_from_db(page=1, without count)": lambda: crud.read_cards_from_db(
+            read_uow(), with_count=False
+        ),
+        "read_cards_from_db(deep page)": lambda: crud.read_cards_from_db(
+            read_uow(), page=q["deep_page"], with_count=False
+        ),
+        "read_cards_after_cursor_from_db(deep)": (
+            lambda: crud.read_cards_after_cursor_from_db(read_uow(), q["cursor"])
+        ),
+        "search_cards_in_db": lambda: crud.search_cards_in_db(
+            q["search"], read_uow()
+        ),
+        "filter_cards_by_tags_in_db(all)": lambda: crud.filter_cards_by_tags_in_db(
+            q["tags_all"], read_uow()
+        ),
+        "filter_cards_by_tags_in_db(any)": lambda: crud.filter_cards_by_tags_in_db(
+            q["tags_any"], read_uow(), match_all=False
+        ),
+        "fuzzy_search_cards_in_db": lambda: crud.fuzzy_search_cards_in_db(
+            q["fuzzy"], read_uow()
+        ),
+        # (after the reading cases, they change the deck-version)
+        "update_card_in_db": update_card,
+        "delete_card_in_db": delete_card,
+    }
+
+
+def repository_cases(repository_of, count_cards: int, include_all: bool) -> dict:
+    """
+    The cases of the methods of a card-repository; repository_of is a context-
+    manager which provides the repository and discards its changes.
+    """
+    q = queries_for(count_cards)
+    new_numbers = count(count_cards)
+
+    def call(method_name: str, *args, **kwargs):
+        def case():
+            with repository_of() as repository:
+                getattr(repository, method_name)(*args, **kwargs)
+
+        return case
+
+    def add():
+        number = next(new_numbers)
+        with repository_of() as repository:
+            repository.add(
+                Card(
+                    word_type=WordType.NOUN,
+                    relevance=repository_of.beginner(),
+                    german=german_of(number),
+                    italian=italian_of(number),
+                    id_relevance="A",
+                )
+            )
+
+    def delete():
+        with repository_of() as repository:
+            repository.delete(repository.get(q["id"]))
+
+    cases = {
+        "add": add,
+        "get": call("get", q["id"]),
+        "get_version": call("get_version", q["id"]),
+        "get_deck_version": call("get_deck_version"),
+        "count": call("count"),
+        "get_list": call("get_list", skip=0, limit=100),
+        "get_slice": call("get_slice", skip=0, limit=100),
+        "get_slice(deep)": call("get_slice", skip=q["deep_page"] * 100, limit=100),
+        "get_page_after": call("get_page_after", cursor=q["cursor"], limit=100),
+        "search": call("search", q["search"], skip=0, limit=100),
+        "filter_by_tags(all)": call(
+            "filter_by_tags", q["tags_all"], match_all=True, skip=0, limit=100
+        ),
+        "filter_by_tags(any)": call(
+            "filter_by_tags", q["tags_any"], match_all=False, skip=0, limit=100
+        ),
+        "fuzzy_search": call("fuzzy_search", q["fuzzy"], limit=10),
+        "get_due": call("get_due", q["due_now"], limit=20),
+        "delete": delete,
+    }
+    if include_all:
+        cases["all"] = call("all")
+    return cases
+
+
+class DbRepositoryOf:
+    """A DbCardRepository on a fresh session, its changes are rolled back."""
+
+    def __init__(self, engine: Engine) -> None:
+        self.engine = engine
+
+    def __call__(self):
+        return self
+
+    def __enter__(self) -> DbCardRepository:
+        self.session = Session(self.engine)
+        return DbCardRepository(self.session)
+
+    def beginner(self) -> Relevance:
+        return self.session.get(Relevance, "A")
+
+    def __exit__(self, *args) -> None:
+        self.session.flush()
+        self.session.rollback()
+        self.session.close()
+
+
+class FakeRepositoryOf:
+    """The FakeCardRepository, cards added or deleted are restored afterwards."""
+
+    def __init__(self, repository: FakeCardRepository) -> None:
+        self.repository = repository
+
+    def __call__(self):
+        return self
+
+    def __enter__(self) -> FakeCardRepository:
+        self.cards = set(self.repository._cards)
+        return self.repository
+
+    def beginner(self) -> Relevance:
+        return Relevance("A", RELEVANCE_LEVELS["A"])
+
+    def __exit__(self, *args) -> None:
+        self.repository._cards = self.cards
+
+
+def measure(case, repetitions: int, budget: float) -> dict:
+    """Milliseconds of the runs of the case."""
+    times = []
+    started = time.perf_counter()
+    while len(times) < repetitions:
+        start = time.perf_counter()
+        case()
+        times.append((time.perf_counter() - start) * 1000)
+        if time.perf_counter() - started > budget:
+            break
+    later_runs = times[1:] or times
+    return {
+        "runs": len(times),
+        "first_ms": times[0],
+        "min_ms": min(later_runs),
+        "median_ms": statistics.median(later_runs),
+        "mean_ms": statistics.fmean(later_runs),
+        "max_ms": max(later_runs),
+    }
+
+
+def run_cases(size: int, target: str, cases: dict, args) -> list[dict]:
+    results = []
+    for name, case in cases.items():
+        result = {"size": size, "target": target, "name": name}
+        result.update(measure(case, args.repetitions, args.budget))
+        results.append(result)
+        print(
+            f"{size:>9} {target:<6} {name:<44}"
+            f"{result['first_ms']:>11.2f}{result['median_ms']:>11.2f}"
+        )
+    return results
+
+
+def run_size(size: int, directory: Path, args) -> tuple[list[dict], dict]:
+    # (the process-local caches belong to the previous deck)
+    card_count_cache.invalidate()
+    card_trigram_index.clear()
+
+    engine = create_engine(f"sqlite:///{directory / f'deck_{size}.db'}")
+    apply_sqlite_profile(engine, PRODUCTION_PROFILE)
+    start = time.perf_counter()
+    seed_database(engine, size)
+    seed_seconds = {"database": time.perf_counter() - start}
+    start = time.perf_counter()
+    fake_repository = seed_fake_repository(size)
+    seed_seconds["fake"] = time.perf_counter() - start
+
+    include_all = size <= args.max_all
+    results = [
+        *run_cases(size, "crud", crud_cases(sessionmaker(bind=engine), size), args),
+        *run_cases(
+            size,
+            "db",
+            repository_cases(DbRepositoryOf(engine), size, include_all),
+            args,
+        ),
+        *run_cases(
+            size,
+            "fake",
+            repository_cases(FakeRepositoryOf(fake_repository), size, include_all),
+            args,
+        ),
+    ]
+    engine.dispose()
+    return results, seed_seconds
+
+
+def current_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=Path(__file__).parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: list[dict], path: Path) -> None:
+    previous = {
+        (result["size"], result["target"], result["name"]): result
+        for result in json.loads(path.read_text())["results"]
+    }
+    print(f"\nmedians compared to {path} (< 1 is faster):")
+    for result in results:
+        old = previous.get((result["size"], result["target"], result["name"]))
+        if old and old["median_ms"] > 0:
+            ratio = result["median_ms"] / old["median_ms"]
+            print(
+                f"{result['size']:>9} {result['target']:<6} {result['name']:<44}"
+                f"{old['median_ms']:>11.2f}{result['median_ms']:>11.2f}"
+                f"{ratio:>8.2f}x"
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000]
+    )
+    parser.add_argument("--repetitions", type=int, default=20)
+    parser.add_argument(
+        "--budget", type=float, default=5.0, help="seconds per case (about)"
+    )
+    parser.add_argument("--max-all", type=int, default=100_000)
+    parser.add_argument("--output", type=Path)
+    parser.add_argument("--compare", type=Path)
+    args = parser.parse_args()
+
+    commit = current_commit()
+    output = args.output or PATH_RESULTS / f"crud_{commit or 'unknown'}.json"
+
+    orm.start_mappers()
+    results = []
+    seed_seconds = {}
+    print(f"{'cards':>9} {'target':<6} {'case':<44}{'first ms':>11}{'median ms':>11}")
+    with tempfile.TemporaryDirectory() as directory:
+        for size in args.sizes:
+            size_results, seed_seconds[size] = run_size(size, Path(directory), args)
+            results.extend(size_results)
+    clear_mappers()
+
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(
+        json.dumps(
+            {
+                "meta": {
+                    "commit": commit,
+                    "created_at": datetime.datetime.now(datetime.UTC).isoformat(),
+                    "python": platform.python_version(),
+                    "sqlalchemy": sqlalchemy.__version__,
+                    "sqlite": sqlite3.sqlite_version,
+                    "platform": platform.platform(),
+                    "repetitions": args.repetitions,
+                    "budget_seconds": args.budget,
+                    "seed_seconds": seed_seconds,
+                },
+                "results": results,
+            },
+            indent=2,
+        )
+    )
+    print(f"\nresults written to {output}")
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
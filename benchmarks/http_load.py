@@ -0,0 +1,359 @@
+"""
+Load-test: the card-API of app.main under uvicorn, driven by a mix of requests
+at a target rate, with the throughput and the latency-percentiles per route.
+
+A deck of --cards cards is seeded (like benchmarks/crud_suite.py does) into
+the file production.db of a temporary directory, the app is started there in
+a separate process with USE_DB=production, so it runs with the connection-
+profiles and pools of production.
+
+The requests are sent open-loop: they start on a fixed schedule of --rate
+requests per second, no matter how long the earlier ones take (at most
+--max-in-flight at a time). Their latency is measured from their scheduled
+start, so a server that falls behind shows up in the percentiles instead of
+slowing down the load (no "coordinated omission").
+
+The mix is given as weights per operation, e.g. "list=50,get=40,create=4,
+update=4,delete=2" (the default). A share of --html of the GET-requests asks
+for the HTML-view (Accept: text/html), the rest for JSON. Updates change
+cards of the lower half of the deck, deletes remove cards of the upper half
+from the end, so the reads hardly ever hit a deleted card.
+
+Run from the project-root:
+
+    python benchmarks/http_load.py --cards 100000 --rate 200 --duration 30
+"""
+
+import argparse
+import asyncio
+from collections import defaultdict
+import itertools
+import json
+import os
+from pathlib import Path
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from sqlalchemy import create_engine  # noqa: E402
+
+from core.db.sqlite_profile import (  # noqa: E402
+    PRODUCTION_PROFILE,
+    apply_sqlite_profile,
+)
+from crud_suite import WORD_TYPES, seed_database  # noqa: E402
+
+PATH_SRC = Path(__file__).resolve().parents[1] / "src"
+
+DEFAULT_MIX = "list=50,get=40,create=4,update=4,delete=2"
+OPERATIONS = ("list", "get", "create", "update", "delete")
+PAGE_SIZE = 100
+STARTUP_TIMEOUT = 30.0  # seconds
+
+
+def parse_mix(text: str) -> dict[str, float]:
+    mix = {}
+    for part in text.split(","):
+        operation, _, weight = part.partition("=")
+        if operation.strip() not in OPERATIONS:
+            raise argparse.ArgumentTypeError(f"unknown operation: {operation}")
+        mix[operation.strip()] = float(weight)
+    return mix
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(directory: Path, port: int) -> subprocess.Popen:
+    env = {
+        **os.environ,
+        "USE_DB": "production",
+        "PYTHONPATH": os.pathsep.join(
+            filter(None, [str(PATH_SRC), os.environ.get("PYTHONPATH")])
+        ),
+    }
+    return subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "app.main:app",
+            "--port",
+            str(port),
+            "--log-level",
+            "warning",
+            "--no-access-log",
+        ],
+        cwd=directory,
+        env=env,
+    )
+
+
+async def wait_until_ready(client: httpx.AsyncClient, server: subprocess.Popen):
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError("the server stopped during startup")
+        try:
+            if (await client.get("/metrics")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.1)
+    raise RuntimeError(f"the server didn't start within {STARTUP_TIMEOUT} s")
+
+
+class Workload:
+    """Builds the requests of the mix, one after the other."""
+
+    def __init__(self, args, seed: int = 0) -> None:
+        self.rnd = random.Random(seed)
+        self.operations = list(args.mix)
+        self.weights = list(args.mix.values())
+        self.html_share = args.html
+        self.count_pages = max(1, min(args.pages, args.cards // PAGE_SIZE))
+        self.count_stable = max(1, args.cards // 2)  # read and updated only
+        self.next_deleted = args.cards  # deleted from the end
+        self.new_cards = itertools.count(1)
+
+    def _format(self) -> str:
+        return "html" if self.rnd.random() < self.html_share else "json"
+
+    def _card_input(self, number: int) -> dict:
+        return {
+            "word_type": self.rnd.choice(WORD_TYPES),
+            "relevance_id": self.rnd.choice("ABC"),
+            "german": f"Lastwort {number}",
+            "italian": f"parola di carico {number}",
+        }
+
+    def next_request(self) -> tuple[str, str, dict]:
+        """The route and format (for the report) and the arguments of httpx."""
+        operation = self.rnd.choices(self.operations, self.weights)[0]
+        if operation == "delete" and self.next_deleted <= self.count_stable:
+            operation = "create"  # (the upper half of the deck is gone)
+        if operation in ("list", "get"):
+            format = self._format()
+            accept = "text/html" if format == "html" else "application/json"
+            headers = {"Accept": accept}
+            if operation == "list":
+                page = self.rnd.randint(1, self.count_pages)
+                url = f"/cards?page={page}&page_size={PAGE_SIZE}"
+                route = "GET /cards"
+            else:
+                url = f"/cards/{self.rnd.randint(1, self.count_stable)}"
+                route = "GET /cards/{id}"
+            return route, format, {"method": "GET", "url": url, "headers": headers}
+        if operation == "create":
+            number = next(self.new_cards)
+            return "POST /cards", "json", {
+                "method": "POST",
+                "url": "/cards",
+                "json": self._card_input(number),
+            }
+        if operation == "update":
+            id_card = self.rnd.randint(1, self.count_stable)
+            card_input = self._card_input(id_card)
+            card_input["italian"] = f"parola aggiornata {id_card}"
+            return "PUT /cards/{id}", "json", {
+                "method": "PUT",
+                "url": f"/cards/{id_card}",
+                "json": card_input,
+            }
+        id_card = self.next_deleted
+        self.next_deleted -= 1
+        return "DELETE /cards/{id}", "json", {
+            "method": "DELETE",
+            "url": f"/cards/{id_card}",
+        }
+
+
+class Recorder:
+    def __init__(self) -> None:
+        self.latencies: dict[tuple[str, str], list[float]] = defaultdict(list)
+        self.errors: dict[tuple[str, str], int] = defaultdict(int)
+        self.late_starts = 0  # requests that waited for a free slot
+
+    def record(self, key: tuple[str, str], seconds: float, ok: bool) -> None:
+        self.latencies[key].append(seconds)
+        if not ok:
+            self.errors[key] += 1
+
+
+async def send(
+    client: httpx.AsyncClient,
+    recorder: Recorder,
+    slots: asyncio.Semaphore,
+    key: tuple[str, str],
+    request: dict,
+    scheduled: float,
+) -> None:
+    async with slots:
+        try:
+            response = await client.request(**request)
+            await response.aread()
+            ok = response.status_code < 400
+        except httpx.HTTPError:
+            ok = False
+        recorder.record(key, time.perf_counter() - scheduled, ok)
+
+
+async def run_load(
+    client: httpx.AsyncClient,
+    workload: Workload,
+    duration: float,
+    args,
+) -> tuple[Recorder, float]:
+    recorder = Recorder()
+    slots = asyncio.Semaphore(args.max_in_flight)
+    interval = 1 / args.rate
+    count_requests = int(args.rate * duration)
+    tasks = []
+    start = time.perf_counter()
+    for i in range(count_requests):
+        scheduled = start + i * interval
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if slots.locked():
+            recorder.late_starts += 1
+        route, format, request = workload.next_request()
+        tasks.append(
+            asyncio.create_task(
+                send(client, recorder, slots, (route, format), request, scheduled)
+            )
+        )
+    await asyncio.gather(*tasks)
+    return recorder, time.perf_counter() - start
+
+
+def percentile(sorted_values: list[float], fraction: float) -> float:
+    index = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return sorted_values[index]
+
+
+def summarize(recorder: Recorder, elapsed: float) -> list[dict]:
+    rows = []
+    for (route, format), latencies in sorted(recorder.latencies.items()):
+        ordered = sorted(latencies)
+        rows.append(
+            {
+                "route": route,
+                "format": format,
+                "count": len(ordered),
+                "errors": recorder.errors[(route, format)],
+                "per_second": len(ordered) / elapsed,
+                "p50_ms": percentile(ordered, 0.50) * 1000,
+                "p95_ms": percentile(ordered, 0.95) * 1000,
+                "p99_ms": percentile(ordered, 0.99) * 1000,
+                "mean_ms": statistics.fmean(ordered) * 1000,
+            }
+        )
+    return rows
+
+
+def print_report(rows: list[dict], recorder: Recorder, elapsed: float, args):
+    total = sum(row["count"] for row in rows)
+    print(
+        f"{total} requests in {elapsed:.1f} s ({total / elapsed:.1f}/s, "
+        f"target {args.rate:g}/s), {recorder.late_starts} waited for one of "
+        f"{args.max_in_flight} slots"
+    )
+    print(
+        f"{'route':<20}{'format':<7}{'count':>7}{'errors':>7}{'req/s':>8}"
+        f"{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+    )
+    for row in rows:
+        print(
+            f"{row['route']:<20}{row['format']:<7}{row['count']:>7}"
+            f"{row['errors']:>7}{row['per_second']:>8.1f}{row['p50_ms']:>9.1f}"
+            f"{row['p95_ms']:>9.1f}{row['p99_ms']:>9.1f}"
+        )
+
+
+async def main_async(args, directory: Path) -> None:
+    port = free_port()
+    server = start_server(directory, port)
+    limits = httpx.Limits(
+        max_connections=args.max_in_flight,
+        max_keepalive_connections=args.max_in_flight,
+    )
+    try:
+        async with httpx.AsyncClient(
+            base_url=f"http://127.0.0.1:{port}",
+            limits=limits,
+            timeout=args.timeout,
+        ) as client:
+            await wait_until_ready(client, server)
+            workload = Workload(args)
+            if args.warmup:
+                await run_load(client, workload, args.warmup, args)
+            recorder, elapsed = await run_load(client, workload, args.duration, args)
+    finally:
+        server.terminate()
+        server.wait()
+
+    rows = summarize(recorder, elapsed)
+    print_report(rows, recorder, elapsed, args)
+    if args.output:
+        args.output.write_text(
+            json.dumps(
+                {
+                    "meta": {
+                        "cards": args.cards,
+                        "rate": args.rate,
+                        "duration": args.duration,
+                        "mix": args.mix,
+                        "html": args.html,
+                        "elapsed_seconds": elapsed,
+                    },
+                    "results": rows,
+                },
+                indent=2,
+            )
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--cards", type=int, default=10_000)
+    parser.add_argument("--rate", type=float, default=100.0, help="requests/s")
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds")
+    parser.add_argument(
+        "--warmup", type=float, default=2.0, help="seconds, not reported"
+    )
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix(DEFAULT_MIX))
+    parser.add_argument(
+        "--html", type=float, default=0.5, help="share of GETs asking for HTML"
+    )
+    parser.add_argument(
+        "--pages", type=int, default=10, help="pages of GET /cards requested"
+    )
+    parser.add_argument("--max-in-flight", type=int, default=100)
+    parser.add_argument("--timeout", type=float, default=30.0, help="seconds")
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"sqlite:///{Path(directory) / 'production.db'}")
+        apply_sqlite_profile(engine, PRODUCTION_PROFILE)
+        start = time.perf_counter()
+        seed_database(engine, args.cards)
+        engine.dispose()
+        print(f"seeded {args.cards} cards in {time.perf_counter() - start:.1f} s")
+        asyncio.run(main_async(args, Path(directory)))
+
+
+if __name__ == "__main__":
+    main()
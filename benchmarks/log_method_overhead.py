@@ -0,0 +1,144 @@
+"""
+Benchmark: overhead of core.utils.logging_utils.log_method per decorated call.
+
+The decorated function returns a PaginationResult of a page of cards, like
+read_cards_from_db does. The log-records are written to a file in a
+temporary directory, either directly (in the calling thread) or through the
+queue of log_in_background - with --io-delay each write is slowed down like
+on a busy disk or a network-share. For comparison the previous implementation
+of log_method (four eagerly formatted messages with the full reprs) is
+measured as well.
+
+Run from the project-root:
+
+    python benchmarks/log_method_overhead.py --page-size 100 --io-delay 0.5
+"""
+
+import argparse
+from functools import wraps
+import logging
+from pathlib import Path
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from core.domain.card import Card  # noqa: E402
+from core.domain.relevance import Relevance  # noqa: E402
+from core.domain.word_type import WordType  # noqa: E402
+import core.utils.logging_utils as logging_utils  # noqa: E402
+from core.utils.pagination import PaginationResult  # noqa: E402
+
+logger = logging_utils.logger
+
+
+def previous_log_method(func):
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        logger.info(f"Calling method: {func.__name__}")
+        logger.info(f"Arguments: {args if args else 'None'}")
+        logger.info(f"Keyword arguments: {kwargs if kwargs else 'None'}")
+        result = func(*args, **kwargs)
+        logger.info(f"Return value: {result}")
+        return result
+
+    return wrapper
+
+
+class UnitOfWork:
+    pass
+
+
+class SlowFileHandler(logging.FileHandler):
+    def __init__(self, filename: Path, delay_seconds: float) -> None:
+        super().__init__(filename)
+        self.delay_seconds = delay_seconds
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if self.delay_seconds:
+            time.sleep(self.delay_seconds)
+        super().emit(record)
+
+
+def make_read_page(page_size: int):
+    relevance = Relevance(id="A", description="Beginner")
+    records = [
+        Card(WordType.NOUN, relevance, f"das Wort {i}", f"la parola {i}", id=i)
+        for i in range(page_size)
+    ]
+
+    def read_cards_from_db(uow, page: int = 1, page_size: int = page_size):
+        return PaginationResult.build(records, 10 * page_size, page_size, page)
+
+    return read_cards_from_db
+
+
+def bench(func, calls: int) -> float:
+    """Returns the microseconds per call."""
+    uow = UnitOfWork()
+    start = time.perf_counter()
+    for _ in range(calls):
+        func(uow, page=1)
+    return (time.perf_counter() - start) / calls * 1_000_000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--calls", type=int, default=2_000)
+    parser.add_argument(
+        "--io-delay", type=float, default=0.0, help="ms per written record"
+    )
+    args = parser.parse_args()
+
+    read_page = make_read_page(args.page_size)
+    cases = [
+        ("undecorated", read_page, logging.INFO, False),
+        ("previous, INFO", previous_log_method(read_page), logging.INFO, False),
+        ("log_method, INFO", logging_utils.log_method(read_page), logging.INFO, False),
+        (
+            "log_method, INFO, queue",
+            logging_utils.log_method(read_page),
+            logging.INFO,
+            True,
+        ),
+        (
+            "log_method, WARNING",
+            logging_utils.log_method(read_page),
+            logging.WARNING,
+            False,
+        ),
+    ]
+
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for name, func, level, in_background in cases:
+            handler = SlowFileHandler(
+                Path(directory) / "bench.log", args.io_delay / 1000
+            )
+            handler.setFormatter(
+                logging.Formatter("%(asctime)s - %(levelname)s: %(message)s")
+            )
+            logger.handlers = [handler]
+            logger.propagate = False
+            logger.setLevel(level)
+            listener = None
+            if in_background:
+                listener = logging_utils.log_in_background(logger)
+            per_call = bench(func, args.calls)
+            if listener is not None:
+                listener.stop()  # (waits for the queue to be written)
+            handler.close()
+            results.append((name, per_call))
+
+    print(
+        f"page of {args.page_size} cards, {args.io_delay} ms per write, "
+        f"µs per call (mean of {args.calls}):"
+    )
+    for name, per_call in results:
+        print(f"{name:<28}{per_call:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""
+Benchmark: SQLite with its default settings vs. the production-profile from
+core.db.sqlite_profile.
+
+A deck of cards is seeded into two fresh database-files, then for each file
+we measure:
+
+- writes: single-card inserts, each in its own transaction (like POST /cards)
+- reads: point-lookups by id from several threads while one thread keeps
+  writing (like a busy web-app with readers and one writer)
+
+Run from the project-root:
+
+    python benchmarks/sqlite_profile.py --cards 100000
+"""
+
+import argparse
+from pathlib import Path
+import random
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from sqlalchemy import Engine, create_engine, insert, select  # noqa: E402
+
+import core.db as db  # noqa: E402
+from core.db.sqlite_profile import (  # noqa: E402
+    PRODUCTION_PROFILE,
+    apply_sqlite_profile,
+)
+from core.db.tables import card_table, relevance_table  # noqa: E402
+
+
+def seed(engine: Engine, count_cards: int) -> None:
+    db.metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.execute(
+            insert(relevance_table),
+            [{"id": "A", "description": "Beginner"}],
+        )
+        connection.execute(
+            insert(card_table),
+            [
+                {
+                    "word_type": "NOUN",
+                    "id_relevance": "A",
+                    "german": f"Wort {i}",
+                    "italian": f"parola {i}",
+                }
+                for i in range(count_cards)
+            ],
+        )
+
+
+def bench_writes(engine: Engine, count_writes: int) -> float:
+    start = time.perf_counter()
+    for i in range(count_writes):
+        with engine.begin() as connection:
+            connection.execute(
+                insert(card_table).values(
+                    word_type="VERB",
+                    id_relevance="A",
+                    german=f"neu {i}",
+                    italian=f"nuovo {i}",
+                )
+            )
+    return count_writes / (time.perf_counter() - start)
+
+
+def bench_reads_under_write_load(
+    engine: Engine,
+    count_cards: int,
+    count_readers: int,
+    duration: float,
+) -> float:
+    stop = threading.Event()
+    reads = [0] * count_readers
+
+    def reader(index: int) -> None:
+        rnd = random.Random(index)
+        while not stop.is_set():
+            with engine.connect() as connection:
+                stmt = select(card_table).where(
+                    card_table.c.id == rnd.randint(1, count_cards)
+                )
+                connection.execute(stmt).one_or_none()
+            reads[index] += 1
+
+    def writer() -> None:
+        i = 0
+        while not stop.is_set():
+            with engine.begin() as connection:
+                connection.execute(
+                    insert(card_table).values(
+                        word_type="VERB",
+                        id_relevance="A",
+                        german=f"parallel {i}",
+                        italian=f"parallelo {i}",
+                    )
+                )
+            i += 1
+
+    threads = [
+        threading.Thread(target=reader, args=(index,))
+        for index in range(count_readers)
+    ]
+    threads.append(threading.Thread(target=writer))
+    for thread in threads:
+        thread.start()
+    time.sleep(duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return sum(reads) / duration
+
+
+def run(profile_name: str, path: Path, args) -> dict:
+    engine = create_engine(
+        f"sqlite:///{path}",
+        pool_size=args.readers + 1,
+        connect_args={"timeout": 30},
+    )
+    if profile_name == "production":
+        apply_sqlite_profile(engine, PRODUCTION_PROFILE)
+    seed(engine, args.cards)
+    result = {
+        "profile": profile_name,
+        "writes_per_s": bench_writes(engine, args.writes),
+        "reads_per_s": bench_reads_under_write_load(
+            engine, args.cards, args.readers, args.duration
+        ),
+    }
+    engine.dispose()
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--cards", type=int, default=100_000)
+    parser.add_argument("--writes", type=int, default=1_000)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--duration", type=float, default=5.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        results = [
+            run(name, Path(directory) / f"{name}.db", args)
+            for name in ("default", "production")
+        ]
+
+    print(f"deck of {args.cards} cards:")
+    print(f"{'profile':<12}{'writes/s':>12}{'reads/s':>12}")
+    for result in results:
+        print(
+            f"{result['profile']:<12}"
+            f"{result['writes_per_s']:>12.0f}"
+            f"{result['reads_per_s']:>12.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
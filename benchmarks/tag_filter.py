@@ -0,0 +1,154 @@
+"""
+Benchmark: filtering cards by tags with and without the index on
+Card_has_Tag(id_tag, id_card), compared to filtering Card.tags in Python.
+
+A deck of cards is seeded into a fresh database-file, each card gets one to
+four of the tags (some tags are far more popular than others). Then we measure
+the first page of DbCardRepository.filter_by_tags for a few combinations of
+tags, once with the index and once after dropping it. The Python-side filter
+loads all cards with their tags, so it is only run once.
+
+Run from the project-root:
+
+    python benchmarks/tag_filter.py --cards 100000 --tags 50
+"""
+
+import argparse
+from pathlib import Path
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from sqlalchemy import Engine, create_engine, insert, select  # noqa: E402
+from sqlalchemy.orm import Session, clear_mappers, selectinload  # noqa: E402
+
+import core.db as db  # noqa: E402
+import core.db.orm as orm  # noqa: E402
+from core.db.tables import (  # noqa: E402
+    card_has_tag_table,
+    card_table,
+    relevance_table,
+    tag_table,
+)
+from core.domain.card import Card  # noqa: E402
+from core.domain.card_repository import DbCardRepository  # noqa: E402
+
+INDEX_NAME = "ix_card_has_tag_id_tag_id_card"
+
+
+def tag_value(index: int) -> str:
+    return f"tag {index}"
+
+
+def seed(engine: Engine, count_cards: int, count_tags: int) -> None:
+    db.metadata.create_all(engine)
+    rnd = random.Random(0)
+    # tag 0 is the most popular one, the weights fall like 1/rank:
+    weights = [1 / rank for rank in range(1, count_tags + 1)]
+    with engine.begin() as connection:
+        connection.execute(
+            insert(relevance_table),
+            [{"id": "A", "description": "Beginner"}],
+        )
+        connection.execute(
+            insert(tag_table),
+            [{"id": i + 1, "value": tag_value(i)} for i in range(count_tags)],
+        )
+        connection.execute(
+            insert(card_table),
+            [
+                {
+                    "id": i + 1,
+                    "word_type": "NOUN",
+                    "id_relevance": "A",
+                    "german": f"Wort {i}",
+                    "italian": f"parola {i}",
+                }
+                for i in range(count_cards)
+            ],
+        )
+        associations = []
+        for id_card in range(1, count_cards + 1):
+            tags = set(rnd.choices(range(count_tags), weights, k=rnd.randint(1, 4)))
+            associations.extend(
+                {"id_card": id_card, "id_tag": tag + 1} for tag in tags
+            )
+        connection.execute(insert(card_has_tag_table), associations)
+
+
+def bench_filter(
+    engine: Engine,
+    tags: list[str],
+    match_all: bool,
+    repetitions: int,
+) -> float:
+    """Returns the milliseconds per query (first page of 100 cards)."""
+    with Session(engine) as session:
+        repo = DbCardRepository(session)
+        repo.filter_by_tags(tags, match_all, limit=100)  # warm up the cache
+        start = time.perf_counter()
+        for _ in range(repetitions):
+            repo.filter_by_tags(tags, match_all, limit=100)
+        return (time.perf_counter() - start) / repetitions * 1000
+
+
+def bench_python_filter(engine: Engine, tags: list[str]) -> float:
+    """Returns the milliseconds to filter all cards by their tags in Python."""
+    wanted = set(tags)
+    with Session(engine) as session:
+        start = time.perf_counter()
+        cards = session.scalars(
+            select(Card).options(selectinload(Card.tags), selectinload(Card.relevance))
+        ).all()
+        matches = [
+            card for card in cards if wanted <= {tag.value for tag in card.tags}
+        ]
+        sorted(matches, key=lambda card: (card.german_sort, card.id))[:100]
+        return (time.perf_counter() - start) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--cards", type=int, default=100_000)
+    parser.add_argument("--tags", type=int, default=50)
+    parser.add_argument("--repetitions", type=int, default=20)
+    args = parser.parse_args()
+
+    popular, second, rare = tag_value(0), tag_value(1), tag_value(args.tags - 1)
+    cases = [
+        ("all of 2 popular", [popular, second], True),
+        ("all of popular+rare", [popular, rare], True),
+        ("any of 2 popular", [popular, second], False),
+        ("only rare", [rare], True),
+    ]
+
+    orm.start_mappers()
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"sqlite:///{Path(directory) / 'tags.db'}")
+        seed(engine, args.cards, args.tags)
+        with_index = [
+            bench_filter(engine, tags, match_all, args.repetitions)
+            for _, tags, match_all in cases
+        ]
+        python_filter = bench_python_filter(engine, [popular, second])
+        with engine.begin() as connection:
+            connection.exec_driver_sql(f"DROP INDEX {INDEX_NAME}")
+        without_index = [
+            bench_filter(engine, tags, match_all, args.repetitions)
+            for _, tags, match_all in cases
+        ]
+        engine.dispose()
+    clear_mappers()
+
+    print(f"deck of {args.cards} cards with {args.tags} tags, ms per page:")
+    print(f"{'filter':<24}{'index':>12}{'no index':>12}")
+    for (name, _, _), indexed, not_indexed in zip(cases, with_index, without_index):
+        print(f"{name:<24}{indexed:>12.2f}{not_indexed:>12.2f}")
+    print(f"{'python (all of 2)':<24}{python_filter:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Writes precompressed variants of the static files ("style.css.gz" and - if the
+package "brotli" is installed - "style.css.br"), which app.static_files sends
+instead of the originals. Run it whenever the static files change (e.g. as a
+step of the deployment), from the project-root:
+
+    python scripts/compress_static.py
+
+Only files that are worth it are compressed: text-formats, not fonts or images
+which are compressed already.
+"""
+
+import gzip
+from pathlib import Path
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+PATH_STATIC = Path(__file__).resolve().parents[1] / "src" / "app" / "static"
+COMPRESSIBLE_SUFFIXES = {".css", ".js", ".svg", ".html", ".json", ".txt"}
+
+
+def compress_file(path: Path) -> list[Path]:
+    data = path.read_bytes()
+    variants = [(path.with_name(path.name + ".gz"), gzip.compress(data, 9, mtime=0))]
+    if brotli is not None:
+        variants.append(
+            (path.with_name(path.name + ".br"), brotli.compress(data, quality=11))
+        )
+    written = []
+    for variant_path, compressed in variants:
+        if len(compressed) < len(data):
+            variant_path.write_bytes(compressed)
+            written.append(variant_path)
+    return written
+
+
+def main() -> None:
+    for path in sorted(PATH_STATIC.rglob("*")):
+        if path.is_file() and path.suffix in COMPRESSIBLE_SUFFIXES:
+            for variant_path in compress_file(path):
+                print(
+                    f"{variant_path.relative_to(PATH_STATIC)}: "
+                    f"{path.stat().st_size} -> {variant_path.stat().st_size} bytes"
+                )
+    if brotli is None:
+        print("(package brotli is not installed: no .br-variants)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""
+Compression of responses: brotli (if the optional package "brotli" is
+installed) or gzip, whichever the client accepts - brotli compresses text
+better at a similar speed.
+
+Small bodies are sent as they are (the compressed ones would hardly be
+smaller), as well as responses that are already encoded (e.g. precompressed
+static files, see app.static_files) or whose media-type is compressed anyway
+(fonts, images). Streamed responses (e.g. the export of all cards) are
+compressed chunk by chunk, each chunk is flushed so the client gets it right
+away.
+
+A strong ETag (see app.conditional_requests) promises byte-identical bodies,
+but the compressed and the identity body of a resource differ. So whenever a
+client accepts an encoding, the ETags of compressible responses are weakened
+("W/..."), also those of 304-responses (which have no body to tell), so the
+validator of a 304 is the one of the 200 the client has.
+"""
+
+import zlib
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # optional, without it only gzip is offered
+    brotli = None
+
+MINIMUM_SIZE = 500
+GZIP_LEVEL = 6
+# 4 is about as fast as gzip level 6 and still compresses better:
+BROTLI_QUALITY = 4
+
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+)
+
+
+def accepted_encodings(accept_encoding: str) -> set[str]:
+    """The encodings of an Accept-Encoding-header, without those with q=0."""
+    encodings = set()
+    for part in accept_encoding.split(","):
+        name, _, parameters = part.partition(";")
+        name = name.strip().lower()
+        quality = parameters.strip().removeprefix("q=")
+        if not name or quality in ("0", "0.0", "0.00", "0.000"):
+            continue
+        encodings.add(name)
+    return encodings
+
+
+def weaken_etag(headers: MutableHeaders) -> None:
+    etag = headers.get("etag")
+    if etag is not None and not etag.startswith("W/"):
+        headers["ETag"] = f"W/{etag}"
+
+
+def choose_encoding(accept_encoding: str) -> str | None:
+    encodings = accepted_encodings(accept_encoding)
+    if brotli is not None and "br" in encodings:
+        return "br"
+    if "gzip" in encodings:
+        return "gzip"
+    return None
+
+
+class _Compressor:
+    def __init__(self, encoding: str) -> None:
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=BROTLI_QUALITY)
+            self._zlib = None
+        else:
+            self._brotli = None
+            # (wbits 16 + MAX_WBITS writes the gzip-format)
+            self._zlib = zlib.compressobj(
+                GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS
+            )
+
+    def compress(self, data: bytes, finish: bool) -> bytes:
+        if self._brotli is not None:
+            result = self._brotli.process(data)
+            return result + (self._brotli.finish() if finish else self._brotli.flush())
+        result = self._zlib.compress(data)
+        return result + self._zlib.flush(zlib.Z_FINISH if finish else zlib.Z_SYNC_FLUSH)
+
+
+class CompressionMiddleware:
+    def __init__(self, app: ASGIApp, minimum_size: int = MINIMUM_SIZE) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        responder = _CompressingResponder(send, encoding, self.minimum_size)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressingResponder:
+    def __init__(self, send: Send, encoding: str, minimum_size: int) -> None:
+        self._send = send
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self._start_message: Message | None = None
+        self._compressor: _Compressor | None = None
+        self._passthrough = False
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            # held back until the first body tells whether to compress:
+            self._start_message = message
+            headers = MutableHeaders(raw=message["headers"])
+            content_type = headers.get("content-type", "")
+            self._passthrough = "content-encoding" in headers or not (
+                content_type.startswith(COMPRESSIBLE_TYPES)
+            )
+            if message["status"] == 304 or not self._passthrough:
+                weaken_etag(headers)
+            return
+        if message["type"] != "http.response.body":
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self._start_message is None:  # a later chunk
+            if self._compressor is not None:
+                message = {
+                    **message,
+                    "body": self._compressor.compress(body, finish=not more_body),
+                }
+            await self._send(message)
+            return
+
+        start_message, self._start_message = self._start_message, None
+        if self._passthrough or (not more_body and len(body) < self.minimum_size):
+            await self._send(start_message)
+            await self._send(message)
+            return
+
+        self._compressor = _Compressor(self.encoding)
+        compressed = self._compressor.compress(body, finish=not more_body)
+        headers = MutableHeaders(raw=start_message["headers"])
+        headers["Content-Encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+        if more_body:
+            del headers["Content-Length"]
+        else:
+            headers["Content-Length"] = str(len(compressed))
+        await self._send(start_message)
+        await self._send({**message, "body": compressed})
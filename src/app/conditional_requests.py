@@ -0,0 +1,65 @@
+"""
+Conditional GET-requests: responses carry a strong ETag built from a version
+the database maintains (see core.db.tables.card_versioning; app.compression
+weakens it for compressed bodies), and the time of the last change as
+Last-Modified. A client that sends them back with
+If-None-Match (or If-Modified-Since) gets "304 Not Modified" as long as the
+version is the same - without loading or serializing any card.
+
+The version has to be read before the data: if a write happens in between,
+the response is newer than its ETag, which only costs the client one more
+full response later (the other way round it would keep a stale copy).
+"""
+
+import datetime
+from email.utils import format_datetime, parsedate_to_datetime
+
+from fastapi import Request, Response, status
+
+from core.domain.card_repository import Version
+
+
+def make_etag(*parts) -> str:
+    return '"' + "-".join(str(part) for part in parts) + '"'
+
+
+def _as_utc(moment: datetime.datetime) -> datetime.datetime:
+    # (SQLite returns the UTC-timestamps of the database without a timezone)
+    if moment.tzinfo is None:
+        return moment.replace(tzinfo=datetime.UTC)
+    return moment.astimezone(datetime.UTC)
+
+
+def validator_headers(etag: str, version: Version) -> dict[str, str]:
+    """
+    The headers to send with the response (also with a 304). The HTML- and the
+    JSON-representation of a URL differ, so caches need to vary on Accept.
+    """
+    return {
+        "ETag": etag,
+        "Last-Modified": format_datetime(_as_utc(version.modified_at), usegmt=True),
+        "Vary": "Accept",
+    }
+
+
+def is_not_modified(request: Request, etag: str, version: Version) -> bool:
+    # If-None-Match wins over If-Modified-Since (RFC 9110, 13.1.3):
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        etags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return etag in etags or "*" in etags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        # (Last-Modified has a precision of seconds)
+        modified_at = _as_utc(version.modified_at).replace(microsecond=0)
+        return modified_at <= _as_utc(since)
+    return False
+
+
+def not_modified_response(headers: dict[str, str]) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
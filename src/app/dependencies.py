@@ -1,7 +1,25 @@
+from sqlalchemy.ext.asyncio import async_sessionmaker
 from sqlalchemy.orm import sessionmaker
 
 import core.db as db
+from core.services.cards.card_answers import AnswerBuffer, answer_buffer
 
 
 def get_session_factory() -> sessionmaker:
     return db.get_session_factory()
+
+
+def get_async_session_factory() -> async_sessionmaker:
+    return db.get_async_session_factory()
+
+
+def get_read_session_factory() -> sessionmaker:
+    return db.get_read_session_factory()
+
+
+def get_async_read_session_factory() -> async_sessionmaker:
+    return db.get_async_read_session_factory()
+
+
+def get_answer_buffer() -> AnswerBuffer:
+    return answer_buffer
@@ -1,20 +1,42 @@
-from pathlib import Path
+from contextlib import asynccontextmanager
 import sys
 
 from fastapi import FastAPI
-from fastapi.staticfiles import StaticFiles
 
-from app.routers import card_router
-import core.db.orm as orm
-
-orm.start_mappers()
-
-PATH_STATIC = Path(__file__).parent / "static"
-
-
-app = FastAPI()
+from app.compression import CompressionMiddleware
+from app.metrics import MetricsMiddleware
+from app.routers import card_router, metrics_router, study_router
+from app.static_files import static_files
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Nothing of the database-setup happens at import-time, the mappers and
+    # engines are set up once the app starts and the pools closed on shutdown:
+    import core.db as db
+    import core.db.orm as orm
+    from core.services.cards.card_answers import AnswerWriter
+    from core.services.unit_of_work import AsyncDbUnitOfWork
+
+    orm.start_mappers()
+    db.init_engines()
+    # writes the statistics of the answers in batches:
+    answer_writer = AnswerWriter(
+        lambda: AsyncDbUnitOfWork(session_factory=db.get_async_session_factory())
+    )
+    answer_writer.start()
+    yield
+    await answer_writer.stop()
+    await db.dispose_engines()
+
+
+app = FastAPI(lifespan=lifespan)
+app.add_middleware(CompressionMiddleware)
+app.add_middleware(MetricsMiddleware)  # (the last one added is the outermost)
 app.include_router(card_router.router)
-app.mount("/static", StaticFiles(directory=PATH_STATIC), name="static")
+app.include_router(study_router.router)
+app.include_router(metrics_router.router)
+app.mount("/static", static_files, name="static")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,270 @@
+"""
+Metrics of the web-app, served in the text-format of Prometheus on GET
+/metrics (see app.routers.metrics_router):
+
+- http_request_duration_seconds: histogram of the latency per method, route
+  and status-code, until the last byte of the response is sent.
+- http_requests_in_flight: the number of requests being handled right now.
+- http_request_sql_statements: histogram of the SQL-statements per request
+  (see core.db.statement_stats), per method and route.
+- http_request_sql_seconds: histogram of the time spent in the database per
+  request, per method and route.
+- db_pool_*: the metrics of the connection-pools of all engines (see
+  core.db.pool), read at the time of scraping.
+
+The route is the path-template (e.g. "/cards/{id_card}"), not the path, so
+the number of label-values stays bounded: static files are recorded with the
+path of their mount, requests that match no route with "<unmatched>".
+
+The package prometheus_client is no dependency, the two metric-types needed
+here are simple enough to be implemented below.
+"""
+
+import bisect
+import logging
+import threading
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+import core.db as db
+import core.db.statement_stats as statement_stats
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", r"\\").replace('"', r"\"").replace("\n", r"\n")
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...]) -> str:
+    if not names:
+        return ""
+    pairs = (f'{name}="{_escape(str(value))}"' for name, value in zip(names, values))
+    return "{" + ",".join(pairs) + "}"
+
+
+class Histogram:
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: tuple[str, ...],
+        buckets: tuple[float, ...],
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.label_names = label_names
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        # label-values -> counts per bucket (the last one is +Inf), sum, count:
+        self._series: dict[tuple[str, ...], tuple[list[int], list[float]]] = {}
+
+    def observe(self, label_values: tuple[str, ...], value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)  # (buckets are "<=")
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = (
+                    [0] * (len(self.buckets) + 1),
+                    [0.0, 0],
+                )
+            counts, totals = series
+            counts[index] += 1
+            totals[0] += value
+            totals[1] += 1
+
+    def render(self) -> list[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} histogram",
+        ]
+        with self._lock:
+            series = sorted(
+                (values, list(counts), list(totals))
+                for values, (counts, totals) in self._series.items()
+            )
+        label_names = (*self.label_names, "le")
+        for values, counts, (total, count) in series:
+            cumulative = 0
+            for bound, bucket_count in zip((*self.buckets, float("inf")), counts):
+                cumulative += bucket_count
+                labels = _format_labels(label_names, (*values, _format_value(bound)))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.label_names, values)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class Gauge:
+    def __init__(self, name: str, documentation: str) -> None:
+        self.name = name
+        self.documentation = documentation
+        self._lock = threading.Lock()
+        self.value = 0
+
+    def inc(self) -> None:
+        with self._lock:
+            self.value += 1
+
+    def dec(self) -> None:
+        with self._lock:
+            self.value -= 1
+
+    def render(self) -> list[str]:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} gauge",
+            f"{self.name} {self.value}",
+        ]
+
+
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Latency of the HTTP-requests.",
+    ("method", "route", "status"),
+    LATENCY_BUCKETS,
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "HTTP-requests being handled.",
+)
+REQUEST_SQL_STATEMENTS = Histogram(
+    "http_request_sql_statements",
+    "SQL-statements executed per HTTP-request.",
+    ("method", "route"),
+    STATEMENT_BUCKETS,
+)
+REQUEST_SQL_SECONDS = Histogram(
+    "http_request_sql_seconds",
+    "Time spent in the database per HTTP-request.",
+    ("method", "route"),
+    LATENCY_BUCKETS,
+)
+
+# key of core.db.pool.PoolMetrics.snapshot() -> name, type and documentation:
+POOL_METRICS = {
+    "checked_out": ("db_pool_checked_out", "gauge", "Connections in use."),
+    "pool_size": ("db_pool_size", "gauge", "Size of the pool."),
+    "overflow": ("db_pool_overflow", "gauge", "Connections beyond the size."),
+    "count_connects": (
+        "db_pool_connects_total",
+        "counter",
+        "Connections opened by the pool.",
+    ),
+    "count_checkouts": (
+        "db_pool_checkouts_total",
+        "counter",
+        "Connections taken from the pool.",
+    ),
+    "count_invalidations": (
+        "db_pool_invalidations_total",
+        "counter",
+        "Connections invalidated.",
+    ),
+    "count_timeouts": (
+        "db_pool_timeouts_total",
+        "counter",
+        "Checkouts that timed out waiting for a connection.",
+    ),
+    "wait_time_total": (
+        "db_pool_wait_seconds_total",
+        "counter",
+        "Time spent waiting for a connection.",
+    ),
+    "wait_time_max": (
+        "db_pool_wait_seconds_max",
+        "gauge",
+        "Longest wait for a connection.",
+    ),
+}
+
+
+def _render_pool_metrics() -> list[str]:
+    snapshots = db.get_pool_metrics()
+    lines = []
+    for key, (name, metric_type, documentation) in POOL_METRICS.items():
+        samples = [
+            f"{name}{_format_labels(('pool',), (pool,))} "
+            f"{_format_value(snapshot[key])}"
+            for pool, snapshot in sorted(snapshots.items())
+            if key in snapshot
+        ]
+        if samples:
+            lines.append(f"# HELP {name} {documentation}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            lines.extend(samples)
+    return lines
+
+
+def render_metrics() -> str:
+    lines = [
+        *REQUEST_DURATION.render(),
+        *REQUESTS_IN_FLIGHT.render(),
+        *REQUEST_SQL_STATEMENTS.render(),
+        *REQUEST_SQL_SECONDS.render(),
+        *_render_pool_metrics(),
+    ]
+    return "\n".join(lines) + "\n"
+
+
+def route_of(scope: Scope) -> str:
+    """The path-template of the route that handled the request."""
+    route = scope.get("route")
+    if route is not None:
+        return route.path
+    if "app_root_path" in scope:  # handled by a mounted app
+        return scope["root_path"].removeprefix(scope["app_root_path"]) or "/"
+    return UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    """
+    Records the metrics of each HTTP-request. Add it as the outermost
+    middleware, so the time of the other middlewares (e.g. compression) is
+    included.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500  # if the app fails before it starts a response
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        REQUESTS_IN_FLIGHT.inc()
+        start = time.perf_counter()
+        with statement_stats.track_statements() as statements:
+            try:
+                await self.app(scope, receive, send_with_status)
+            finally:
+                duration = time.perf_counter() - start
+                REQUESTS_IN_FLIGHT.dec()
+                labels = (scope["method"], route_of(scope))
+                REQUEST_DURATION.observe((*labels, str(status_code)), duration)
+                REQUEST_SQL_STATEMENTS.observe(labels, statements.count)
+                REQUEST_SQL_SECONDS.observe(labels, statements.total_time)
+                logger.debug("%s %s: %s", *labels, statements)
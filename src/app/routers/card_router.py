@@ -1,16 +1,34 @@
-from typing import Any
+from typing import Any, Literal
 
-from fastapi import APIRouter, Depends, HTTPException, Request, status
-from fastapi.responses import RedirectResponse
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    status,
+)
+from fastapi.responses import RedirectResponse, StreamingResponse
 
-from app.dependencies import get_session_factory
+from app.dependencies import (
+    get_answer_buffer,
+    get_async_read_session_factory,
+    get_async_session_factory,
+)
+import app.conditional_requests as conditional
 import app.schemas.card as card_schemas
-from app.templates import templates
+from app.templates import render_template, stream_template
 from core.domain.card import Card
 from core.domain.word_type import WordType
 import core.exceptions as exc
-import core.services.cards.crud as crud
+import core.services.cards.async_crud as crud
+import core.services.cards.card_answers as card_answers
+import core.services.cards.card_export as card_export
+import core.services.cards.card_import as card_import
 import core.services.unit_of_work as uow
+from core.utils.pagination import Cursor
+from core.utils.streaming import iter_lines
 
 
 router = APIRouter()
@@ -23,7 +41,7 @@ router = APIRouter()
 )
 async def create_card(
     request: Request,
-    session_factory=Depends(get_session_factory),
+    session_factory=Depends(get_async_session_factory),
 ) -> Any:
     try:
         # manually validate input depending on content-type:
@@ -31,9 +49,9 @@ async def create_card(
             # process JSON-body:
             input_data = await request.json()
             card_input = card_schemas.PydCardInput(**input_data)
-            new_domain_card = crud.create_card_in_db(
+            new_domain_card = await crud.create_card_in_db(
                 **card_input.model_dump(),
-                uow=uow.DbUnitOfWork(session_factory=session_factory),
+                uow=uow.AsyncDbUnitOfWork(session_factory=session_factory),
             )
             return card_schemas.convert_to_pydantic(new_domain_card)
         else:
@@ -41,16 +59,16 @@ async def create_card(
             input_data = await request.form()
             _method = input_data.get("_method")
             if _method == "PUT":
-                update_card(
+                await update_card(
                     id_card=int(input_data.get("id_card")),
                     card_input=card_schemas.PydCardInput(**input_data),
                     session_factory=session_factory,
                 )
             else:
                 card_input = card_schemas.PydCardInput(**input_data)
-                new_domain_card = crud.create_card_in_db(
+                new_domain_card = await crud.create_card_in_db(
                     **card_input.model_dump(),
-                    uow=uow.DbUnitOfWork(session_factory=session_factory),
+                    uow=uow.AsyncDbUnitOfWork(session_factory=session_factory),
                 )
             return RedirectResponse(url="/cards", status_code=303)
             # (change status-code to change from POST- to GET-request.)
@@ -61,41 +79,148 @@ async def create_card(
         )
 
 
+@router.post(
+    "/cards/import",
+    response_model=card_schemas.PydCardImportResult,
+)
+async def import_cards(
+    request: Request,
+    session_factory=Depends(get_async_session_factory),
+) -> Any:
+    """
+    Imports cards from the body, which is processed as a stream: either CSV
+    with the header "word_type,relevance_id,german,italian" or NDJSON with one
+    object with these keys per line. Rows with errors (e.g. duplicates) are
+    returned with their line-number, all other rows are imported.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    if content_type == "text/csv":
+        iter_rows = card_import.iter_csv_rows
+    elif content_type in ("application/x-ndjson", "application/ndjson"):
+        iter_rows = card_import.iter_ndjson_rows
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Expected text/csv or application/x-ndjson.",
+        )
+    result = await card_import.import_cards_in_db(
+        rows=iter_rows(iter_lines(request.stream())),
+        uow=uow.AsyncDbUnitOfWork(session_factory=session_factory),
+    )
+    return card_schemas.convert_import_result_to_pydantic(result)
+
+
 @router.get("/cards", response_model=list[card_schemas.PydCardResponse])
-def read_cards(
+async def read_cards(
     request: Request,
-    session_factory=Depends(get_session_factory),
+    session_factory=Depends(get_async_read_session_factory),
     page: int = 1,
     page_size: int = 100,
+    cursor: str | None = None,
+    search: str | None = None,
+    tag: list[str] = Query(default=[]),
+    tag_mode: Literal["all", "any"] = "all",
 ) -> Any:
     """
     read_cards always works with pagination!
+
+    Two modes: by default with page-numbers, or - once the parameter "cursor"
+    is given (empty for the first page) - with keyset-pagination. Then the
+    cursor of the next page is returned in the header "X-Next-Cursor".
+
+    With a (non-empty) parameter "search" only matching cards are returned,
+    ranked by the full-text-search, page by page. Otherwise, with one or more
+    parameters "tag" only cards with all of these tags are returned (or with
+    any of them for tag_mode=any).
+
+    Only the HTML-view shows the number of pages, the JSON-API doesn't need
+    the cards to be counted.
+
+    The ETag changes with every write of a card (see app.conditional_requests).
     """
-    result = crud.read_cards_from_db(
-        uow=uow.DbUnitOfWork(session_factory=session_factory),
-        page=page,
-        page_size=page_size,
+    accept = request.headers.get("accept")
+    wants_html = bool(accept and "text/html" in accept)
+    read_uow = uow.AsyncDbUnitOfWork(
+        session_factory=session_factory,
+        read_only=True,
     )
+    validators = {}
+    deck_version = await crud.read_deck_version_from_db(uow=read_uow)
+    if deck_version:
+        etag = conditional.make_etag(
+            "deck",
+            deck_version.version,
+            "html" if wants_html else "json",
+        )
+        validators = conditional.validator_headers(etag, deck_version)
+        if conditional.is_not_modified(request, etag, deck_version):
+            return conditional.not_modified_response(validators)
 
-    accept = request.headers.get("accept")
-    if accept and "text/html" in accept:
-        return templates.TemplateResponse(
+    headers = dict(validators)
+    if search and search.strip():
+        result = await crud.search_cards_in_db(
+            query=search,
+            uow=read_uow,
+            page=page,
+            page_size=page_size,
+        )
+    elif tag:
+        result = await crud.filter_cards_by_tags_in_db(
+            tags=tag,
+            uow=read_uow,
+            match_all=tag_mode == "all",
+            page=page,
+            page_size=page_size,
+        )
+    elif cursor is None:
+        result = await crud.read_cards_from_db(
+            uow=read_uow,
+            page=page,
+            page_size=page_size,
+            with_count=wants_html,
+        )
+    else:
+        try:
+            decoded_cursor = Cursor.decode(cursor) if cursor else None
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor.",
+            )
+        result = await crud.read_cards_after_cursor_from_db(
+            uow=read_uow,
+            cursor=decoded_cursor,
+            page_size=page_size,
+        )
+        if result.next_cursor:
+            headers["X-Next-Cursor"] = result.next_cursor
+
+    if wants_html:
+        return stream_template(
             request=request,
             name="cards/cards.html",
             context={
                 "pagination_result": result,
+                "last_search": search or "",
+                "last_tags": tag,
+                "last_tag_mode": tag_mode,
             },
+            headers=headers,
         )
     else:
-        result.serialize_records(card_schemas.convert_to_pydantic)
-        return result.records
+        # (returned as a Response, so FastAPI doesn't validate it once more)
+        return Response(
+            content=card_schemas.dump_cards_json(result.records),
+            media_type="application/json",
+            headers=headers,
+        )
 
 
 @router.get("/cards/new")
-def new_card(request: Request):
+async def new_card(request: Request):
     accept = request.headers.get("accept")
     if accept and "text/html" in accept:
-        return templates.TemplateResponse(
+        return await render_template(
             request=request,
             name="cards/card.html",
             context={
@@ -110,29 +235,106 @@ def new_card(request: Request):
         )
 
 
+@router.get("/cards/fuzzy", response_model=list[card_schemas.PydCardMatch])
+async def fuzzy_search_cards(
+    query: str,
+    limit: int = 10,
+    session_factory=Depends(get_async_read_session_factory),
+) -> Any:
+    """
+    Typo-tolerant lookup of cards by their german or italian, the most similar
+    cards first.
+    """
+    matches = await crud.fuzzy_search_cards_in_db(
+        query=query,
+        uow=uow.AsyncDbUnitOfWork(
+            session_factory=session_factory,
+            read_only=True,
+        ),
+        limit=limit,
+    )
+    return [
+        card_schemas.PydCardMatch(
+            card=card_schemas.convert_to_pydantic(card),
+            similarity=similarity,
+        )
+        for card, similarity in matches
+    ]
+
+
+@router.get("/cards/export")
+async def export_cards(
+    format: Literal["ndjson", "csv"] = "ndjson",
+    session_factory=Depends(get_async_read_session_factory),
+) -> StreamingResponse:
+    """
+    Streams all cards in the format of POST /cards/import, so an export can be
+    imported again.
+    """
+    read_uow = uow.AsyncDbUnitOfWork(
+        session_factory=session_factory,
+        read_only=True,
+    )
+    if format == "csv":
+        content = card_export.export_cards_as_csv(uow=read_uow)
+        media_type = "text/csv"
+    else:
+        content = card_export.export_cards_as_ndjson(uow=read_uow)
+        media_type = "application/x-ndjson"
+    return StreamingResponse(
+        content,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="cards.{format}"'},
+    )
+
+
 @router.get("/cards/{id_card}", response_model=card_schemas.PydCardResponse)
-def read_card(
+async def read_card(
     request: Request,
     id_card: int,
-    session_factory=Depends(get_session_factory),
+    response: Response,
+    session_factory=Depends(get_async_read_session_factory),
 ) -> Any:
+    accept = request.headers.get("accept")
+    wants_html = bool(accept and "text/html" in accept)
+    read_uow = uow.AsyncDbUnitOfWork(
+        session_factory=session_factory,
+        read_only=True,
+    )
+    validators = {}
+    card_version = await crud.read_card_version_from_db(
+        id_card=id_card,
+        uow=read_uow,
+    )
+    if card_version:
+        etag = conditional.make_etag(
+            "card",
+            id_card,
+            card_version.version,
+            "html" if wants_html else "json",
+        )
+        validators = conditional.validator_headers(etag, card_version)
+        if conditional.is_not_modified(request, etag, card_version):
+            return conditional.not_modified_response(validators)
+
     try:
-        domain_card = crud.read_card_from_db(
+        domain_card = await crud.read_card_from_db(
             id_card=id_card,
-            uow=uow.DbUnitOfWork(session_factory=session_factory),
+            uow=read_uow,
         )
 
-        accept = request.headers.get("accept")
-        if accept and "text/html" in accept:
-            return templates.TemplateResponse(
+        if wants_html:
+            return await render_template(
                 request=request,
                 name="cards/card.html",
                 context={
                     "word_type_enum": WordType,
                     "card": domain_card,
                 },
+                headers=validators,
             )
         else:
+            response.headers.update(validators)
             return card_schemas.convert_to_pydantic(domain_card)
     except exc.ResourceNotFoundError:
         raise HTTPException(
@@ -141,17 +343,51 @@ def read_card(
         )
 
 
+@router.post(
+    "/cards/{id_card}/answer",
+    response_model=card_schemas.PydAnswerResult,
+)
+async def answer_card(
+    id_card: int,
+    answer_input: card_schemas.PydAnswerInput,
+    session_factory=Depends(get_async_read_session_factory),
+    answer_buffer=Depends(get_answer_buffer),
+) -> Any:
+    """
+    Checks the guess and records the answer in the statistics of the card.
+    They are written in batches (see core.services.cards.card_answers), so
+    the card doesn't show the answer right away.
+    """
+    try:
+        result = await card_answers.answer_card(
+            id_card=id_card,
+            solve_italian=answer_input.solve_italian,
+            guess=answer_input.guess,
+            uow=uow.AsyncDbUnitOfWork(
+                session_factory=session_factory,
+                read_only=True,
+            ),
+            buffer=answer_buffer,
+        )
+        return card_schemas.convert_answer_result_to_pydantic(result)
+    except exc.ResourceNotFoundError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Card not found.",
+        )
+
+
 @router.put("/cards/{id_card}", response_model=card_schemas.PydCardResponse)
-def update_card(
+async def update_card(
     id_card: int,
     card_input: card_schemas.PydCardInput,
-    session_factory=Depends(get_session_factory),
+    session_factory=Depends(get_async_session_factory),
 ) -> Any:
     try:
-        updated_domain_card = crud.update_card_in_db(
+        updated_domain_card = await crud.update_card_in_db(
             id_card=id_card,
             **card_input.model_dump(),
-            uow=uow.DbUnitOfWork(session_factory=session_factory),
+            uow=uow.AsyncDbUnitOfWork(session_factory=session_factory),
         )
         return card_schemas.convert_to_pydantic(updated_domain_card)
     except exc.ResourceNotFoundError:
@@ -162,14 +398,14 @@ def update_card(
 
 
 @router.delete("/cards/{id_card}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_card(
+async def delete_card(
     id_card: int,
-    session_factory=Depends(get_session_factory),
+    session_factory=Depends(get_async_session_factory),
 ):
     try:
-        crud.delete_card_in_db(
+        await crud.delete_card_in_db(
             id_card=id_card,
-            uow=uow.DbUnitOfWork(session_factory=session_factory),
+            uow=uow.AsyncDbUnitOfWork(session_factory=session_factory),
         )
     except exc.ResourceNotFoundError:
         raise HTTPException(
@@ -0,0 +1,13 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+import app.metrics as metrics
+
+
+router = APIRouter()
+
+
+@router.get("/metrics", include_in_schema=False)
+async def read_metrics() -> PlainTextResponse:
+    """The metrics of the app for Prometheus, see app.metrics."""
+    return PlainTextResponse(metrics.render_metrics(), media_type=metrics.CONTENT_TYPE)
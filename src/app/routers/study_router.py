@@ -0,0 +1,29 @@
+from typing import Any
+
+from fastapi import APIRouter, Depends, Query
+
+from app.dependencies import get_answer_buffer, get_async_read_session_factory
+import app.schemas.card as card_schemas
+import core.services.cards.study as study
+import core.services.unit_of_work as uow
+
+
+router = APIRouter()
+
+
+@router.get("/study/next", response_model=list[card_schemas.PydStudyCard])
+async def read_next_cards_to_study(
+    n: int = Query(default=20, ge=1, le=study.MAX_NEXT_CARDS),
+    session_factory=Depends(get_async_read_session_factory),
+    answer_buffer=Depends(get_answer_buffer),
+) -> Any:
+    """
+    The next n cards to study: the ones due the longest. Answer them with
+    POST /cards/{id_card}/answer, that decides when they are due again.
+    """
+    cards = await study.read_next_cards_to_study(
+        n=n,
+        uow=uow.AsyncDbUnitOfWork(session_factory=session_factory, read_only=True),
+        buffer=answer_buffer,
+    )
+    return [card_schemas.convert_to_pydantic_study_card(card) for card in cards]
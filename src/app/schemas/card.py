@@ -1,8 +1,13 @@
+import datetime
+
 from pydantic import BaseModel
+from pydantic_core import to_json
 
 import app.schemas.relevance as relevance_schemas
 from core.domain.card import Card
 from core.domain.word_type import WordType
+from core.services.cards.card_answers import AnswerResult
+from core.services.cards.card_import import ImportResult
 
 
 class PydCardInput(BaseModel):
@@ -27,6 +32,36 @@ class PydCard(BaseModel):
     italian: str
 
 
+class PydCardMatch(BaseModel):
+    card: PydCard
+    similarity: float
+
+
+class PydImportRowError(BaseModel):
+    line: int
+    error: str
+
+
+class PydCardImportResult(BaseModel):
+    count_imported: int
+    errors: list[PydImportRowError]
+
+
+class PydAnswerInput(BaseModel):
+    solve_italian: bool = True  # the guess is the italian word
+    guess: str
+
+
+class PydAnswerResult(BaseModel):
+    correct: bool
+    solution: str
+
+
+class PydStudyCard(PydCard):
+    box: int
+    due_at: datetime.datetime
+
+
 def convert_to_pydantic(card: Card) -> PydCard:
     pyd_relevance = relevance_schemas.convert_to_pydantic(card.relevance)
     return PydCard(
@@ -38,6 +73,43 @@ def convert_to_pydantic(card: Card) -> PydCard:
     )
 
 
+def convert_to_pydantic_study_card(card: Card) -> PydStudyCard:
+    return PydStudyCard(
+        **convert_to_pydantic(card).model_dump(),
+        box=card.box,
+        due_at=card.due_at,
+    )
+
+
+def dump_cards_json(cards: list[Card]) -> bytes:
+    """
+    The cards as the JSON of list[PydCardResponse], for long lists of cards:
+    instead of building (and validating) a PydCard per card, which FastAPI
+    then validates once more against the response-model before encoding it,
+    the (already valid) domain-cards are turned into plain dicts and encoded
+    by pydantic's encoder in one go. Each relevance is only converted once.
+    """
+    relevances = {}
+    records = []
+    for card in cards:
+        relevance = card.relevance
+        pyd_relevance = relevances.get(relevance.id)
+        if pyd_relevance is None:
+            pyd_relevance = relevances[relevance.id] = {
+                "id": relevance.id,
+                "description": relevance.description,
+            }
+        records.append(
+            {
+                "word_type": card.word_type.value,
+                "relevance": pyd_relevance,
+                "german": card.german,
+                "italian": card.italian,
+            }
+        )
+    return to_json(records)
+
+
 def convert_to_domain(pyd_card: PydCard) -> Card:
     relevance = relevance_schemas.convert_to_domain(pyd_card.relevance)
     return Card(
@@ -48,3 +120,17 @@ def convert_to_domain(pyd_card: PydCard) -> Card:
         german=pyd_card.german,
         italian=pyd_card.italian,
     )
+
+
+def convert_import_result_to_pydantic(result: ImportResult) -> PydCardImportResult:
+    return PydCardImportResult(
+        count_imported=result.count_imported,
+        errors=[
+            PydImportRowError(line=row_error.line, error=row_error.error)
+            for row_error in result.errors
+        ],
+    )
+
+
+def convert_answer_result_to_pydantic(result: AnswerResult) -> PydAnswerResult:
+    return PydAnswerResult(correct=result.correct, solution=result.solution)
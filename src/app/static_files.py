@@ -0,0 +1,123 @@
+"""
+Static files (CSS, fonts) with fingerprinted URLs and precompressed variants.
+
+The templates link static files via static_url("css/style.css"), which puts a
+hash of the file's content into the URL ("/static/css/style.<hash>.css"). Such
+a URL never changes its content, so browsers may cache it for a year without
+asking again ("immutable") - a changed file gets a new URL. Requests without
+(or with an outdated) fingerprint are still served, but have to be revalidated.
+
+If a file has a precompressed variant next to it ("style.css.br" or
+"style.css.gz", see scripts/compress_static.py) and the client accepts that
+encoding, the variant is sent instead, so nothing has to be compressed per
+request.
+"""
+
+import hashlib
+import os
+from pathlib import Path
+import re
+import threading
+
+import anyio
+from starlette.datastructures import Headers
+from starlette.responses import Response
+from starlette.staticfiles import StaticFiles
+from starlette.types import Scope
+
+from app.compression import accepted_encodings
+
+PATH_STATIC = Path(__file__).parent / "static"
+URL_PREFIX = "/static"
+
+CACHE_IMMUTABLE = "public, max-age=31536000, immutable"
+CACHE_REVALIDATE = "no-cache"
+
+FINGERPRINT_LENGTH = 10
+_FINGERPRINTED_PATH = re.compile(
+    rf"^(?P<stem>.+)\.(?P<fingerprint>[0-9a-f]{{{FINGERPRINT_LENGTH}}})"
+    r"(?P<suffix>\.[A-Za-z0-9]+)$"
+)
+
+# encoding and file-suffix of the precompressed variants, the best first:
+PRECOMPRESSED_VARIANTS = [("br", ".br"), ("gzip", ".gz")]
+
+
+def split_fingerprint(path: str) -> tuple[str, str | None]:
+    """Returns the path without its fingerprint, and the fingerprint."""
+    match = _FINGERPRINTED_PATH.match(path)
+    if not match:
+        return (path, None)
+    return (match["stem"] + match["suffix"], match["fingerprint"])
+
+
+class FingerprintedStaticFiles(StaticFiles):
+    def __init__(self, directory: Path) -> None:
+        super().__init__(directory=directory)
+        self._lock = threading.Lock()
+        # path -> (mtime, size, fingerprint), recomputed once the file changes:
+        self._fingerprints: dict[str, tuple[int, int, str]] = {}
+
+    def fingerprint(self, path: str) -> str | None:
+        full_path, stat_result = self.lookup_path(path)
+        if stat_result is None:
+            return None
+        key = (stat_result.st_mtime_ns, stat_result.st_size)
+        with self._lock:
+            cached = self._fingerprints.get(path)
+        if cached and cached[:2] == key:
+            return cached[2]
+        with open(full_path, "rb") as file:
+            fingerprint = hashlib.sha256(file.read()).hexdigest()[:FINGERPRINT_LENGTH]
+        with self._lock:
+            self._fingerprints[path] = (*key, fingerprint)
+        return fingerprint
+
+    def url(self, path: str) -> str:
+        """URL of the static file at the path (relative to the directory)."""
+        fingerprint = self.fingerprint(path)
+        if fingerprint is None:
+            return f"{URL_PREFIX}/{path}"
+        stem, suffix = os.path.splitext(path)
+        return f"{URL_PREFIX}/{stem}.{fingerprint}{suffix}"
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        path, fingerprint = split_fingerprint(path)
+        response = await self._precompressed_response(path, scope)
+        if response is None:
+            response = await super().get_response(path, scope)
+
+        headers = response.headers
+        current = await anyio.to_thread.run_sync(self.fingerprint, path)
+        if fingerprint is not None and fingerprint == current:
+            headers["Cache-Control"] = CACHE_IMMUTABLE
+        else:
+            headers["Cache-Control"] = CACHE_REVALIDATE
+        headers.add_vary_header("Accept-Encoding")
+        return response
+
+    async def _precompressed_response(
+        self,
+        path: str,
+        scope: Scope,
+    ) -> Response | None:
+        if scope["method"] not in ("GET", "HEAD"):
+            return None
+        encodings = accepted_encodings(Headers(scope=scope).get("accept-encoding", ""))
+        for encoding, suffix in PRECOMPRESSED_VARIANTS:
+            if encoding not in encodings:
+                continue
+            full_path, stat_result = await anyio.to_thread.run_sync(
+                self.lookup_path, path + suffix
+            )
+            if stat_result is None:
+                continue
+            # (the media-type is guessed from "style.css" of "style.css.br")
+            response = self.file_response(full_path, stat_result, scope)
+            if response.status_code == 200:
+                response.headers["Content-Encoding"] = encoding
+            return response
+        return None
+
+
+static_files = FingerprintedStaticFiles(directory=PATH_STATIC)
@@ -1,7 +1,99 @@
-from fastapi.templating import Jinja2Templates
+"""
+The Jinja-environment of the HTML-views and how templates are rendered.
 
+- The compiled templates are kept in a bytecode-cache on disk (in the temp-
+  directory), so a new process doesn't have to compile them again.
+- Deployed (USE_DB "production" or "stage") the templates don't change, so
+  Jinja doesn't check their files for changes on every use (auto-reload).
+- Templates are rendered asynchronously (enable_async), which is why the
+  routers use render_template() and stream_template() instead of Starlette's
+  TemplateResponse (that renders synchronously).
+
+stream_template() sends a page while it is rendered, in chunks of at least
+STREAM_CHUNK_SIZE characters: the head of a long table of cards arrives at
+once and the page is never built as one big string in memory.
+"""
+
+from collections.abc import AsyncIterator, Mapping
+from functools import cache
 from pathlib import Path
+from typing import Any
+
+from fastapi import Request
+from fastapi.responses import HTMLResponse, StreamingResponse
+import jinja2
+
+from app.static_files import static_files
+from core.db import get_use_db
 
 PATH_TEMPLATES = Path(__file__).parent
-templates = Jinja2Templates(directory=PATH_TEMPLATES)
-# this object is used in the routers to locate the templates in the filesystem
+DEPLOYED_TARGETS = ("production", "stage")
+STREAM_CHUNK_SIZE = 8192
+
+
+def is_deployed() -> bool:
+    return get_use_db() in DEPLOYED_TARGETS
+
+
+@cache
+def get_environment() -> jinja2.Environment:
+    """
+    Created on the first render, not at import-time: whether the app is
+    deployed depends on USE_DB (see core.db.get_use_db), which must not be
+    read before the app starts.
+    """
+    environment = jinja2.Environment(
+        loader=jinja2.FileSystemLoader(PATH_TEMPLATES),
+        autoescape=True,
+        auto_reload=not is_deployed(),
+        bytecode_cache=jinja2.FileSystemBytecodeCache(),
+        enable_async=True,
+    )
+    environment.globals["static_url"] = static_files.url
+    return environment
+
+
+def _template_context(request: Request, context: Mapping[str, Any]) -> dict:
+    return {"request": request, **context}
+
+
+async def render_template(
+    request: Request,
+    name: str,
+    context: Mapping[str, Any],
+    status_code: int = 200,
+    headers: Mapping[str, str] | None = None,
+) -> HTMLResponse:
+    template = get_environment().get_template(name)
+    content = await template.render_async(_template_context(request, context))
+    return HTMLResponse(content, status_code=status_code, headers=headers)
+
+
+async def _iter_chunks(parts: AsyncIterator[str]) -> AsyncIterator[str]:
+    # (Jinja yields a part per piece of markup, sending each would be wasteful)
+    chunk = []
+    size = 0
+    async for part in parts:
+        chunk.append(part)
+        size += len(part)
+        if size >= STREAM_CHUNK_SIZE:
+            yield "".join(chunk)
+            chunk = []
+            size = 0
+    if chunk:
+        yield "".join(chunk)
+
+
+def stream_template(
+    request: Request,
+    name: str,
+    context: Mapping[str, Any],
+    headers: Mapping[str, str] | None = None,
+) -> StreamingResponse:
+    template = get_environment().get_template(name)
+    parts = template.generate_async(_template_context(request, context))
+    return StreamingResponse(
+        _iter_chunks(parts),
+        media_type="text/html; charset=utf-8",
+        headers=headers,
+    )
@@ -1,10 +1,33 @@
+from functools import cache
 import logging
 import os
 from typing import Generator
 
-from sqlalchemy import Connection, Engine, MetaData, URL, create_engine, StaticPool
+from sqlalchemy import (
+    Connection,
+    Engine,
+    MetaData,
+    URL,
+    create_engine,
+    AsyncAdaptedQueuePool,
+    QueuePool,
+    StaticPool,
+)
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.orm import sessionmaker, Session
 
+import core.db.pool as db_pool
+import core.db.statement_stats as statement_stats
+from core.db.sqlite_profile import (
+    PRODUCTION_PROFILE,
+    READ_ONLY_PROFILE,
+    apply_sqlite_profile,
+)
+
 """
 This module provides basic database-access for all other modules of the
 application via SqlAlchemy.
@@ -14,7 +37,15 @@ used tables. Then depending on the configuration-file connection-URLs are
 constructed and stored in module-level variables.
 
 Finally we provide functions to get a SqlAlchemy-Session and a SqlAlchemy-
-Connection as our basic entry-points for DB-access with SqlAlchemy.
+Connection as our basic entry-points for DB-access with SqlAlchemy. For the
+web-app there is an async counterpart of the session-factory which is based on
+SqlAlchemy's asyncio-extension (same database, but async drivers).
+
+Importing this module has no side-effects: the environment is read, and
+engines and session-factories are created on first use only. Engines are
+cached in a registry keyed by their URL, so each database gets exactly one
+engine (and one connection-pool) per process. The web-app creates them
+upfront in its lifespan and disposes them on shutdown.
 
 -------------------------------------------------------------------------------
 
@@ -67,77 +98,296 @@ Example usage for a session (with ORM): ---------------------------------------
 
 # 1) setup the database metadata: ---------------------------------------------
 
-
-metadata = MetaData()
-import core.db.tables  # ensures that all tables are loaded into the metadata.
+# The tables are loaded into the metadata-object on first access of
+# "core.db.metadata" (see __getattr__ at the end of this module), so importing
+# core.db alone doesn't need to build them.
+_metadata = MetaData()
 
 
 # 2) setup the database-URL-objects: ------------------------------------------
 
-_db_host = os.environ.get("DB_HOST", "localhost")
-_db_port = os.environ.get("DB_PORT", 5432)
-_db_name_stage = os.environ.get("DB_NAME_STAGE", "")
-_db_user = os.environ.get("DB_USER", "")
-_db_password = os.environ.get("DB_PASSWORD", "")
-
-URL_OBJECT_PROD = URL.create(drivername="sqlite", database="production.db")
-URL_OBJECT_STAGE = URL.create(
-    drivername="postgresql+psycopg",
-    host=_db_host,
-    port=int(_db_port),
-    database=_db_name_stage,
-    username=_db_user,
-    password=_db_password,
-)
-URL_OBJECT_UNIT_TESTS_LOCAL_DB = URL.create(drivername="sqlite", database="tests/pytest.db")
-URL_OBJECT_UNIT_TESTS_IN_MEMORY = URL.create(drivername="sqlite", database=":memory:")
-
-CONNECTION_URLS = {
-    "production": URL_OBJECT_PROD,
-    "stage": URL_OBJECT_STAGE,
-    "local_db_unit_tests": URL_OBJECT_UNIT_TESTS_LOCAL_DB,
-    "in_memory_db_unit_tests": URL_OBJECT_UNIT_TESTS_IN_MEMORY,
+
+@cache
+def _get_connection_urls() -> dict[str, URL]:
+    db_host = os.environ.get("DB_HOST", "localhost")
+    db_port = os.environ.get("DB_PORT", 5432)
+    db_name_stage = os.environ.get("DB_NAME_STAGE", "")
+    db_user = os.environ.get("DB_USER", "")
+    db_password = os.environ.get("DB_PASSWORD", "")
+    db_host_read = os.environ.get("DB_HOST_READ", db_host)  # e.g. a replica
+
+    url_object_prod = URL.create(drivername="sqlite", database="production.db")
+    url_object_prod_read = URL.create(  # same file, but read-only connections
+        drivername="sqlite",
+        database="file:production.db",
+        query={"mode": "ro", "uri": "true"},
+    )
+    url_object_stage = URL.create(
+        drivername="postgresql+psycopg",
+        host=db_host,
+        port=int(db_port),
+        database=db_name_stage,
+        username=db_user,
+        password=db_password,
+    )
+    url_object_stage_read = url_object_stage.set(host=db_host_read)
+    url_object_unit_tests_local_db = URL.create(
+        drivername="sqlite",
+        database="tests/pytest.db",
+    )
+    url_object_unit_tests_in_memory = URL.create(
+        drivername="sqlite",
+        database=":memory:",
+    )
+
+    return {
+        "production": url_object_prod,
+        "production_read": url_object_prod_read,
+        "stage": url_object_stage,
+        "stage_read": url_object_stage_read,
+        "local_db_unit_tests": url_object_unit_tests_local_db,
+        "in_memory_db_unit_tests": url_object_unit_tests_in_memory,
+    }
+
+
+# the asyncio-extension needs an async driver, psycopg supports both modes
+# with the same drivername, for SQLite we switch to aiosqlite:
+ASYNC_DRIVERNAMES = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql+psycopg": "postgresql+psycopg",
 }
 
-# 3) setup engine and sessionmaker: -------------------------------------------
 
-_use_db = os.environ.get("USE_DB", "local_db_unit_tests")
+def to_async_url(url_object: URL) -> URL:
+    return url_object.set(drivername=ASYNC_DRIVERNAMES[url_object.drivername])
 
-if _use_db not in CONNECTION_URLS:
-    raise ValueError(f'Value "{_use_db}" is not allowed for param "USE_DB"!')
+
+# Targets that have a separate database (or replica) for read-only use cases.
+# The read-URLs are part of CONNECTION_URLS as well, so they can be used in
+# scripts and tests like all the others. Targets without an entry here read
+# from their normal database.
+READ_URL_KEYS = {
+    "production": "production_read",
+    "stage": "stage_read",
+}
+
+# SQLite-databases that get a tuned connection-profile (see
+# core.db.sqlite_profile), the other ones keep SQLite's defaults:
+SQLITE_PROFILES = {
+    "production": PRODUCTION_PROFILE,
+    "production_read": READ_ONLY_PROFILE,
+}
+
+# Reading doesn't need transactions, so the read-engines skip the
+# BEGIN/COMMIT/ROLLBACK-bookkeeping completely:
+ENGINE_OPTIONS = {
+    "production_read": {"isolation_level": "AUTOCOMMIT"},
+    "stage_read": {"isolation_level": "AUTOCOMMIT"},
+}
+
+
+# 3) setup engine and sessionmaker: -------------------------------------------
 
 logger = logging.getLogger(__name__)
-logger.info(f"using database: {_use_db}")
 
-_url_object = CONNECTION_URLS[_use_db]
 
-if _use_db == "in_memory_db_unit_tests":
-    _engine = create_engine(
-        "sqlite://",
-        connect_args={"check_same_thread": False},
-        poolclass=StaticPool,
-        echo=True,
+@cache
+def get_use_db() -> str:
+    use_db = os.environ.get("USE_DB", "local_db_unit_tests")
+    if use_db not in _get_connection_urls() or use_db in READ_URL_KEYS.values():
+        raise ValueError(f'Value "{use_db}" is not allowed for param "USE_DB"!')
+    logger.info(f"using database: {use_db}")
+    return use_db
+
+
+# the registry of all engines created in this process, keyed by their URL and
+# the options they were created with:
+_engines: dict[tuple, Engine | AsyncEngine] = {}
+
+
+def _registry_key(kind: str, url_object: URL, echo: bool, kwargs: dict) -> tuple:
+    return (kind, url_object, echo, _freeze(kwargs))
+
+
+def _freeze(value):
+    # engine-options may be nested (e.g. connect_args), but the key of the
+    # registry must be hashable:
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    if isinstance(value, (set, frozenset)):
+        return frozenset(_freeze(item) for item in value)
+    try:
+        hash(value)
+    except TypeError:
+        raise TypeError(
+            f"Engine-option {value!r} is not hashable, so the engine can't be"
+            " cached."
+        ) from None
+    return value
+
+# the pool-settings come from the environment (see core.db.pool), the metrics
+# are collected via pool-events and can be read with get_pool_metrics():
+_pool_metrics: dict[str, db_pool.PoolMetrics] = {}
+
+
+def _engine_kwargs(url_key: str, pool_class, metrics, kwargs: dict) -> dict:
+    engine_kwargs = dict(ENGINE_OPTIONS.get(url_key, {}))
+    if "poolclass" not in kwargs:
+        engine_kwargs["poolclass"] = db_pool.timed_pool_class(pool_class, metrics)
+        engine_kwargs.update(db_pool.get_pool_settings(url_key).as_engine_kwargs())
+    engine_kwargs.update(kwargs)
+    return engine_kwargs
+
+
+def echo_from_env() -> bool:
+    """
+    Logging every statement (SqlAlchemy's "echo") is expensive, so it is off
+    unless switched on with the environment-variable "DB_ECHO".
+    """
+    return os.environ.get("DB_ECHO", "").strip().lower() in ("1", "true", "yes", "on")
+
+
+def get_engine(url_key: str, echo: bool | None = None, **kwargs) -> Engine:
+    """
+    Returns the engine for the given key of CONNECTION_URLS, it is created on
+    the first call and cached for all further calls with the same options.
+    Without an explicit echo it is taken from the environment (echo_from_env).
+    """
+    if echo is None:
+        echo = echo_from_env()
+    url_object = _get_connection_urls()[url_key]
+    registry_key = _registry_key("sync", url_object, echo, kwargs)
+    if registry_key in _engines:
+        return _engines[registry_key]
+
+    metrics = _pool_metrics.setdefault(url_key, db_pool.PoolMetrics(url_key))
+    if url_key == "in_memory_db_unit_tests":
+        engine = create_engine(
+            "sqlite://",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+            echo=echo,
+        )
+    else:
+        engine = create_engine(
+            url_object,
+            echo=echo,
+            **_engine_kwargs(url_key, QueuePool, metrics, kwargs),
+        )
+    db_pool.instrument_pool(engine, metrics)
+    statement_stats.instrument_statements(
+        engine, statement_stats.get_slow_query_threshold(url_key)
     )
-else:
-    _engine = create_engine(_url_object, echo=False)
-_SessionFactory = sessionmaker(bind=_engine)
+    if url_key in SQLITE_PROFILES:
+        apply_sqlite_profile(engine, SQLITE_PROFILES[url_key])
+    _engines[registry_key] = engine
+    return engine
+
+
+def get_async_engine(
+    url_key: str,
+    echo: bool | None = None,
+    **kwargs,
+) -> AsyncEngine:
+    """Async counterpart of get_engine()."""
+    if echo is None:
+        echo = echo_from_env()
+    url_object = to_async_url(_get_connection_urls()[url_key])
+    registry_key = _registry_key("async", url_object, echo, kwargs)
+    if registry_key in _engines:
+        return _engines[registry_key]
+
+    metrics_name = f"{url_key}_async"
+    metrics = _pool_metrics.setdefault(
+        metrics_name, db_pool.PoolMetrics(metrics_name)
+    )
+    if url_key == "in_memory_db_unit_tests":
+        # watch out: this is a second in-memory database, it does not share
+        # any data with the sync engine!
+        engine = create_async_engine(
+            "sqlite+aiosqlite://",
+            poolclass=StaticPool,
+            echo=echo,
+        )
+    else:
+        engine = create_async_engine(
+            url_object,
+            echo=echo,
+            **_engine_kwargs(url_key, AsyncAdaptedQueuePool, metrics, kwargs),
+        )
+    db_pool.instrument_pool(engine.sync_engine, metrics)
+    statement_stats.instrument_statements(
+        engine.sync_engine, statement_stats.get_slow_query_threshold(url_key)
+    )
+    if url_key in SQLITE_PROFILES:
+        apply_sqlite_profile(engine.sync_engine, SQLITE_PROFILES[url_key])
+    _engines[registry_key] = engine
+    return engine
+
+
+def _get_read_url_key() -> str:
+    return READ_URL_KEYS.get(get_use_db(), get_use_db())
+
+
+@cache
+def get_session_factory() -> sessionmaker:
+    return sessionmaker(bind=get_engine(get_use_db()))
+
+
+@cache
+def get_async_session_factory() -> async_sessionmaker:
+    return async_sessionmaker(bind=get_async_engine(get_use_db()))
+
+
+@cache
+def get_read_session_factory() -> sessionmaker:
+    """Session-factory for read-only use cases, see READ_URL_KEYS."""
+    return sessionmaker(bind=get_engine(_get_read_url_key()))
+
+
+@cache
+def get_async_read_session_factory() -> async_sessionmaker:
+    """Async session-factory for read-only use cases, see READ_URL_KEYS."""
+    return async_sessionmaker(bind=get_async_engine(_get_read_url_key()))
+
+
+def init_engines() -> None:
+    """
+    Creates the engines and session-factories of the app upfront (e.g. in the
+    lifespan of the web-app), so the first request doesn't pay for it.
+    """
+    get_session_factory()
+    get_async_session_factory()
+    get_read_session_factory()
+    get_async_read_session_factory()
+
+
+async def dispose_engines() -> None:
+    """Closes all connection-pools, e.g. on shutdown of the web-app."""
+    for engine in _engines.values():
+        if isinstance(engine, AsyncEngine):
+            await engine.dispose()
+        else:
+            engine.dispose()
 
 
 # 4) provide functions to get a connection and a session: ---------------------
 
 
 def get_connection() -> Connection:
-    return _engine.connect()
+    return get_engine(get_use_db()).connect()
 
 
 def get_session() -> Generator[Session, None, None]:
-    with _SessionFactory() as session:
+    with get_session_factory()() as session:
         yield session
-        print(f"Status connection-pool: {_engine.pool.status()}")
 
 
-def get_session_factory() -> sessionmaker:
-    return _SessionFactory
+def get_pool_metrics() -> dict[str, dict]:
+    """Returns a snapshot of the pool-metrics of all engines of the app."""
+    return {name: metrics.snapshot() for name, metrics in _pool_metrics.items()}
 
 
 # 5) Provide other utility functions: -----------------------------------------
@@ -147,22 +397,38 @@ def get_session_factory() -> sessionmaker:
 #    the schema.
 
 
-def _get_engine(url_key: str, echo: bool = False) -> Engine:
-    if url_key not in CONNECTION_URLS:
+def _get_engine(url_key: str, echo: bool | None = None, **kwargs) -> Engine:
+    if url_key not in _get_connection_urls():
         raise ValueError(f"url_key {url_key} not supported!")
+    return get_engine(url_key, echo=echo, **kwargs)
 
-    if _use_db == "in_memory_db_unit_tests":
-        engine = create_engine(
-            "sqlite://",
-            connect_args={"check_same_thread": False},
-            poolclass=StaticPool,
-            echo=True,
-        )
-    else:
-        url_object = CONNECTION_URLS[url_key]
-        engine = create_engine(url_object, echo=echo)
-    return engine
+
+def _get_async_engine(
+    url_key: str,
+    echo: bool | None = None,
+    **kwargs,
+) -> AsyncEngine:
+    if url_key not in _get_connection_urls():
+        raise ValueError(f"url_key {url_key} not supported!")
+    return get_async_engine(url_key, echo=echo, **kwargs)
 
 
 def _setup_schema(engine: Engine) -> None:
-    metadata.create_all(engine)
+    _load_metadata().create_all(engine)
+
+
+# 6) lazily provided module-attributes: ---------------------------------------
+
+
+def _load_metadata() -> MetaData:
+    import core.db.tables  # ensures that all tables are loaded into the metadata.
+
+    return _metadata
+
+
+def __getattr__(name: str):
+    if name == "metadata":
+        return _load_metadata()
+    if name == "CONNECTION_URLS":
+        return _get_connection_urls()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,4 +1,4 @@
-from sqlalchemy.orm import registry, relationship
+from sqlalchemy.orm import column_property, registry, relationship
 
 from core.domain.card import Card
 from core.domain.relevance import Relevance
@@ -20,16 +20,21 @@ def start_mappers():
         Card,
         card_table,
         properties={
+            # generated by the database, only needed to sort and paginate:
+            "german_sort": column_property(
+                card_table.c.german_sort,
+                deferred=True,
+            ),
             "tags": relationship(
                 Tag,
                 secondary=card_has_tag_table,
                 collection_class=set,
-                lazy="immediate",
+                lazy="raise",
                 cascade="all",
             ),
             "relevance": relationship(
                 Relevance,
-                lazy="immediate",
+                lazy="raise",
                 cascade="save-update, expunge",
                 # Don't choose "all" because of delete: "all" would include
                 # delete, which would lead to the following problem:
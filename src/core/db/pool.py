@@ -0,0 +1,185 @@
+"""
+Configuration and observation of the connection-pools of our engines.
+
+The pool-settings are read from the environment, depending on the database
+the app uses (see "USE_DB" in core.db). Each setting can be given globally
+(e.g. "DB_POOL_SIZE") or only for one target by appending the upper-cased name
+of the target (e.g. "DB_POOL_SIZE_STAGE"), the target-specific one wins.
+
+Instead of printing pool.status() we collect counters via the pool-events of
+SqlAlchemy. The time a request needs to wait for a connection is measured by
+a thin subclass of the pool-class, because there is no pool-event that fires
+before a checkout starts.
+"""
+
+from dataclasses import asdict, dataclass, replace
+import os
+import threading
+import time
+
+from sqlalchemy import Engine, event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import Pool, QueuePool
+
+
+@dataclass(frozen=True)
+class PoolSettings:
+    pool_size: int = 5
+    max_overflow: int = 10
+    pool_timeout: float = 30
+    pool_pre_ping: bool = False
+    pool_recycle: int = -1  # seconds, -1 means never recycle
+
+    def as_engine_kwargs(self) -> dict:
+        return asdict(self)
+
+
+DEFAULT_POOL_SETTINGS = {
+    "production": PoolSettings(),
+    # a server-database may drop idle connections, so check them and recycle
+    # them before the server does:
+    "stage": PoolSettings(
+        pool_size=10,
+        max_overflow=20,
+        pool_pre_ping=True,
+        pool_recycle=1800,
+    ),
+    "local_db_unit_tests": PoolSettings(),
+    "in_memory_db_unit_tests": PoolSettings(),
+}
+
+_ENV_NAMES = {
+    "pool_size": "DB_POOL_SIZE",
+    "max_overflow": "DB_MAX_OVERFLOW",
+    "pool_timeout": "DB_POOL_TIMEOUT",
+    "pool_pre_ping": "DB_POOL_PRE_PING",
+    "pool_recycle": "DB_POOL_RECYCLE",
+}
+
+
+def _parse(field: str, value: str):
+    if field == "pool_pre_ping":
+        return value.strip().lower() in ("1", "true", "yes", "on")
+    if field == "pool_timeout":
+        return float(value)
+    return int(value)
+
+
+def get_pool_settings(use_db: str) -> PoolSettings:
+    settings = DEFAULT_POOL_SETTINGS.get(use_db, PoolSettings())
+    overrides = {}
+    for field, env_name in _ENV_NAMES.items():
+        value = os.environ.get(f"{env_name}_{use_db.upper()}")
+        if value is None:
+            value = os.environ.get(env_name)
+        if value is not None:
+            overrides[field] = _parse(field, value)
+    return replace(settings, **overrides)
+
+
+class PoolMetrics:
+    """
+    Thread-safe counters of one connection-pool. The sync engine is used from
+    the threadpool of the web-server, so the events may fire concurrently.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self._lock = threading.Lock()
+        self.count_connects = 0
+        self.count_checkouts = 0
+        self.count_checkins = 0
+        self.count_invalidations = 0
+        self.count_timeouts = 0
+        self.checked_out = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+        self.engine: Engine | None = None
+
+    def on_connect(self, *args) -> None:
+        with self._lock:
+            self.count_connects += 1
+
+    def on_checkout(self, *args) -> None:
+        with self._lock:
+            self.count_checkouts += 1
+            self.checked_out += 1
+
+    def on_checkin(self, *args) -> None:
+        with self._lock:
+            self.count_checkins += 1
+            self.checked_out -= 1
+
+    def on_invalidate(self, *args) -> None:
+        with self._lock:
+            self.count_invalidations += 1
+
+    def record_wait(self, seconds: float, timed_out: bool = False) -> None:
+        with self._lock:
+            self.wait_time_total += seconds
+            self.wait_time_max = max(self.wait_time_max, seconds)
+            if timed_out:
+                self.count_timeouts += 1
+
+    def reset(self) -> None:
+        with self._lock:
+            self.count_connects = 0
+            self.count_checkouts = 0
+            self.count_checkins = 0
+            self.count_invalidations = 0
+            self.count_timeouts = 0
+            self.wait_time_total = 0.0
+            self.wait_time_max = 0.0
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            result = {
+                "count_connects": self.count_connects,
+                "count_checkouts": self.count_checkouts,
+                "count_checkins": self.count_checkins,
+                "count_invalidations": self.count_invalidations,
+                "count_timeouts": self.count_timeouts,
+                "checked_out": self.checked_out,
+                "wait_time_total": self.wait_time_total,
+                "wait_time_max": self.wait_time_max,
+            }
+        # the current state of the pool itself (only queue-pools have a size):
+        pool = self.engine.pool if self.engine else None
+        if isinstance(pool, QueuePool):
+            result["pool_size"] = pool.size()
+            result["overflow"] = pool.overflow()
+        return result
+
+
+def timed_pool_class(base: type[Pool], metrics: PoolMetrics) -> type[Pool]:
+    """
+    Returns a subclass of the given pool-class which measures the time spent
+    waiting for a connection. A class is used instead of an instance-attribute
+    since pools get recreated (e.g. by engine.dispose()) via their class.
+    """
+
+    class TimedPool(base):
+        def _do_get(self):
+            start = time.perf_counter()
+            try:
+                connection_record = super()._do_get()
+            except PoolTimeoutError:
+                metrics.record_wait(time.perf_counter() - start, timed_out=True)
+                raise
+            metrics.record_wait(time.perf_counter() - start)
+            return connection_record
+
+    TimedPool.__name__ = TimedPool.__qualname__ = f"Timed{base.__name__}"
+    return TimedPool
+
+
+def instrument_pool(engine: Engine, metrics: PoolMetrics) -> None:
+    """
+    Registers the pool-events of the engine to update the given metrics. For
+    an AsyncEngine hand over its sync_engine.
+    """
+    event.listen(engine, "connect", metrics.on_connect)
+    event.listen(engine, "checkout", metrics.on_checkout)
+    event.listen(engine, "checkin", metrics.on_checkin)
+    event.listen(engine, "invalidate", metrics.on_invalidate)
+    metrics.engine = engine
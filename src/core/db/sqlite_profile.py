@@ -0,0 +1,106 @@
+"""
+Connection-settings for SQLite as a production-database.
+
+SQLite's defaults are made for safety on every platform, not for throughput
+of a web-app: a rollback-journal (one writer blocks all readers), a small page
+cache and no memory-mapped I/O. The profile below is applied via engine-events
+to each new DBAPI-connection, since most of these PRAGMAs only live as long as
+the connection itself (only journal_mode=WAL is persisted in the file).
+
+Usage:
+
+    engine = create_engine("sqlite:///production.db")
+    apply_sqlite_profile(engine, PRODUCTION_PROFILE)
+"""
+
+from dataclasses import dataclass, replace
+import threading
+import time
+
+from sqlalchemy import Engine, event
+
+
+@dataclass(frozen=True)
+class SqliteProfile:
+    journal_mode: str | None = "WAL"  # None keeps the mode of the file
+    # with WAL, NORMAL is still corruption-safe, only the last commits may be
+    # lost on a power-loss:
+    synchronous: str = "NORMAL"
+    cache_size: int = -64_000  # negative values mean KiB -> 64 MB page-cache
+    mmap_size: int = 256 * 1024 * 1024
+    busy_timeout: int = 5_000  # milliseconds to wait for a lock before failing
+    temp_store: str = "MEMORY"
+    # seconds between two "PRAGMA optimize", None to never run it:
+    optimize_interval: float | None = 3_600
+
+    def pragmas(self) -> list[str]:
+        pragmas = [
+            f"PRAGMA synchronous={self.synchronous}",
+            f"PRAGMA cache_size={self.cache_size}",
+            f"PRAGMA mmap_size={self.mmap_size}",
+            f"PRAGMA busy_timeout={self.busy_timeout}",
+            f"PRAGMA temp_store={self.temp_store}",
+        ]
+        if self.journal_mode is not None:
+            pragmas.insert(0, f"PRAGMA journal_mode={self.journal_mode}")
+        return pragmas
+
+
+PRODUCTION_PROFILE = SqliteProfile()
+
+# For connections opened with "mode=ro": these can neither switch the journal
+# (the writer already did) nor write the statistics of "PRAGMA optimize".
+READ_ONLY_PROFILE = replace(
+    PRODUCTION_PROFILE,
+    journal_mode=None,
+    optimize_interval=None,
+)
+
+
+class _Optimizer:
+    """
+    Runs "PRAGMA optimize" at most once per interval on a connection that is
+    returned to the pool, so no request has to wait for it.
+    """
+
+    def __init__(self, interval: float) -> None:
+        self.interval = interval
+        self._last_run = time.monotonic()
+        self._lock = threading.Lock()
+
+    def is_due(self) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            if now - self._last_run < self.interval:
+                return False
+            self._last_run = now
+            return True
+
+    def on_checkin(self, dbapi_connection, connection_record) -> None:
+        if dbapi_connection is None or not self.is_due():
+            return
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute("PRAGMA optimize")
+        finally:
+            cursor.close()
+
+
+def apply_sqlite_profile(engine: Engine, profile: SqliteProfile) -> None:
+    """
+    Registers the profile on the engine. For an AsyncEngine hand over its
+    sync_engine.
+    """
+
+    def on_connect(dbapi_connection, connection_record) -> None:
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in profile.pragmas():
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+
+    event.listen(engine, "connect", on_connect)
+    if profile.optimize_interval is not None:
+        optimizer = _Optimizer(profile.optimize_interval)
+        event.listen(engine, "checkin", optimizer.on_checkin)
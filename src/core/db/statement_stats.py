@@ -0,0 +1,197 @@
+"""
+Statistics of the SQL-statements executed within a scope of work, e.g. one
+unit of work or one request of the web-app: the number of statements, the
+time spent in the database and the slowest statements.
+
+A scope is opened with track_statements(); scopes may be nested (the units of
+work of a request), a statement is recorded in all scopes open at that time.
+The engines of core.db time each statement they send to the database (with
+the events "before_cursor_execute" and "after_cursor_execute") and record it
+into the StatementStats of the current scopes. These are kept in a context-
+variable, so concurrent requests record their own statements: each task of
+the event-loop has its own context, and the threadpool as well as
+SqlAlchemy's asyncio-extension run their work in a copy of the caller's
+context. Statements outside of a scope are not recorded.
+
+Independent of any scope, statements slower than the slow-query-threshold are
+logged as a warning, with the shapes of their bound parameters (their types,
+not their values). The threshold is read from the environment like the pool-
+settings (see core.db.pool): "DB_SLOW_QUERY_MS", or "DB_SLOW_QUERY_MS_STAGE"
+only for the target "stage". A threshold of 0 or less turns the log off.
+"""
+
+import bisect
+from collections.abc import Iterator, Mapping
+from contextlib import contextmanager
+from contextvars import ContextVar
+import logging
+import os
+import time
+
+from sqlalchemy import Engine, event
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SLOW_QUERY_MS = 200.0
+COUNT_SLOWEST = 5
+
+
+def get_slow_query_threshold(use_db: str) -> float | None:
+    """The slow-query-threshold in seconds, None if slow queries aren't logged."""
+    value = os.environ.get(f"DB_SLOW_QUERY_MS_{use_db.upper()}")
+    if value is None:
+        value = os.environ.get("DB_SLOW_QUERY_MS")
+    milliseconds = DEFAULT_SLOW_QUERY_MS if value is None else float(value)
+    return milliseconds / 1000 if milliseconds > 0 else None
+
+
+def _shape(parameters) -> str:
+    if isinstance(parameters, Mapping):
+        items = (f"{key}: {type(value).__name__}" for key, value in parameters.items())
+        return "{" + ", ".join(items) + "}"
+    # consecutive parameters of the same type are combined (e.g. of an IN):
+    runs: list[list] = []
+    for value in parameters:
+        type_name = type(value).__name__
+        if runs and runs[-1][0] == type_name:
+            runs[-1][1] += 1
+        else:
+            runs.append([type_name, 1])
+    parts = (name if count == 1 else f"{name} x {count}" for name, count in runs)
+    return "(" + ", ".join(parts) + ")"
+
+
+def parameter_shape(parameters, executemany: bool = False) -> str:
+    """
+    The types of the bound parameters of a statement, e.g. "(int, str x 2)"
+    or "{id_1: int}". Their values may be personal data and are not shown.
+    """
+    if not executemany:
+        return _shape(parameters if parameters is not None else ())
+    if not parameters:
+        return "[]"
+    return f"{len(parameters)} x {_shape(parameters[0])}"
+
+
+class TimedStatement:
+    def __init__(
+        self,
+        seconds: float,
+        statement: str,
+        parameters,
+        executemany: bool,
+    ) -> None:
+        self.seconds = seconds
+        self.statement = statement
+        # (the shape is only computed if it is needed)
+        self._parameters = parameters
+        self._executemany = executemany
+
+    @property
+    def parameter_shape(self) -> str:
+        return parameter_shape(self._parameters, self._executemany)
+
+    def __repr__(self) -> str:
+        return (
+            f"TimedStatement({self.seconds * 1000:.1f} ms, "
+            f"{self.statement!r}, {self.parameter_shape})"
+        )
+
+
+class StatementStats:
+    def __init__(self, count_slowest: int = COUNT_SLOWEST) -> None:
+        self.count = 0
+        self.total_time = 0.0  # seconds
+        self.count_slowest = count_slowest
+        self.slowest: list[TimedStatement] = []  # the slowest first
+
+    def record(self, timed_statement: TimedStatement) -> None:
+        self.count += 1
+        self.total_time += timed_statement.seconds
+        slowest = self.slowest
+        if len(slowest) == self.count_slowest:
+            if timed_statement.seconds <= slowest[-1].seconds:
+                return
+            slowest.pop()
+        bisect.insort(slowest, timed_statement, key=lambda timed: -timed.seconds)
+
+    def __str__(self) -> str:
+        text = f"{self.count} statements in {self.total_time * 1000:.1f} ms"
+        if self.slowest:
+            slowest = self.slowest[0]
+            text += (
+                f", slowest ({slowest.seconds * 1000:.1f} ms): "
+                f"{' '.join(slowest.statement.split())[:200]}"
+            )
+        return text
+
+
+_current_stats: ContextVar[tuple[StatementStats, ...]] = ContextVar(
+    "statement_stats", default=()
+)
+
+
+@contextmanager
+def track_statements() -> Iterator[StatementStats]:
+    stats = StatementStats()
+    token = _current_stats.set((*_current_stats.get(), stats))
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+def _before_cursor_execute(
+    connection, cursor, statement, parameters, context, executemany
+) -> None:
+    connection.info.setdefault("statement_start_times", []).append(
+        time.perf_counter()
+    )
+
+
+def _handle_error(exception_context) -> None:
+    # (a failed statement has no "after_cursor_execute")
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("statement_start_times"):
+        connection.info["statement_start_times"].pop()
+
+
+def _make_after_cursor_execute(slow_query_threshold: float | None):
+    def after_cursor_execute(
+        connection, cursor, statement, parameters, context, executemany
+    ) -> None:
+        seconds = time.perf_counter() - connection.info["statement_start_times"].pop()
+        all_stats = _current_stats.get()
+        is_slow = slow_query_threshold is not None and seconds >= slow_query_threshold
+        if not all_stats and not is_slow:
+            return
+        timed_statement = TimedStatement(seconds, statement, parameters, executemany)
+        for stats in all_stats:
+            stats.record(timed_statement)
+        if is_slow:
+            logger.warning(
+                "slow statement (%.1f ms): %s, parameters: %s",
+                seconds * 1000,
+                statement,
+                timed_statement.parameter_shape,
+            )
+
+    return after_cursor_execute
+
+
+def instrument_statements(
+    engine: Engine,
+    slow_query_threshold: float | None = None,
+) -> None:
+    """
+    Records the statements of the engine (for an AsyncEngine hand over its
+    sync_engine) and logs those that take at least slow_query_threshold
+    seconds.
+    """
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(
+        engine,
+        "after_cursor_execute",
+        _make_after_cursor_execute(slow_query_threshold),
+    )
+    event.listen(engine, "handle_error", _handle_error)
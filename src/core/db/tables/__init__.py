@@ -2,3 +2,6 @@ from .card_table import card_table
 from .card_has_tag_table import card_has_tag_table
 from .relevance_table import relevance_table
 from .tag_table import tag_table
+from .deck_version_table import deck_version_table
+from . import card_search  # registers the DDL of the search-index of Card
+from . import card_versioning  # registers the triggers of the versions
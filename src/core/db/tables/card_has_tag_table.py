@@ -1,4 +1,4 @@
-from sqlalchemy import Table, Column, Integer, ForeignKey
+from sqlalchemy import Table, Column, Index, Integer, ForeignKey
 
 from core.db import metadata
 
@@ -17,4 +17,7 @@ card_has_tag_table = Table(
         ForeignKey("Tag.id", ondelete="CASCADE"),
         primary_key=True,
     ),
+    # The primary key starts with id_card, which serves "the tags of a card".
+    # Filtering cards by tag needs the other direction:
+    Index("ix_card_has_tag_id_tag_id_card", "id_tag", "id_card"),
 )
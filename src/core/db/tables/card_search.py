@@ -0,0 +1,92 @@
+"""
+Search-indexes over german and italian of table Card.
+
+The index is maintained by the database itself on every write (also for bulk-
+imports without the ORM), but it is dialect-specific, so it is created with
+DDL-events of card_table instead of being part of the table-definition:
+
+- SQLite: an FTS5-table with Card as its external content (the words are only
+  stored in Card), kept in sync by triggers.
+- Postgres: a generated tsvector-column with a GIN-index. The configuration
+  "simple" doesn't stem, since there is no stemmer for both languages.
+
+For fuzzy lookups Postgres has trigram-indexes of pg_trgm. SQLite has no such
+extension, there an index in the process is used instead (see
+core.domain.card_repository).
+
+The alembic-migrations of the indexes contain a copy of these statements.
+"""
+
+from sqlalchemy import DDL, event
+
+from core.db.tables.card_table import card_table
+
+
+CARD_FTS_TABLE = "Card_fts"
+
+SQLITE_CREATE_STATEMENTS = [
+    f"""
+    CREATE VIRTUAL TABLE "{CARD_FTS_TABLE}" USING fts5(
+        german,
+        italian,
+        content='Card',
+        content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2',
+        prefix='2 3'
+    )
+    """,
+    f"""
+    CREATE TRIGGER card_fts_after_insert AFTER INSERT ON "Card" BEGIN
+        INSERT INTO "{CARD_FTS_TABLE}" (rowid, german, italian)
+        VALUES (new.id, new.german, new.italian);
+    END
+    """,
+    f"""
+    CREATE TRIGGER card_fts_after_delete AFTER DELETE ON "Card" BEGIN
+        INSERT INTO "{CARD_FTS_TABLE}" ("{CARD_FTS_TABLE}", rowid, german, italian)
+        VALUES ('delete', old.id, old.german, old.italian);
+    END
+    """,
+    f"""
+    CREATE TRIGGER card_fts_after_update AFTER UPDATE OF german, italian
+    ON "Card" BEGIN
+        INSERT INTO "{CARD_FTS_TABLE}" ("{CARD_FTS_TABLE}", rowid, german, italian)
+        VALUES ('delete', old.id, old.german, old.italian);
+        INSERT INTO "{CARD_FTS_TABLE}" (rowid, german, italian)
+        VALUES (new.id, new.german, new.italian);
+    END
+    """,
+]
+# (the triggers are dropped together with table Card)
+SQLITE_DROP_STATEMENTS = [f'DROP TABLE IF EXISTS "{CARD_FTS_TABLE}"']
+
+POSTGRES_CREATE_STATEMENTS = [
+    """
+    ALTER TABLE "Card" ADD COLUMN search_vector tsvector
+    GENERATED ALWAYS AS (to_tsvector('simple', german || ' ' || italian)) STORED
+    """,
+    'CREATE INDEX ix_card_search_vector ON "Card" USING GIN (search_vector)',
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    'CREATE INDEX ix_card_german_sort_trgm ON "Card"'
+    " USING GIN (german_sort gin_trgm_ops)",
+    'CREATE INDEX ix_card_italian_trgm ON "Card" USING GIN (italian gin_trgm_ops)',
+]
+
+for statement in SQLITE_CREATE_STATEMENTS:
+    event.listen(
+        card_table,
+        "after_create",
+        DDL(statement).execute_if(dialect="sqlite"),
+    )
+for statement in SQLITE_DROP_STATEMENTS:
+    event.listen(
+        card_table,
+        "before_drop",
+        DDL(statement).execute_if(dialect="sqlite"),
+    )
+for statement in POSTGRES_CREATE_STATEMENTS:
+    event.listen(
+        card_table,
+        "after_create",
+        DDL(statement).execute_if(dialect="postgresql"),
+    )
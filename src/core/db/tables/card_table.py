@@ -1,16 +1,37 @@
 from sqlalchemy import (
+    Boolean,
     Column,
+    Computed,
+    DateTime,
     Enum,
     ForeignKey,
+    Index,
     Integer,
     String,
     Table,
     UniqueConstraint,
+    false,
 )
 
 from core.db import metadata
+from core.domain.card import NEW_CARD_DUE_AT
 from core.domain.word_type import WordType
 
+# The cards are sorted by their german word without its article. This key is
+# a generated column (computed by the database on each insert/update), so it
+# can be indexed together with the id for keyset-pagination. The article is
+# matched regardless of its case ("Der Hund" sorts as "Hund"), like
+# core.domain.card_repository.strip_article does - LIKE alone ignores the case
+# on SQLite, but not on Postgres.
+GERMAN_SORT_KEY = (
+    "CASE"
+    " WHEN lower(german) LIKE 'der %' THEN substr(german, 5)"
+    " WHEN lower(german) LIKE 'die %' THEN substr(german, 5)"
+    " WHEN lower(german) LIKE 'das %' THEN substr(german, 5)"
+    " ELSE german"
+    " END"
+)
+
 card_table = Table(
     "Card",
     metadata,
@@ -26,5 +47,25 @@ card_table = Table(
     ),
     Column("german", String, nullable=False),
     Column("italian", String, nullable=False),
+    Column("german_sort", String, Computed(GERMAN_SORT_KEY, persisted=True)),
+    # incremented by the database on each change (core.db.tables.card_versioning)
+    Column("version", Integer, nullable=False, server_default="1"),
+    # statistics of the answers, written in batches
+    # (core.services.cards.card_answers)
+    Column("times_played", Integer, nullable=False, server_default="0"),
+    Column("correct_answers", Integer, nullable=False, server_default="0"),
+    Column("last_answer_correct", Boolean, nullable=False, server_default=false()),
+    Column("last_played", DateTime),
+    # the schedule of the spaced repetition (core.services.cards.study), new
+    # cards are due right away:
+    Column("box", Integer, nullable=False, server_default="0"),
+    Column(
+        "due_at",
+        DateTime,
+        nullable=False,
+        server_default=NEW_CARD_DUE_AT.isoformat(sep=" "),
+    ),
     UniqueConstraint("german", "italian", name="uq_german_italian"),
+    Index("ix_card_german_sort_id", "german_sort", "id"),
+    Index("ix_card_due_at_id", "due_at", "id"),
 )
@@ -0,0 +1,157 @@
+"""
+Versions of the cards for conditional requests (ETags).
+
+- Each card has a version, incremented on every change of its content.
+- The deck as a whole has a version in the single row of Deck_Version,
+  incremented on every insert and delete of a card and on every change of
+  its content. The statistics of the answers are no content: they are
+  written all the time (see core.services.cards.card_answers) and would
+  otherwise invalidate every cached page of the deck.
+- The tags of a card are part of its content (cards are also filtered by
+  them), so tagging and untagging a card changes both versions.
+
+Like the search-index (see core.db.tables.card_search) the versions are kept by
+the database itself with triggers, so they also follow bulk-imports and writes
+of other processes. A card also changes with the description of its
+relevance, which is shown with it.
+
+All writes of cards update the same row of Deck_Version. With SQLite there is
+only one writer anyway; on Postgres this serializes writing transactions,
+which is fine for the write-rate of a deck of cards.
+
+The triggers need Card, Relevance, Card_has_Tag and Deck_Version, so they are
+created once all tables of the metadata exist - that is after each
+create_all(), so they must not fail if they exist already (they are dropped
+together with their tables). The alembic-migrations of the versions contain a
+copy of these statements.
+"""
+
+from sqlalchemy import DDL, event
+
+from core.db import metadata
+
+# (only the columns that are part of a card's content bump its version, so the
+# update of the version itself doesn't trigger again)
+CONTENT_COLUMNS = "word_type, id_relevance, german, italian"
+
+SQLITE_CREATE_STATEMENTS = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS card_version_after_update
+    AFTER UPDATE OF {CONTENT_COLUMNS} ON "Card" BEGIN
+        UPDATE "Card" SET version = old.version + 1 WHERE id = new.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS relevance_card_versions_after_update
+    AFTER UPDATE OF description ON "Relevance" BEGIN
+        UPDATE "Card" SET version = version + 1 WHERE id_relevance = new.id;
+    END
+    """,
+    *(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS card_deck_version_after_{name}
+        AFTER {operation} ON "Card" BEGIN
+            UPDATE "Deck_Version"
+            SET version = version + 1, modified_at = CURRENT_TIMESTAMP
+            WHERE id = 1;
+        END
+        """
+        for name, operation in (
+            ("insert", "INSERT"),
+            ("update", f"UPDATE OF {CONTENT_COLUMNS}"),
+            ("delete", "DELETE"),
+        )
+    ),
+    *(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS card_has_tag_versions_after_{name}
+        AFTER {name.upper()} ON "Card_has_Tag" BEGIN
+            UPDATE "Card" SET version = version + 1 WHERE id = {row}.id_card;
+            UPDATE "Deck_Version"
+            SET version = version + 1, modified_at = CURRENT_TIMESTAMP
+            WHERE id = 1;
+        END
+        """
+        for name, row in (("insert", "new"), ("delete", "old"))
+    ),
+]
+
+POSTGRES_CREATE_STATEMENTS = [
+    """
+    CREATE OR REPLACE FUNCTION bump_card_version() RETURNS trigger AS $$
+    BEGIN
+        NEW.version := OLD.version + 1;
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    f"""
+    CREATE OR REPLACE TRIGGER card_version_before_update
+    BEFORE UPDATE OF {CONTENT_COLUMNS} ON "Card"
+    FOR EACH ROW EXECUTE FUNCTION bump_card_version()
+    """,
+    """
+    CREATE OR REPLACE FUNCTION bump_relevance_card_versions() RETURNS trigger AS $$
+    BEGIN
+        UPDATE "Card" SET version = version + 1 WHERE id_relevance = NEW.id;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE TRIGGER relevance_card_versions_after_update
+    AFTER UPDATE OF description ON "Relevance"
+    FOR EACH ROW EXECUTE FUNCTION bump_relevance_card_versions()
+    """,
+    # once per statement, e.g. not for each card of a bulk-import:
+    """
+    CREATE OR REPLACE FUNCTION bump_deck_version() RETURNS trigger AS $$
+    BEGIN
+        UPDATE "Deck_Version"
+        SET version = version + 1, modified_at = now()
+        WHERE id = 1;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    f"""
+    CREATE OR REPLACE TRIGGER card_deck_version_after_change
+    AFTER INSERT OR UPDATE OF {CONTENT_COLUMNS} OR DELETE ON "Card"
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_deck_version()
+    """,
+    """
+    CREATE OR REPLACE FUNCTION bump_tagged_card_version() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'DELETE' THEN
+            UPDATE "Card" SET version = version + 1 WHERE id = OLD.id_card;
+        ELSE
+            UPDATE "Card" SET version = version + 1 WHERE id = NEW.id_card;
+        END IF;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE TRIGGER card_has_tag_card_version_after_change
+    AFTER INSERT OR DELETE ON "Card_has_Tag"
+    FOR EACH ROW EXECUTE FUNCTION bump_tagged_card_version()
+    """,
+    """
+    CREATE OR REPLACE TRIGGER card_has_tag_deck_version_after_change
+    AFTER INSERT OR DELETE ON "Card_has_Tag"
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_deck_version()
+    """,
+]
+
+for statement in SQLITE_CREATE_STATEMENTS:
+    event.listen(
+        metadata,
+        "after_create",
+        DDL(statement).execute_if(dialect="sqlite"),
+    )
+for statement in POSTGRES_CREATE_STATEMENTS:
+    event.listen(
+        metadata,
+        "after_create",
+        DDL(statement).execute_if(dialect="postgresql"),
+    )
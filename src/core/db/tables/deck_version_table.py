@@ -0,0 +1,22 @@
+from sqlalchemy import DDL, Column, DateTime, Integer, Table, event
+
+from core.db import metadata
+
+# One row (id 1) with the version of the whole deck of cards, see
+# core.db.tables.card_versioning.
+deck_version_table = Table(
+    "Deck_Version",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("version", Integer, nullable=False),
+    Column("modified_at", DateTime(timezone=True), nullable=False),
+)
+
+event.listen(
+    deck_version_table,
+    "after_create",
+    DDL(
+        'INSERT INTO "Deck_Version" (id, version, modified_at)'
+        " VALUES (1, 1, CURRENT_TIMESTAMP)"
+    ),
+)
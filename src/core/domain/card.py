@@ -1,9 +1,19 @@
+from dataclasses import dataclass
 import datetime
 
 from core.domain.relevance import Relevance
 from core.domain.tag import Tag
 from core.domain.word_type import WordType
 
+# Leitner-system: a correct answer moves a card into the next box, a wrong one
+# back into the first. The higher the box, the longer until the card is due
+# again. New cards are in box 0 and due right away.
+BOX_INTERVALS = (
+    datetime.timedelta(0),
+    *(datetime.timedelta(days=2**exponent) for exponent in range(7)),
+)
+NEW_CARD_DUE_AT = datetime.datetime(1970, 1, 1)
+
 
 class Card:
     def __init__(
@@ -29,6 +39,9 @@ class Card:
         self.last_answer_correct: bool = False
         self.last_played: datetime.datetime | None = None
 
+        self.box: int = 0
+        self.due_at: datetime.datetime = NEW_CARD_DUE_AT
+
     def __repr__(self) -> str:
         return (
             "Card("
@@ -70,6 +83,28 @@ class Card:
             self.correct_answers += 1
         self.last_answer_correct = correct
         self.last_played = datetime.datetime.now()
+        self.reschedule(correct=correct)
+
+    def reschedule(self, correct: bool) -> None:
+        if correct:
+            self.box = min(self.box + 1, len(BOX_INTERVALS) - 1)
+        else:
+            self.box = 1
+        self.due_at = self.last_played + BOX_INTERVALS[self.box]
+
+    def last_answer(self) -> "CardAnswers":
+        """The last answer (see solve) and the schedule after it."""
+        return CardAnswers(
+            times_played=1,
+            correct_answers=int(self.last_answer_correct),
+            last_answer_correct=self.last_answer_correct,
+            last_played=self.last_played,
+            box=self.box,
+            due_at=self.due_at,
+        )
+
+    def add_answers(self, answers: "CardAnswers") -> None:
+        _add_answers(self, answers)
 
     @property
     def wrong_answers(self):
@@ -87,3 +122,34 @@ class Card:
     def has_tag(self, value: str) -> bool:
         tag = Tag(value=value)
         return tag in self.tags
+
+
+@dataclass
+class CardAnswers:
+    """
+    Answers to one card that are not stored yet, to be added to its
+    statistics in one go (see Card.add_answers). The last answer decides the
+    box and when the card is due.
+    """
+
+    times_played: int = 0
+    correct_answers: int = 0
+    last_answer_correct: bool = False
+    last_played: datetime.datetime | None = None
+    box: int = 0
+    due_at: datetime.datetime | None = None
+
+    def add_answers(self, answers: "CardAnswers") -> None:
+        _add_answers(self, answers)
+
+
+def _add_answers(target: Card | CardAnswers, answers: CardAnswers) -> None:
+    target.times_played += answers.times_played
+    target.correct_answers += answers.correct_answers
+    if answers.last_played is not None and (
+        target.last_played is None or answers.last_played >= target.last_played
+    ):
+        target.last_answer_correct = answers.last_answer_correct
+        target.last_played = answers.last_played
+        target.box = answers.box
+        target.due_at = answers.due_at
@@ -1,11 +1,162 @@
 from abc import ABC, abstractmethod
+from collections.abc import AsyncIterator, Collection
+from dataclasses import dataclass, field
+import datetime
+import heapq
+import re
 from typing import override
 
-from sqlalchemy import func, case, select
-from sqlalchemy.orm import Session
+from sqlalchemy import (
+    Select,
+    Update,
+    bindparam,
+    case,
+    column,
+    func,
+    literal_column,
+    or_,
+    select,
+    table,
+    text,
+    tuple_,
+    update,
+)
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload, selectinload
 
-from core.domain.card import Card
+from core.db.tables import (
+    card_has_tag_table,
+    card_table,
+    deck_version_table,
+    tag_table,
+)
+from core.domain.card import Card, CardAnswers
 from core.exceptions import DuplicateResourceError
+from core.utils.caching import CountCache
+from core.utils.pagination import Cursor
+from core.utils.trigram_index import TrigramIndex, similarity
+
+
+ARTICLES = ["der", "die", "das"]
+
+# Counting all cards is a full scan of the index, so the count is cached. The
+# units of work write their inserts through to it (see apply_card_changes),
+# the time-to-live bounds the staleness caused by other processes.
+CARD_COUNT_TTL = 60
+card_count_cache = CountCache(ttl=CARD_COUNT_TTL)
+
+# Fuzzy lookups on SQLite use this index of german and italian (key 2 * id and
+# 2 * id + 1). It is built from the database on the first lookup and then
+# maintained via apply_card_changes - so other processes' writes only show up
+# after a restart. Postgres has pg_trgm instead. Like for sorting, the german
+# article is left out, its trigrams would only dilute the similarity.
+card_trigram_index = TrigramIndex()
+FUZZY_THRESHOLD = 0.3  # the default similarity-threshold of pg_trgm
+
+
+def search_terms(query: str) -> list[str]:
+    """
+    The words of a search-query. Only word-characters are kept, so the terms
+    can't contain any syntax of the full-text-search of the database.
+    """
+    return re.findall(r"\w+", query.lower())
+
+
+@dataclass
+class CardChanges:
+    """
+    The changes of cards within one transaction of a session. They are
+    collected in the info of the session and applied to the caches above
+    after the commit (see the units of work).
+    """
+
+    count_added: int = 0
+    count_deleted: int = 0
+    texts: dict[int, tuple[str, str]] = field(default_factory=dict)  # by id
+    deleted_ids: set[int] = field(default_factory=set)
+
+    def set_text(self, id: int, german: str, italian: str) -> None:
+        self.texts[id] = (german, italian)
+        self.deleted_ids.discard(id)
+
+    def delete(self, id: int) -> None:
+        self.count_deleted += 1
+        self.texts.pop(id, None)
+        self.deleted_ids.add(id)
+
+
+_CARD_CHANGES = "card_changes"
+
+
+def get_card_changes(session: Session) -> CardChanges:
+    return session.info.setdefault(_CARD_CHANGES, CardChanges())
+
+
+def pop_card_changes(session: Session) -> CardChanges:
+    return session.info.pop(_CARD_CHANGES, None) or CardChanges()
+
+
+def collect_card_changes(session: Session, flush_context) -> None:
+    """
+    Listener for the "after_flush"-event of a session: session.new, .dirty and
+    .deleted still show what has been flushed, and new cards have their id.
+    """
+    changes = get_card_changes(session)
+    for instance in session.new:
+        if isinstance(instance, Card):
+            changes.count_added += 1
+            changes.set_text(instance.id, instance.german, instance.italian)
+    for instance in session.dirty:
+        if isinstance(instance, Card):
+            changes.set_text(instance.id, instance.german, instance.italian)
+    for instance in session.deleted:
+        if isinstance(instance, Card):
+            changes.delete(instance.id)
+
+
+def apply_card_changes(changes: CardChanges) -> None:
+    """
+    Called after a commit. Inserts adjust the cached count, deletes invalidate
+    it: they are rare, so the next count simply reads the exact value again.
+    """
+    if changes.count_deleted:
+        card_count_cache.invalidate()
+    elif changes.count_added:
+        card_count_cache.adjust(changes.count_added)
+
+    index_changes: dict[int, str | None] = {}
+    for id, (german, italian) in changes.texts.items():
+        index_changes[2 * id] = strip_article(german)
+        index_changes[2 * id + 1] = italian
+    for id in changes.deleted_ids:
+        index_changes[2 * id] = index_changes[2 * id + 1] = None
+    if index_changes:
+        card_trigram_index.apply(index_changes)
+
+
+def strip_article(german: str) -> str:
+    """
+    Python-version of the sort-key the database generates for each card (see
+    GERMAN_SORT_KEY in core.db.tables.card_table): the article is stripped
+    regardless of its case.
+    """
+    for article in ARTICLES:
+        if german.lower().startswith(f"{article} "):
+            return german[len(article) + 1 :]
+    return german
+
+
+@dataclass(frozen=True)
+class Version:
+    """
+    Version of the deck or of one card, maintained by the database (see
+    core.db.tables.card_versioning). Cards have no timestamp of their own,
+    the last change of the deck is an upper bound for theirs.
+    """
+
+    version: int
+    modified_at: datetime.datetime
 
 
 class AbstractCardRepository(ABC):
@@ -21,10 +172,80 @@ class AbstractCardRepository(ABC):
     def get(self, id: int) -> Card | None:
         raise NotImplementedError
 
+    @abstractmethod
+    def get_version(self, id: int) -> Version | None:
+        """Returns None if there is no card with the id."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_deck_version(self) -> Version | None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def count(self) -> int:
+        raise NotImplementedError
+
     @abstractmethod
     def get_list(self, skip: int, limit: int) -> tuple[int, list[Card]]:
         raise NotImplementedError
 
+    @abstractmethod
+    def get_slice(self, skip: int, limit: int) -> tuple[list[Card], bool]:
+        """
+        Like get_list, but without counting: returns the cards and whether
+        there are more cards after them.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def search(
+        self,
+        query: str,
+        skip: int,
+        limit: int,
+    ) -> tuple[list[Card], bool]:
+        """
+        Full-text-search in german and italian, each word of the query matches
+        the beginning of a word. Returns the best matches first and whether
+        there are more matches after them.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def filter_by_tags(
+        self,
+        tags: list[str],
+        match_all: bool,
+        skip: int,
+        limit: int,
+    ) -> tuple[list[Card], bool]:
+        """
+        Returns the cards with all (match_all) or any of the given tags, sorted
+        like get_slice, and whether there are more cards after them.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def fuzzy_search(self, query: str, limit: int) -> list[tuple[Card, float]]:
+        """
+        Typo-tolerant lookup: returns the cards whose german or italian is most
+        similar to the query (by trigrams), with the similarity (0.0 to 1.0).
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_page_after(
+        self,
+        cursor: Cursor | None,
+        limit: int,
+    ) -> tuple[list[Card], Cursor | None]:
+        """
+        Keyset-pagination: Returns the cards sorted after the given cursor
+        (or the first page without a cursor) and the cursor of the next page,
+        which is None if this is the last page.
+        """
+        raise NotImplementedError
+
     @abstractmethod
     def delete(self, card: Card) -> None:
         # Lessons learned: Parameter needs to be of type Card and not its id,
@@ -34,16 +255,42 @@ class AbstractCardRepository(ABC):
         # in this delete method.
         raise NotImplementedError
 
+    @abstractmethod
+    def get_due(
+        self,
+        now: datetime.datetime,
+        limit: int,
+        exclude_ids: Collection[int] = (),
+    ) -> list[Card]:
+        """The cards due at now, the ones due the longest first."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def add_answers(self, answers: dict[int, CardAnswers]) -> None:
+        """
+        Adds the answers (by the id of the card) to the statistics of the
+        cards, without loading them. Unknown ids are skipped.
+        """
+        raise NotImplementedError
+
 
 class FakeCardRepository(AbstractCardRepository):
     def __init__(self, cards: set[Card]) -> None:
         self._cards = set(cards)
+        self._deck_version = Version(1, datetime.datetime.now(datetime.UTC))
+
+    def _bump_deck_version(self) -> None:
+        self._deck_version = Version(
+            self._deck_version.version + 1,
+            datetime.datetime.now(datetime.UTC),
+        )
 
     @override
     def add(self, card: Card) -> None:
         if card in self._cards:
             raise DuplicateResourceError("Card")
         self._cards.add(card)
+        self._bump_deck_version()
 
     @override
     def all(self) -> list[Card]:
@@ -56,6 +303,21 @@ class FakeCardRepository(AbstractCardRepository):
             return None
         return card[0]
 
+    @override
+    def get_version(self, id: int) -> Version | None:
+        # (the fake cards are changed in place, so they have no versions)
+        if self.get(id) is None:
+            return None
+        return Version(1, self._deck_version.modified_at)
+
+    @override
+    def get_deck_version(self) -> Version | None:
+        return self._deck_version
+
+    @override
+    def count(self) -> int:
+        return len(self._cards)
+
     @override
     def get_list(self, skip: int, limit: int) -> tuple[int, list[Card]]:
         return (
@@ -63,10 +325,115 @@ class FakeCardRepository(AbstractCardRepository):
             list(sorted(self._cards, key=lambda x: x.german)),
         )
 
+    @override
+    def get_slice(self, skip: int, limit: int) -> tuple[list[Card], bool]:
+        cards = sorted(
+            self._cards,
+            key=lambda card: (strip_article(card.german), card.id or 0),
+        )
+        return (cards[skip : skip + limit], len(cards) > skip + limit)
+
+    @override
+    def search(
+        self,
+        query: str,
+        skip: int,
+        limit: int,
+    ) -> tuple[list[Card], bool]:
+        terms = search_terms(query)
+
+        def matches(card: Card) -> bool:
+            words = search_terms(f"{card.german} {card.italian}")
+            return all(any(word.startswith(term) for word in words) for term in terms)
+
+        cards = sorted(
+            [card for card in self._cards if terms and matches(card)],
+            key=lambda card: (strip_article(card.german), card.id or 0),
+        )
+        return (cards[skip : skip + limit], len(cards) > skip + limit)
+
+    @override
+    def filter_by_tags(
+        self,
+        tags: list[str],
+        match_all: bool,
+        skip: int,
+        limit: int,
+    ) -> tuple[list[Card], bool]:
+        wanted = set(tags)
+
+        def matches(card: Card) -> bool:
+            values = {tag.value for tag in card.tags}
+            return wanted <= values if match_all else bool(wanted & values)
+
+        cards = sorted(
+            [card for card in self._cards if wanted and matches(card)],
+            key=lambda card: (strip_article(card.german), card.id or 0),
+        )
+        return (cards[skip : skip + limit], len(cards) > skip + limit)
+
+    @override
+    def fuzzy_search(self, query: str, limit: int) -> list[tuple[Card, float]]:
+        matches = [
+            (
+                card,
+                max(
+                    similarity(query, strip_article(card.german)),
+                    similarity(query, card.italian),
+                ),
+            )
+            for card in self._cards
+        ]
+        matches = [match for match in matches if match[1] >= FUZZY_THRESHOLD]
+        matches.sort(key=lambda match: (-match[1], match[0].id or 0))
+        return matches[:limit]
+
+    @override
+    def get_page_after(
+        self,
+        cursor: Cursor | None,
+        limit: int,
+    ) -> tuple[list[Card], Cursor | None]:
+        keyed_cards = sorted(
+            [((strip_article(card.german), card.id or 0), card) for card in self._cards],
+            key=lambda keyed_card: keyed_card[0],
+        )
+        if cursor:
+            keyed_cards = [
+                (key, card)
+                for key, card in keyed_cards
+                if key > (cursor.sort_key, cursor.id)
+            ]
+        return _split_page(keyed_cards, limit)
+
     @override
     def delete(self, card: Card) -> None:
         if card in self._cards:
             self._cards.remove(card)
+            self._bump_deck_version()
+
+    @override
+    def get_due(
+        self,
+        now: datetime.datetime,
+        limit: int,
+        exclude_ids: Collection[int] = (),
+    ) -> list[Card]:
+        due_cards = (
+            card
+            for card in self._cards
+            if card.due_at <= now and card.id not in exclude_ids
+        )
+        return heapq.nsmallest(
+            limit, due_cards, key=lambda card: (card.due_at, card.id or 0)
+        )
+
+    @override
+    def add_answers(self, answers: dict[int, CardAnswers]) -> None:
+        for id, card_answers in answers.items():
+            card = self.get(id)
+            if card is not None:
+                card.add_answers(card_answers)
 
 
 class DbCardRepository(AbstractCardRepository):
@@ -79,45 +446,845 @@ class DbCardRepository(AbstractCardRepository):
 
     @override
     def all(self) -> list[Card]:
-        stmt = select(Card)
+        stmt = select(Card).options(*_full_card_options())
         return list(self.session.scalars(stmt).all())
 
     @override
     def delete(self, card: Card) -> None:
         self.session.delete(card)
 
+    @override
+    def get_due(
+        self,
+        now: datetime.datetime,
+        limit: int,
+        exclude_ids: Collection[int] = (),
+    ) -> list[Card]:
+        return list(self.session.scalars(_due_stmt(now, limit, exclude_ids)).all())
+
+    @override
+    def add_answers(self, answers: dict[int, CardAnswers]) -> None:
+        if answers:
+            self.session.execute(_add_answers_stmt(), _answers_params(answers))
+
     @override
     def get(self, id: int) -> Card | None:
-        stmt = select(Card).where(Card.id == id)
+        stmt = select(Card).where(Card.id == id).options(*_full_card_options())
         return self.session.scalar(stmt)
 
+    @override
+    def get_version(self, id: int) -> Version | None:
+        row = self.session.execute(_version_stmt(id)).one_or_none()
+        return Version(*row) if row else None
+
+    @override
+    def get_deck_version(self) -> Version | None:
+        row = self.session.execute(_deck_version_stmt()).one_or_none()
+        return Version(*row) if row else None
+
+    @override
+    def count(self) -> int:
+        count = card_count_cache.get()
+        if count is None:
+            count = self.session.scalar(_count_stmt()) or 0
+            card_count_cache.set(count)
+        return count
+
     @override
     def get_list(
         self,
         skip: int = 0,
         limit: int = 100,
     ) -> tuple[int, list[Card]]:
-        count_stmt = select(func.count()).select_from(Card)
-        count = self.session.scalar(count_stmt)
-        count = count if count else 0
+        # (german_sort is german without its article, see strip_article, and
+        # it is indexed together with the id)
+        cards = self.session.scalars(_list_stmt(skip, limit)).all()
+        return (self.count(), list(cards))
+
+    @override
+    def get_slice(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+    ) -> tuple[list[Card], bool]:
+        cards = self.session.scalars(_list_stmt(skip, limit + 1)).all()
+        return (list(cards[:limit]), len(cards) > limit)
+
+    @override
+    def search(
+        self,
+        query: str,
+        skip: int = 0,
+        limit: int = 100,
+    ) -> tuple[list[Card], bool]:
+        terms = search_terms(query)
+        if not terms:
+            return ([], False)
+        dialect_name = self.session.get_bind().dialect.name
+        stmt = _search_stmt(dialect_name, terms, skip, limit + 1)
+        cards = self.session.scalars(stmt).all()
+        return (list(cards[:limit]), len(cards) > limit)
+
+    @override
+    def filter_by_tags(
+        self,
+        tags: list[str],
+        match_all: bool = True,
+        skip: int = 0,
+        limit: int = 100,
+    ) -> tuple[list[Card], bool]:
+        if not tags:
+            return ([], False)
+        stmt = _tags_stmt(tags, match_all, skip, limit + 1)
+        cards = self.session.scalars(stmt).all()
+        return (list(cards[:limit]), len(cards) > limit)
+
+    @override
+    def fuzzy_search(
+        self,
+        query: str,
+        limit: int = 10,
+    ) -> list[tuple[Card, float]]:
+        if self.session.get_bind().dialect.name == "postgresql":
+            rows = self.session.execute(_fuzzy_stmt(query, limit))
+            return [(card, score) for card, score in rows]
+
+        if not card_trigram_index.is_built:
+            card_trigram_index.begin_build()
+            try:
+                rows = self.session.execute(_trigram_rows_stmt()).all()
+            except BaseException:
+                card_trigram_index.abort_build()
+                raise
+            card_trigram_index.finish_build(_trigram_items(rows))
+        matches = _fuzzy_index_matches(query, limit)
+        cards = self.session.scalars(_cards_by_ids_stmt(list(matches))).all()
+        return _with_similarity(cards, matches)
+
+    @override
+    def get_page_after(
+        self,
+        cursor: Cursor | None,
+        limit: int = 100,
+    ) -> tuple[list[Card], Cursor | None]:
+        rows = self.session.execute(_page_after_stmt(cursor, limit)).all()
+        return _split_page(
+            [((sort_key, card.id), card) for card, sort_key in rows],
+            limit,
+        )
+
+
+class AbstractAsyncCardRepository(ABC):
+    """
+    Async counterpart of AbstractCardRepository (see there for the methods):
+    every method that might talk to the database is a coroutine. Imports and
+    exports need two more methods.
+    """
+
+    @abstractmethod
+    def add(self, card: Card) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def all(self) -> list[Card]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get(self, id: int) -> Card | None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_version(self, id: int) -> Version | None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_deck_version(self) -> Version | None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def count(self) -> int:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_list(self, skip: int, limit: int) -> tuple[int, list[Card]]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_slice(self, skip: int, limit: int) -> tuple[list[Card], bool]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def search(
+        self,
+        query: str,
+        skip: int,
+        limit: int,
+    ) -> tuple[list[Card], bool]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def filter_by_tags(
+        self,
+        tags: list[str],
+        match_all: bool,
+        skip: int,
+        limit: int,
+    ) -> tuple[list[Card], bool]:
+        raise NotImplementedError
 
-        # stmt = select(Card).order_by(Card.german).offset(skip).limit(limit)
+    @abstractmethod
+    async def fuzzy_search(
+        self,
+        query: str,
+        limit: int,
+    ) -> list[tuple[Card, float]]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_page_after(
+        self,
+        cursor: Cursor | None,
+        limit: int,
+    ) -> tuple[list[Card], Cursor | None]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def delete(self, card: Card) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_due(
+        self,
+        now: datetime.datetime,
+        limit: int,
+        exclude_ids: Collection[int] = (),
+    ) -> list[Card]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def add_answers(self, answers: dict[int, CardAnswers]) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def stream_rows(self, batch_size: int = 1_000) -> AsyncIterator[list]:
+        """
+        For exports: yields all cards in batches of plain rows (word_type,
+        id_relevance, german, italian) instead of ORM-objects, sorted like
+        get_slice.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def insert_many(self, values: list[dict]) -> set[tuple[str, str]]:
+        """
+        Bulk-insert for imports: inserts the given column-values (word_type,
+        id_relevance, german, italian) without creating ORM-objects and skips
+        cards that already exist. Returns (german, italian) of the inserted
+        cards.
+        """
+        raise NotImplementedError
+
+
+class FakeAsyncCardRepository(AbstractAsyncCardRepository):
+    """Async wrapper around a FakeCardRepository."""
+
+    def __init__(self, cards: set[Card]) -> None:
+        self._repository = FakeCardRepository(cards)
+
+    @override
+    def add(self, card: Card) -> None:
+        self._repository.add(card)
+
+    @override
+    async def all(self) -> list[Card]:
+        return self._repository.all()
+
+    @override
+    async def get(self, id: int) -> Card | None:
+        return self._repository.get(id)
+
+    @override
+    async def get_version(self, id: int) -> Version | None:
+        return self._repository.get_version(id)
+
+    @override
+    async def get_deck_version(self) -> Version | None:
+        return self._repository.get_deck_version()
+
+    @override
+    async def count(self) -> int:
+        return self._repository.count()
+
+    @override
+    async def get_list(self, skip: int, limit: int) -> tuple[int, list[Card]]:
+        return self._repository.get_list(skip, limit)
+
+    @override
+    async def get_slice(self, skip: int, limit: int) -> tuple[list[Card], bool]:
+        return self._repository.get_slice(skip, limit)
+
+    @override
+    async def search(
+        self,
+        query: str,
+        skip: int,
+        limit: int,
+    ) -> tuple[list[Card], bool]:
+        return self._repository.search(query, skip, limit)
+
+    @override
+    async def filter_by_tags(
+        self,
+        tags: list[str],
+        match_all: bool,
+        skip: int,
+        limit: int,
+    ) -> tuple[list[Card], bool]:
+        return self._repository.filter_by_tags(tags, match_all, skip, limit)
+
+    @override
+    async def fuzzy_search(
+        self,
+        query: str,
+        limit: int,
+    ) -> list[tuple[Card, float]]:
+        return self._repository.fuzzy_search(query, limit)
+
+    @override
+    async def get_page_after(
+        self,
+        cursor: Cursor | None,
+        limit: int,
+    ) -> tuple[list[Card], Cursor | None]:
+        return self._repository.get_page_after(cursor, limit)
+
+    @override
+    async def delete(self, card: Card) -> None:
+        self._repository.delete(card)
+
+    @override
+    async def get_due(
+        self,
+        now: datetime.datetime,
+        limit: int,
+        exclude_ids: Collection[int] = (),
+    ) -> list[Card]:
+        return self._repository.get_due(now, limit, exclude_ids)
+
+    @override
+    async def add_answers(self, answers: dict[int, CardAnswers]) -> None:
+        self._repository.add_answers(answers)
+
+    @override
+    async def stream_rows(self, batch_size: int = 1_000) -> AsyncIterator[list]:
+        cards, _ = self._repository.get_slice(0, self._repository.count())
+        rows = [
+            (card.word_type, card.id_relevance, card.german, card.italian)
+            for card in cards
+        ]
+        for start in range(0, len(rows), batch_size):
+            yield rows[start : start + batch_size]
+
+    @override
+    async def insert_many(self, values: list[dict]) -> set[tuple[str, str]]:
+        existing = set(self._repository.all())
+        inserted = set()
+        for value in values:
+            card = Card(relevance=None, **value)
+            if card not in existing:
+                self._repository.add(card)
+                existing.add(card)
+                inserted.add((card.german, card.italian))
+        return inserted
+
+
+class AsyncDbCardRepository(AbstractAsyncCardRepository):
+    """
+    Async counterpart of DbCardRepository for the asyncio-extension of
+    SqlAlchemy. Same queries, but every method that talks to the database
+    needs to be awaited.
+    """
+
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+
+    @override
+    def add(self, card: Card) -> None:
+        self.session.add(card)
+
+    @override
+    async def all(self) -> list[Card]:
+        stmt = select(Card).options(*_full_card_options())
+        return list((await self.session.scalars(stmt)).all())
+
+    @override
+    async def delete(self, card: Card) -> None:
+        await self.session.delete(card)
+
+    @override
+    async def get_due(
+        self,
+        now: datetime.datetime,
+        limit: int,
+        exclude_ids: Collection[int] = (),
+    ) -> list[Card]:
+        stmt = _due_stmt(now, limit, exclude_ids)
+        return list((await self.session.scalars(stmt)).all())
+
+    @override
+    async def add_answers(self, answers: dict[int, CardAnswers]) -> None:
+        if answers:
+            await self.session.execute(_add_answers_stmt(), _answers_params(answers))
+
+    @override
+    async def get(self, id: int) -> Card | None:
+        stmt = select(Card).where(Card.id == id).options(*_full_card_options())
+        return await self.session.scalar(stmt)
+
+    @override
+    async def get_version(self, id: int) -> Version | None:
+        row = (await self.session.execute(_version_stmt(id))).one_or_none()
+        return Version(*row) if row else None
+
+    @override
+    async def get_deck_version(self) -> Version | None:
+        row = (await self.session.execute(_deck_version_stmt())).one_or_none()
+        return Version(*row) if row else None
+
+    @override
+    async def count(self) -> int:
+        count = card_count_cache.get()
+        if count is None:
+            count = await self.session.scalar(_count_stmt()) or 0
+            card_count_cache.set(count)
+        return count
+
+    @override
+    async def get_list(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+    ) -> tuple[int, list[Card]]:
+        cards = (await self.session.scalars(_list_stmt(skip, limit))).all()
+        return (await self.count(), list(cards))
+
+    @override
+    async def get_slice(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+    ) -> tuple[list[Card], bool]:
+        cards = (await self.session.scalars(_list_stmt(skip, limit + 1))).all()
+        return (list(cards[:limit]), len(cards) > limit)
+
+    @override
+    async def get_page_after(
+        self,
+        cursor: Cursor | None,
+        limit: int = 100,
+    ) -> tuple[list[Card], Cursor | None]:
+        rows = (await self.session.execute(_page_after_stmt(cursor, limit))).all()
+        return _split_page(
+            [((sort_key, card.id), card) for card, sort_key in rows],
+            limit,
+        )
+
+    @override
+    async def search(
+        self,
+        query: str,
+        skip: int = 0,
+        limit: int = 100,
+    ) -> tuple[list[Card], bool]:
+        terms = search_terms(query)
+        if not terms:
+            return ([], False)
+        dialect_name = self.session.get_bind().dialect.name
+        stmt = _search_stmt(dialect_name, terms, skip, limit + 1)
+        cards = (await self.session.scalars(stmt)).all()
+        return (list(cards[:limit]), len(cards) > limit)
+
+    @override
+    async def filter_by_tags(
+        self,
+        tags: list[str],
+        match_all: bool = True,
+        skip: int = 0,
+        limit: int = 100,
+    ) -> tuple[list[Card], bool]:
+        if not tags:
+            return ([], False)
+        stmt = _tags_stmt(tags, match_all, skip, limit + 1)
+        cards = (await self.session.scalars(stmt)).all()
+        return (list(cards[:limit]), len(cards) > limit)
+
+    @override
+    async def fuzzy_search(
+        self,
+        query: str,
+        limit: int = 10,
+    ) -> list[tuple[Card, float]]:
+        if self.session.get_bind().dialect.name == "postgresql":
+            result = await self.session.execute(_fuzzy_stmt(query, limit))
+            return [tuple(row) for row in result]
+
+        if not card_trigram_index.is_built:
+            card_trigram_index.begin_build()
+            try:
+                rows = (await self.session.execute(_trigram_rows_stmt())).all()
+            except BaseException:
+                card_trigram_index.abort_build()
+                raise
+            card_trigram_index.finish_build(_trigram_items(rows))
+        matches = _fuzzy_index_matches(query, limit)
+        cards = (await self.session.scalars(_cards_by_ids_stmt(list(matches)))).all()
+        return _with_similarity(cards, matches)
+
+    @override
+    async def stream_rows(self, batch_size: int = 1_000) -> AsyncIterator[list]:
+        # The rows are read through a server-side cursor (if the driver has
+        # one), so the memory needed doesn't depend on the number of cards.
+        stmt = (
+            select(Card.word_type, Card.id_relevance, Card.german, Card.italian)
+            .order_by(Card.german_sort, Card.id)
+            .execution_options(yield_per=batch_size)
+        )
+        result = await self.session.stream(stmt)
+        async for rows in result.partitions():
+            yield rows
+
+    @override
+    async def insert_many(self, values: list[dict]) -> set[tuple[str, str]]:
+        if not values:
+            return set()
+        if self.session.get_bind().dialect.name == "postgresql":
+            return await self._copy_many(values)
+        stmt = (
+            sqlite.insert(Card)
+            .on_conflict_do_nothing(index_elements=["german", "italian"])
+            .returning(Card.id, Card.german, Card.italian)
+        )
+        # (executed as executemany with as few statements as possible)
+        result = await self.session.execute(stmt, values)
+        return self._record_inserted(result.all())
+
+    def _record_inserted(self, rows) -> set[tuple[str, str]]:
+        # inserted without the ORM, so the after_flush-event won't see them:
+        changes = get_card_changes(self.session.sync_session)
+        changes.count_added += len(rows)
+        for id, german, italian in rows:
+            changes.set_text(id, german, italian)
+        return {(german, italian) for _, german, italian in rows}
+
+    async def _copy_many(self, values: list[dict]) -> set[tuple[str, str]]:
+        # COPY is the fastest way into Postgres, but knows no "ON CONFLICT".
+        # So copy into a temporary table first and insert from there.
+        connection = await self.session.connection()
+        await connection.execute(
+            text(
+                "CREATE TEMPORARY TABLE card_import"
+                " (word_type text, id_relevance text, german text, italian text)"
+                " ON COMMIT DROP"  # even if the import fails before the DROP
+            )
+        )
+        raw_connection = await connection.get_raw_connection()
+        async with raw_connection.driver_connection.cursor() as cursor:
+            async with cursor.copy(
+                "COPY card_import (word_type, id_relevance, german, italian)"
+                " FROM STDIN"
+            ) as copy:
+                for value in values:
+                    await copy.write_row(
+                        (
+                            value["word_type"].name,
+                            value["id_relevance"],
+                            value["german"],
+                            value["italian"],
+                        )
+                    )
+        result = await connection.execute(
+            text(
+                'INSERT INTO "Card" (word_type, id_relevance, german, italian)'
+                " SELECT CAST(word_type AS wordtype), id_relevance, german, italian"
+                " FROM card_import"
+                " ON CONFLICT ON CONSTRAINT uq_german_italian DO NOTHING"
+                " RETURNING id, german, italian"
+            )
+        )
+        inserted = self._record_inserted(result.all())
+        await connection.execute(text("DROP TABLE card_import"))
+        return inserted
+
+
+# The relationships of Card are mapped with lazy="raise", so every query states
+# what its use case needs: a list-page only shows the relevance (joined into
+# the same query), while a single card is loaded completely to be changed. The
+# number of queries then doesn't depend on the number of cards, and a missing
+# option fails loudly instead of loading each card's relations one by one.
+# (Functions, since the attributes of Card only exist once it is mapped.)
+def _list_card_options() -> list:
+    return [joinedload(Card.relevance)]
+
+
+def _full_card_options() -> list:
+    return [joinedload(Card.relevance), selectinload(Card.tags)]
+
+
+def _deck_version_stmt() -> Select:
+    return select(
+        deck_version_table.c.version,
+        deck_version_table.c.modified_at,
+    ).where(deck_version_table.c.id == 1)
+
+
+def _version_stmt(id: int) -> Select:
+    # only columns, no card is loaded:
+    return (
+        select(Card.version, deck_version_table.c.modified_at)
+        .join_from(Card, deck_version_table, deck_version_table.c.id == 1)
+        .where(Card.id == id)
+    )
+
+
+def _add_answers_stmt() -> Update:
+    # Executed once per card (executemany). The counts are added to those in
+    # the database, so several processes may write their answers; the last
+    # answer (and the schedule after it) only replaces an older one.
+    c = card_table.c
+    last_played = bindparam("b_last_played", type_=c.last_played.type)
+    is_newer = or_(c.last_played.is_(None), c.last_played <= last_played)
+
+    def if_newer(column, name: str):
+        return case((is_newer, bindparam(name, type_=column.type)), else_=column)
+
+    return (
+        update(card_table)
+        .where(c.id == bindparam("b_id"))
+        .values(
+            times_played=c.times_played + bindparam("b_times_played"),
+            correct_answers=c.correct_answers + bindparam("b_correct_answers"),
+            last_answer_correct=if_newer(
+                c.last_answer_correct, "b_last_answer_correct"
+            ),
+            last_played=if_newer(c.last_played, "b_last_played"),
+            box=if_newer(c.box, "b_box"),
+            due_at=if_newer(c.due_at, "b_due_at"),
+        )
+    )
+
+
+def _answers_params(answers: dict[int, CardAnswers]) -> list[dict]:
+    return [
+        {
+            "b_id": id,
+            "b_times_played": card_answers.times_played,
+            "b_correct_answers": card_answers.correct_answers,
+            "b_last_answer_correct": card_answers.last_answer_correct,
+            "b_last_played": card_answers.last_played,
+            "b_box": card_answers.box,
+            "b_due_at": card_answers.due_at,
+        }
+        for id, card_answers in answers.items()
+    ]
+
+
+def _count_stmt() -> Select:
+    return select(func.count()).select_from(Card)
+
+
+def _due_stmt(
+    now: datetime.datetime,
+    limit: int,
+    exclude_ids: Collection[int],
+) -> Select:
+    # a range of the index on (due_at, id), read in its order:
+    stmt = (
+        select(Card)
+        .where(Card.due_at <= now)
+        .order_by(Card.due_at, Card.id)
+        .limit(limit)
+        .options(*_list_card_options())
+    )
+    if exclude_ids:
+        stmt = stmt.where(Card.id.not_in(exclude_ids))
+    return stmt
+
+
+def _list_stmt(skip: int, limit: int) -> Select:
+    return (
+        select(Card)
+        .order_by(Card.german_sort, Card.id)
+        .offset(skip)
+        .limit(limit)
+        .options(*_list_card_options())
+    )
+
+
+# Short terms match too many cards: a single character is only searched as a
+# whole word, and the matches are only ranked if all terms have at least three
+# characters (otherwise they are returned in the order of the index, which
+# needs no sorting). So even short queries stay fast on large decks.
+MIN_PREFIX_TERM_LENGTH = 2
+MIN_RANKED_TERM_LENGTH = 3
+
+
+def _search_stmt(
+    dialect_name: str,
+    terms: list[str],
+    skip: int,
+    limit: int,
+) -> Select:
+    # Uses the search-index of core.db.tables.card_search. The ranking is the
+    # one of the database (bm25 or ts_rank), the id makes the order of equally
+    # ranked cards stable.
+    ranked = min(len(term) for term in terms) >= MIN_RANKED_TERM_LENGTH
+    prefix_terms = [
+        (term, len(term) >= MIN_PREFIX_TERM_LENGTH) for term in terms
+    ]
+    if dialect_name == "postgresql":
+        search_vector = literal_column('"Card".search_vector')
+        ts_query = func.to_tsquery(
+            literal_column("'simple'"),
+            " & ".join(
+                f"{term}:*" if is_prefix else term
+                for term, is_prefix in prefix_terms
+            ),
+        )
+        stmt = select(Card).where(search_vector.op("@@")(ts_query))
+        if ranked:
+            stmt = stmt.order_by(func.ts_rank(search_vector, ts_query).desc())
+        stmt = stmt.order_by(Card.id)
+    else:
+        card_fts = table("Card_fts", column("rowid"), column("rank"))
+        fts_query = " ".join(
+            f'"{term}"*' if is_prefix else f'"{term}"'
+            for term, is_prefix in prefix_terms
+        )
         stmt = (
             select(Card)
-            .order_by(self.strip_article(Card.german))
-            .offset(skip)
-            .limit(limit)
+            .join(card_fts, card_fts.c.rowid == Card.id)
+            .where(
+                text('"Card_fts" MATCH :fts_query').bindparams(fts_query=fts_query)
+            )
         )
-        cards = self.session.scalars(stmt).all()
+        if ranked:
+            stmt = stmt.order_by(card_fts.c.rank)
+        # (the rowid of the fts-table, since FTS5 returns its matches sorted by
+        # rowid anyway, while sorting by Card.id would need a temporary b-tree)
+        stmt = stmt.order_by(card_fts.c.rowid)
+    return stmt.offset(skip).limit(limit).options(*_list_card_options())
 
-        return (count, list(cards))
 
-    # Generate a SQL expression to strip the article
-    def strip_article(self, column):
-        # Case when the column starts with an article, skip the article
-        conditions = [
-            (column.like(f"{article} %"), func.substr(column, len(article) + 2))
-            for article in ["der", "die", "das"]
-        ]
-        # Construct the case statement with conditions
-        return case(*conditions, else_=column)
+def _tags_stmt(
+    tags: list[str],
+    match_all: bool,
+    skip: int,
+    limit: int,
+) -> Select:
+    # The ids of the matching cards come from Card_has_Tag alone: the tags are
+    # looked up by their unique value, then the index on (id_tag, id_card)
+    # yields the cards of each tag. Grouped by card, a card has all tags if it
+    # was found once per tag (the primary key rules out duplicates).
+    values = set(tags)
+    card_ids = (
+        select(card_has_tag_table.c.id_card)
+        .join(tag_table, tag_table.c.id == card_has_tag_table.c.id_tag)
+        .where(tag_table.c.value.in_(values))
+    )
+    if match_all and len(values) > 1:
+        card_ids = card_ids.group_by(card_has_tag_table.c.id_card).having(
+            func.count() == len(values)
+        )
+    return (
+        select(Card)
+        .where(Card.id.in_(card_ids))
+        .order_by(Card.german_sort, Card.id)
+        .offset(skip)
+        .limit(limit)
+        .options(*_list_card_options())
+    )
+
+
+def _fuzzy_stmt(query: str, limit: int) -> Select:
+    # Postgres: "%" is the similarity-operator of pg_trgm (with the threshold
+    # pg_trgm.similarity_threshold), which can use the trigram-indexes of
+    # core.db.tables.card_search.
+    score = func.greatest(
+        func.similarity(Card.german_sort, query),
+        func.similarity(Card.italian, query),
+    ).label("similarity")
+    return (
+        select(Card, score)
+        .where(or_(Card.german_sort.op("%")(query), Card.italian.op("%")(query)))
+        .order_by(score.desc(), Card.id)
+        .limit(limit)
+        .options(*_list_card_options())
+    )
+
+
+def _trigram_rows_stmt() -> Select:
+    return select(Card.id, Card.german, Card.italian)
+
+
+def _trigram_items(rows) -> list[tuple[int, str]]:
+    items = []
+    for id, german, italian in rows:
+        items.append((2 * id, strip_article(german)))
+        items.append((2 * id + 1, italian))
+    return items
+
+
+def _fuzzy_index_matches(query: str, limit: int) -> dict[int, float]:
+    """Returns the best similarity of german or italian by id of the card."""
+    matches: dict[int, float] = {}
+    # (twice the limit, since both texts of a card may be among the matches)
+    for key, score in card_trigram_index.search(
+        query,
+        limit=2 * limit,
+        threshold=FUZZY_THRESHOLD,
+    ):
+        matches.setdefault(key // 2, score)  # (the best match comes first)
+    return dict(list(matches.items())[:limit])
+
+
+def _cards_by_ids_stmt(ids: list[int]) -> Select:
+    return select(Card).where(Card.id.in_(ids)).options(*_list_card_options())
+
+
+def _with_similarity(
+    cards,
+    matches: dict[int, float],
+) -> list[tuple[Card, float]]:
+    cards_by_id = {card.id: card for card in cards}
+    return [
+        (cards_by_id[id], score) for id, score in matches.items() if id in cards_by_id
+    ]
+
+
+def _page_after_stmt(cursor: Cursor | None, limit: int) -> Select:
+    # The index on (german_sort, id) lets the database seek directly to the
+    # cursor, so the cost of a page doesn't depend on how deep it is. One card
+    # more than needed tells us whether there is a next page.
+    stmt = (
+        select(Card, Card.german_sort)
+        .order_by(Card.german_sort, Card.id)
+        .limit(limit + 1)
+        .options(*_list_card_options())
+    )
+    if cursor:
+        stmt = stmt.where(
+            tuple_(Card.german_sort, Card.id) > tuple_(cursor.sort_key, cursor.id)
+        )
+    return stmt
+
+
+def _split_page(
+    keyed_cards: list[tuple[tuple[str, int], Card]],
+    limit: int,
+) -> tuple[list[Card], Cursor | None]:
+    page = keyed_cards[:limit]
+    cards = [card for _, card in page]
+    if len(keyed_cards) <= limit or not page:
+        return (cards, None)
+    (sort_key, id), _ = page[-1]
+    return (cards, Cursor(sort_key=sort_key, id=id))
@@ -1,9 +1,32 @@
 from abc import ABC, abstractmethod
 
 from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from core.domain.relevance import Relevance
+from core.utils.caching import (
+    LruCache,
+    detached_copy,
+    invalidate_after_commit,
+    is_invalidation_pending,
+)
+
+
+# Every write of a card looks up its relevance, which hardly ever changes. The
+# cache holds detached copies (see core.utils.caching.detached_copy) that each
+# session merges without a query. Adding, changing or deleting a relevance
+# invalidates its entry once committed (see collect_relevance_changes), changes
+# by other processes show up after the ttl.
+RELEVANCE_CACHE_TTL = 300
+relevance_cache = LruCache(maxsize=128, ttl=RELEVANCE_CACHE_TTL)
+
+
+def collect_relevance_changes(session: Session, flush_context) -> None:
+    """Listener for the "after_flush"-event of a session."""
+    for instance in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(instance, Relevance):
+            invalidate_after_commit(session, relevance_cache, instance.id)
 
 
 class AbstractRelevanceRepository(ABC):
@@ -62,3 +85,157 @@ class DbRelevanceRepository(AbstractRelevanceRepository):
 
     def delete(self, relevance: Relevance) -> None:
         self.session.delete(relevance)
+
+
+class CachedRelevanceRepository(AbstractRelevanceRepository):
+    """Read-through cache around a DbRelevanceRepository."""
+
+    def __init__(
+        self,
+        repository: DbRelevanceRepository,
+        cache: LruCache = relevance_cache,
+    ) -> None:
+        self.repository = repository
+        self.cache = cache
+
+    def add(self, relevance: Relevance) -> None:
+        invalidate_after_commit(self.repository.session, self.cache, relevance.id)
+        self.repository.add(relevance)
+
+    def all(self) -> list[Relevance]:
+        return self.repository.all()
+
+    def get_by_id(self, id: str) -> Relevance | None:
+        session = self.repository.session
+        if is_invalidation_pending(session, self.cache, id):
+            return self.repository.get_by_id(id)
+        cached = self.cache.get(id)
+        if cached is not None:
+            return session.merge(cached, load=False)
+        relevance = self.repository.get_by_id(id)
+        if relevance is not None:
+            self.cache.set(id, detached_copy(relevance))
+        return relevance
+
+    def delete(self, relevance: Relevance) -> None:
+        invalidate_after_commit(self.repository.session, self.cache, relevance.id)
+        self.repository.delete(relevance)
+
+
+class AbstractAsyncRelevanceRepository(ABC):
+    """Async counterpart of AbstractRelevanceRepository."""
+
+    @abstractmethod
+    def add(self, relevance: Relevance) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def all(self) -> list[Relevance]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_by_id(self, id: str) -> Relevance | None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_existing_ids(self, ids: set[str]) -> set[str]:
+        """Returns those of the given ids that exist."""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def delete(self, relevance: Relevance) -> None:
+        raise NotImplementedError
+
+
+class FakeAsyncRelevanceRepository(AbstractAsyncRelevanceRepository):
+    def __init__(self, relevance_levels: set[Relevance]) -> None:
+        self._repository = FakeRelevanceRepository(relevance_levels)
+
+    def add(self, relevance: Relevance) -> None:
+        self._repository.add(relevance)
+
+    async def all(self) -> list[Relevance]:
+        return self._repository.all()
+
+    async def get_by_id(self, id: str) -> Relevance | None:
+        return self._repository.get_by_id(id)
+
+    async def get_existing_ids(self, ids: set[str]) -> set[str]:
+        return ids & {relevance.id for relevance in self._repository.all()}
+
+    async def delete(self, relevance: Relevance) -> None:
+        self._repository.delete(relevance)
+
+
+class AsyncDbRelevanceRepository(AbstractAsyncRelevanceRepository):
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+
+    def add(self, relevance: Relevance) -> None:
+        self.session.add(relevance)
+
+    async def all(self) -> list[Relevance]:
+        stmt = select(Relevance)
+        return list((await self.session.scalars(stmt)).all())
+
+    async def get_by_id(self, id: str) -> Relevance | None:
+        stmt = select(Relevance).where(Relevance.id == id)
+        return await self.session.scalar(stmt)
+
+    async def get_existing_ids(self, ids: set[str]) -> set[str]:
+        # (with one query)
+        if not ids:
+            return set()
+        stmt = select(Relevance.id).where(Relevance.id.in_(ids))
+        return set((await self.session.scalars(stmt)).all())
+
+    async def delete(self, relevance: Relevance) -> None:
+        await self.session.delete(relevance)
+
+
+class AsyncCachedRelevanceRepository(AbstractAsyncRelevanceRepository):
+    """Read-through cache around an AsyncDbRelevanceRepository."""
+
+    def __init__(
+        self,
+        repository: AsyncDbRelevanceRepository,
+        cache: LruCache = relevance_cache,
+    ) -> None:
+        self.repository = repository
+        self.cache = cache
+
+    def add(self, relevance: Relevance) -> None:
+        invalidate_after_commit(self._sync_session, self.cache, relevance.id)
+        self.repository.add(relevance)
+
+    async def all(self) -> list[Relevance]:
+        return await self.repository.all()
+
+    async def get_by_id(self, id: str) -> Relevance | None:
+        if is_invalidation_pending(self._sync_session, self.cache, id):
+            return await self.repository.get_by_id(id)
+        cached = self.cache.get(id)
+        if cached is not None:
+            return await self.repository.session.merge(cached, load=False)
+        relevance = await self.repository.get_by_id(id)
+        if relevance is not None:
+            self.cache.set(id, detached_copy(relevance))
+        return relevance
+
+    async def get_existing_ids(self, ids: set[str]) -> set[str]:
+        # (only tests for entries, so the statistics of the cache count lookups)
+        cached_ids = {
+            id
+            for id in ids
+            if id in self.cache
+            and not is_invalidation_pending(self._sync_session, self.cache, id)
+        }
+        return cached_ids | await self.repository.get_existing_ids(ids - cached_ids)
+
+    async def delete(self, relevance: Relevance) -> None:
+        invalidate_after_commit(self._sync_session, self.cache, relevance.id)
+        await self.repository.delete(relevance)
+
+    @property
+    def _sync_session(self) -> Session:
+        return self.repository.session.sync_session
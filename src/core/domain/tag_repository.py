@@ -1,9 +1,29 @@
 from abc import ABC, abstractmethod
 
 from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from core.domain.tag import Tag
+from core.utils.caching import (
+    LruCache,
+    detached_copy,
+    invalidate_after_commit,
+    is_invalidation_pending,
+)
+
+
+# Tags are looked up by their value, like relevance-levels they rarely change
+# (see core.domain.relevance_repository for how the cache works).
+TAG_CACHE_TTL = 300
+tag_cache = LruCache(maxsize=1024, ttl=TAG_CACHE_TTL)
+
+
+def collect_tag_changes(session: Session, flush_context) -> None:
+    """Listener for the "after_flush"-event of a session."""
+    for instance in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(instance, Tag):
+            invalidate_after_commit(session, tag_cache, instance.value)
 
 
 class AbstractTagRepository(ABC):
@@ -62,3 +82,132 @@ class DbTagRepository(AbstractTagRepository):
 
     def delete(self, tag: Tag) -> None:
         self.session.delete(tag)
+
+
+class CachedTagRepository(AbstractTagRepository):
+    """Read-through cache around a DbTagRepository."""
+
+    def __init__(
+        self,
+        repository: DbTagRepository,
+        cache: LruCache = tag_cache,
+    ) -> None:
+        self.repository = repository
+        self.cache = cache
+
+    def add(self, tag: Tag) -> None:
+        invalidate_after_commit(self.repository.session, self.cache, tag.value)
+        self.repository.add(tag)
+
+    def all(self) -> list[Tag]:
+        return self.repository.all()
+
+    def get_by_value(self, value: str) -> Tag | None:
+        session = self.repository.session
+        if is_invalidation_pending(session, self.cache, value):
+            return self.repository.get_by_value(value)
+        cached = self.cache.get(value)
+        if cached is not None:
+            return session.merge(cached, load=False)
+        tag = self.repository.get_by_value(value)
+        if tag is not None:
+            self.cache.set(value, detached_copy(tag))
+        return tag
+
+    def delete(self, tag: Tag) -> None:
+        invalidate_after_commit(self.repository.session, self.cache, tag.value)
+        self.repository.delete(tag)
+
+
+class AbstractAsyncTagRepository(ABC):
+    """Async counterpart of AbstractTagRepository."""
+
+    @abstractmethod
+    def add(self, tag: Tag) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def all(self) -> list[Tag]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_by_value(self, value: str) -> Tag | None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def delete(self, tag: Tag) -> None:
+        raise NotImplementedError
+
+
+class FakeAsyncTagRepository(AbstractAsyncTagRepository):
+    def __init__(self, tags: set[Tag]) -> None:
+        self._repository = FakeTagRepository(tags)
+
+    def add(self, tag: Tag) -> None:
+        self._repository.add(tag)
+
+    async def all(self) -> list[Tag]:
+        return self._repository.all()
+
+    async def get_by_value(self, value: str) -> Tag | None:
+        return self._repository.get_by_value(value)
+
+    async def delete(self, tag: Tag) -> None:
+        self._repository.delete(tag)
+
+
+class AsyncDbTagRepository(AbstractAsyncTagRepository):
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+
+    def add(self, tag: Tag) -> None:
+        self.session.add(tag)
+
+    async def all(self) -> list[Tag]:
+        stmt = select(Tag)
+        return list((await self.session.scalars(stmt)).all())
+
+    async def get_by_value(self, value: str) -> Tag | None:
+        stmt = select(Tag).where(Tag.value == value)
+        return await self.session.scalar(stmt)
+
+    async def delete(self, tag: Tag) -> None:
+        await self.session.delete(tag)
+
+
+class AsyncCachedTagRepository(AbstractAsyncTagRepository):
+    """Read-through cache around an AsyncDbTagRepository."""
+
+    def __init__(
+        self,
+        repository: AsyncDbTagRepository,
+        cache: LruCache = tag_cache,
+    ) -> None:
+        self.repository = repository
+        self.cache = cache
+
+    def add(self, tag: Tag) -> None:
+        invalidate_after_commit(self._sync_session, self.cache, tag.value)
+        self.repository.add(tag)
+
+    async def all(self) -> list[Tag]:
+        return await self.repository.all()
+
+    async def get_by_value(self, value: str) -> Tag | None:
+        if is_invalidation_pending(self._sync_session, self.cache, value):
+            return await self.repository.get_by_value(value)
+        cached = self.cache.get(value)
+        if cached is not None:
+            return await self.repository.session.merge(cached, load=False)
+        tag = await self.repository.get_by_value(value)
+        if tag is not None:
+            self.cache.set(value, detached_copy(tag))
+        return tag
+
+    async def delete(self, tag: Tag) -> None:
+        invalidate_after_commit(self._sync_session, self.cache, tag.value)
+        await self.repository.delete(tag)
+
+    @property
+    def _sync_session(self) -> Session:
+        return self.repository.session.sync_session
@@ -0,0 +1,261 @@
+"""
+Async versions of the use cases in core.services.cards.crud.
+
+They implement exactly the same business-logic, but work with an
+AbstractAsyncUnitOfWork, so the web-app can run them directly on the
+event-loop without blocking it (and without occupying a thread of the
+threadpool for each request). The sync versions stay the entry-point for
+scripts and tests.
+"""
+
+from sqlalchemy.exc import IntegrityError
+
+from core.domain.card import Card
+from core.domain.card_repository import Version
+from core.domain.word_type import WordType
+from core.exceptions import DuplicateResourceError, ResourceNotFoundError
+from core.services.unit_of_work import AbstractAsyncUnitOfWork
+from core.utils.pagination import Cursor, CursorPaginationResult, PaginationResult
+from core.utils.logging_utils import log_method
+
+
+@log_method
+async def create_card_in_db(
+    word_type: WordType,
+    relevance_id: str,
+    german: str,
+    italian: str,
+    uow: AbstractAsyncUnitOfWork,
+) -> Card:
+    try:
+        async with uow:
+            # Business validation:
+            relevance = await uow.relevance_levels.get_by_id(id=relevance_id)
+            if not relevance:
+                raise ResourceNotFoundError("Relevance", relevance_id)
+
+            # Processing:
+            new_card = Card(
+                word_type=word_type,
+                relevance=relevance,
+                german=german,
+                italian=italian,
+            )
+            uow.cards.add(new_card)
+            await uow.commit()
+            await uow.refresh(new_card)
+            uow.expunge(new_card)
+        return new_card
+    except IntegrityError:
+        raise DuplicateResourceError("Card")
+
+
+@log_method
+async def read_card_from_db(
+    id_card: int,
+    uow: AbstractAsyncUnitOfWork,
+) -> Card:
+    async with uow:
+        card = await uow.cards.get(id=id_card)
+        if not card:
+            raise ResourceNotFoundError("Card", id_card)
+        uow.expunge(card)
+    return card
+
+
+@log_method
+async def read_card_version_from_db(
+    id_card: int,
+    uow: AbstractAsyncUnitOfWork,
+) -> Version | None:
+    """
+    Use case: Returns the version of the card (None if it doesn't exist), to
+    tell whether a client's copy is still current without loading the card.
+    """
+    async with uow:
+        return await uow.cards.get_version(id=id_card)
+
+
+@log_method
+async def read_deck_version_from_db(uow: AbstractAsyncUnitOfWork) -> Version | None:
+    """Use case: Returns the version of the deck, changed by each card-write."""
+    async with uow:
+        return await uow.cards.get_deck_version()
+
+
+@log_method
+async def read_cards_from_db(
+    uow: AbstractAsyncUnitOfWork,
+    page: int = 1,
+    page_size: int = 100,
+    with_count: bool = True,
+) -> PaginationResult:
+    """
+    Use case: Returns detached objects to use them for templates or as a JSON-
+    response. See the sync version for why expunge_all() is needed here and
+    for with_count.
+    """
+    skip = (page - 1) * page_size
+    if not with_count:
+        async with uow:
+            cards, has_next_page = await uow.cards.get_slice(
+                skip=skip,
+                limit=page_size,
+            )
+            uow.expunge_all()  # needs to be called!
+        return PaginationResult.build_without_count(
+            records=cards,
+            page_size=page_size,
+            current_page=page,
+            has_next_page=has_next_page,
+        )
+
+    async with uow:
+        count_cards, cards = await uow.cards.get_list(skip=skip, limit=page_size)
+        uow.expunge_all()  # needs to be called!
+
+    return PaginationResult.build(
+        records=cards,
+        count_records=count_cards,
+        page_size=page_size,
+        current_page=page,
+    )
+
+
+@log_method
+async def search_cards_in_db(
+    query: str,
+    uow: AbstractAsyncUnitOfWork,
+    page: int = 1,
+    page_size: int = 100,
+) -> PaginationResult:
+    """
+    Use case: Returns the cards matching the search-query, best matches first.
+    The matches are not counted (see read_cards_from_db).
+    """
+    skip = (page - 1) * page_size
+    async with uow:
+        cards, has_next_page = await uow.cards.search(
+            query=query,
+            skip=skip,
+            limit=page_size,
+        )
+        uow.expunge_all()  # needs to be called!
+    return PaginationResult.build_without_count(
+        records=cards,
+        page_size=page_size,
+        current_page=page,
+        has_next_page=has_next_page,
+    )
+
+
+@log_method
+async def filter_cards_by_tags_in_db(
+    tags: list[str],
+    uow: AbstractAsyncUnitOfWork,
+    match_all: bool = True,
+    page: int = 1,
+    page_size: int = 100,
+) -> PaginationResult:
+    """
+    Use case: Returns the cards with all (match_all) or any of the given tags,
+    sorted like read_cards_from_db. The matches are not counted.
+    """
+    skip = (page - 1) * page_size
+    async with uow:
+        cards, has_next_page = await uow.cards.filter_by_tags(
+            tags=tags,
+            match_all=match_all,
+            skip=skip,
+            limit=page_size,
+        )
+        uow.expunge_all()  # needs to be called!
+    return PaginationResult.build_without_count(
+        records=cards,
+        page_size=page_size,
+        current_page=page,
+        has_next_page=has_next_page,
+    )
+
+
+@log_method
+async def fuzzy_search_cards_in_db(
+    query: str,
+    uow: AbstractAsyncUnitOfWork,
+    limit: int = 10,
+) -> list[tuple[Card, float]]:
+    """
+    Use case: Returns the cards most similar to the (maybe misspelled) query,
+    each with its similarity, best first.
+    """
+    async with uow:
+        matches = await uow.cards.fuzzy_search(query=query, limit=limit)
+        uow.expunge_all()  # needs to be called!
+    return matches
+
+
+@log_method
+async def read_cards_after_cursor_from_db(
+    uow: AbstractAsyncUnitOfWork,
+    cursor: Cursor | None = None,
+    page_size: int = 100,
+) -> CursorPaginationResult:
+    """
+    Use case: Like read_cards_from_db, but with keyset-pagination. The cost of
+    a page stays the same no matter how deep the client pages, and there is
+    no count of all cards. Without a cursor the first page is returned.
+    """
+    async with uow:
+        cards, next_cursor = await uow.cards.get_page_after(
+            cursor=cursor,
+            limit=page_size,
+        )
+        uow.expunge_all()  # needs to be called, see read_cards_from_db!
+
+    return CursorPaginationResult(
+        records=cards,
+        page_size=page_size,
+        next_cursor=next_cursor.encode() if next_cursor else None,
+    )
+
+
+@log_method
+async def update_card_in_db(
+    id_card: int,
+    word_type: WordType,
+    relevance_id: str,
+    german: str,
+    italian: str,
+    uow: AbstractAsyncUnitOfWork,
+) -> Card:
+    async with uow:
+        card = await uow.cards.get(id=id_card)
+        if not card:
+            raise ResourceNotFoundError("Card", id_card)
+
+        card.word_type = word_type
+        card.german = german
+        card.italian = italian
+
+        relevance = await uow.relevance_levels.get_by_id(relevance_id)
+        if not relevance:
+            raise ResourceNotFoundError("Relevance", relevance_id)
+        card.relevance = relevance
+
+        await uow.commit()
+        await uow.refresh(card)
+        uow.expunge(card)
+    return card
+
+
+@log_method
+async def delete_card_in_db(
+    id_card: int,
+    uow: AbstractAsyncUnitOfWork,
+) -> None:
+    async with uow:
+        card = await uow.cards.get(id=id_card)
+        if not card:
+            raise ResourceNotFoundError("Card", id_card)
+        await uow.cards.delete(card=card)
+        await uow.commit()
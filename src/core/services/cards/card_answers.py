@@ -0,0 +1,207 @@
+"""
+Use case: Answer a card - and keep the statistics of the answers.
+
+Each card counts how often it was played and answered correctly, and when it
+was played last (see Card.update_statistics); the answer also decides when the
+card is due again (see Card.reschedule and core.services.cards.study).
+Writing these for each answer would cost a transaction per answer, so they
+are written behind:
+
+- answer_card() only reads the card and adds the answer to an AnswerBuffer in
+  memory (one per process, answers to the same card are combined).
+- An AnswerWriter (started in the lifespan of the web-app) writes the buffer
+  in one transaction, with one UPDATE per card: every FLUSH_INTERVAL seconds,
+  or as soon as answers to MAX_PENDING_CARDS cards are pending.
+
+The UPDATEs add the counts to those in the database, so several processes can
+write their answers concurrently. If writing fails, the answers are put back
+into the buffer for the next try; answers that are still pending when the
+process is killed are lost (on shutdown the writer writes them).
+Until then, the cards read from the database don't show them yet.
+"""
+
+import asyncio
+from collections.abc import Callable
+import dataclasses
+from dataclasses import dataclass
+import datetime
+import logging
+import threading
+
+from core.domain.card import CardAnswers
+from core.exceptions import ResourceNotFoundError
+from core.services.unit_of_work import AbstractAsyncUnitOfWork
+from core.utils.logging_utils import log_method
+
+logger = logging.getLogger(__name__)
+
+FLUSH_INTERVAL = 2.0  # seconds
+MAX_PENDING_CARDS = 500
+
+
+class AnswerBuffer:
+    def __init__(self, max_pending: int = MAX_PENDING_CARDS) -> None:
+        self.max_pending = max_pending
+        # called on each add while answers to max_pending (or more, after a
+        # put_back) cards are pending:
+        self.on_full: Callable[[], None] | None = None
+        self._lock = threading.Lock()
+        self._pending: dict[int, CardAnswers] = {}  # by the id of the card
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def add(self, id_card: int, answers: CardAnswers) -> None:
+        with self._lock:
+            card_answers = self._pending.get(id_card)
+            if card_answers is None:
+                card_answers = self._pending[id_card] = CardAnswers()
+            card_answers.add_answers(answers)
+            is_full = len(self._pending) >= self.max_pending
+        if is_full and self.on_full is not None:
+            self.on_full()
+
+    def get(self, id_card: int) -> CardAnswers | None:
+        """A copy of the pending answers to the card."""
+        with self._lock:
+            card_answers = self._pending.get(id_card)
+            return dataclasses.replace(card_answers) if card_answers else None
+
+    def ids_not_due(self, now: datetime.datetime) -> list[int]:
+        """The cards that are not due anymore after their pending answers."""
+        with self._lock:
+            return [
+                id_card
+                for id_card, card_answers in self._pending.items()
+                if card_answers.due_at is not None and card_answers.due_at > now
+            ]
+
+    def drain(self) -> dict[int, CardAnswers]:
+        """Takes all pending answers out of the buffer."""
+        with self._lock:
+            pending = self._pending
+            self._pending = {}
+        return pending
+
+    def put_back(self, answers: dict[int, CardAnswers]) -> None:
+        """For answers that couldn't be written (combined with newer ones)."""
+        with self._lock:
+            for id_card, card_answers in answers.items():
+                pending = self._pending.get(id_card)
+                if pending is not None:
+                    card_answers.add_answers(pending)
+                self._pending[id_card] = card_answers
+
+
+# the buffer of this process:
+answer_buffer = AnswerBuffer()
+
+
+@dataclass(frozen=True)
+class AnswerResult:
+    correct: bool
+    solution: str
+
+
+@log_method
+async def answer_card(
+    id_card: int,
+    solve_italian: bool,
+    guess: str,
+    uow: AbstractAsyncUnitOfWork,
+    buffer: AnswerBuffer = answer_buffer,
+) -> AnswerResult:
+    """
+    Use case: Checks a guess of the italian (or german) word of the card and
+    records the answer in the buffer. The unit of work may be read-only.
+    """
+    async with uow:
+        card = await uow.cards.get(id=id_card)
+        if not card:
+            raise ResourceNotFoundError("Card", id_card)
+        uow.expunge(card)
+    # (the box of the card depends on the answers not written yet)
+    pending = buffer.get(id_card)
+    if pending is not None:
+        card.add_answers(pending)
+    correct = card.solve(solve_italian=solve_italian, guess=guess)
+    buffer.add(id_card, card.last_answer())
+    return AnswerResult(
+        correct=correct,
+        solution=card.italian if solve_italian else card.german,
+    )
+
+
+async def write_answers_to_db(
+    uow: AbstractAsyncUnitOfWork,
+    buffer: AnswerBuffer = answer_buffer,
+) -> int:
+    """
+    Use case: Writes the pending answers of the buffer in one transaction.
+    Returns the number of cards written.
+    """
+    answers = buffer.drain()
+    if not answers:
+        return 0
+    try:
+        async with uow:
+            await uow.cards.add_answers(answers)
+            await uow.commit()
+    except BaseException:
+        buffer.put_back(answers)
+        raise
+    return len(answers)
+
+
+class AnswerWriter:
+    """
+    Background-task that writes the answers of the buffer every interval
+    seconds, or as soon as it is full. Needs a fresh unit of work per write.
+    """
+
+    def __init__(
+        self,
+        make_uow: Callable[[], AbstractAsyncUnitOfWork],
+        buffer: AnswerBuffer = answer_buffer,
+        interval: float = FLUSH_INTERVAL,
+    ) -> None:
+        self.make_uow = make_uow
+        self.buffer = buffer
+        self.interval = interval
+        self._full = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        # (the buffer calls on_full in the thread of the event-loop)
+        self.buffer.on_full = self._full.set
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stops the task and writes what is still pending."""
+        self.buffer.on_full = None
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.write()
+
+    async def write(self) -> None:
+        try:
+            count = await write_answers_to_db(self.make_uow(), self.buffer)
+        except Exception:
+            logger.exception("Writing the answers failed, retrying later.")
+        else:
+            if count:
+                logger.debug("Answers to %s cards written.", count)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._full.wait(), timeout=self.interval)
+            except TimeoutError:
+                pass
+            self._full.clear()
+            await self.write()
@@ -0,0 +1,65 @@
+"""
+Use case: Export all cards as CSV or NDJSON, in the same format the import
+reads (see core.services.cards.card_import).
+
+The export is an async generator of text-chunks, meant to be streamed as the
+body of a response: the first chunk is sent as soon as the first batch of
+cards has been read, and only one batch is in memory at a time.
+
+The word type of a card may be missing (the column is nullable); it is
+exported as an empty value, which the import reports as an error of its row
+instead of failing halfway through the streamed response.
+"""
+
+from collections.abc import AsyncIterator, Sequence
+import csv
+import io
+import json
+
+from core.services.cards.card_import import IMPORT_FIELDS
+from core.services.unit_of_work import AbstractAsyncUnitOfWork
+
+
+EXPORT_BATCH_SIZE = 1_000
+
+
+async def export_cards_as_csv(
+    uow: AbstractAsyncUnitOfWork,
+    batch_size: int = EXPORT_BATCH_SIZE,
+) -> AsyncIterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+
+    def flush() -> str:
+        text = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return text
+
+    writer.writerow(IMPORT_FIELDS)
+    yield flush()
+    async with uow:
+        async for rows in uow.cards.stream_rows(batch_size=batch_size):
+            writer.writerows(_export_row(row) for row in rows)
+            yield flush()
+
+
+async def export_cards_as_ndjson(
+    uow: AbstractAsyncUnitOfWork,
+    batch_size: int = EXPORT_BATCH_SIZE,
+) -> AsyncIterator[str]:
+    async with uow:
+        async for rows in uow.cards.stream_rows(batch_size=batch_size):
+            yield "".join(
+                json.dumps(
+                    dict(zip(IMPORT_FIELDS, _export_row(row))),
+                    ensure_ascii=False,
+                )
+                + "\n"
+                for row in rows
+            )
+
+
+def _export_row(row: Sequence) -> tuple[str, str, str, str]:
+    word_type, id_relevance, german, italian = row
+    return (word_type.name if word_type else "", id_relevance, german, italian)
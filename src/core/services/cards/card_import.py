@@ -0,0 +1,192 @@
+"""
+Use case: Import many cards at once from a CSV- or NDJSON-stream.
+
+The rows are processed in chunks, so neither the whole file nor all cards
+have to fit into memory. Per chunk, the relevance-levels are resolved with one
+query and the valid cards are inserted with one statement, which skips
+existing cards. Each chunk is committed on its own: a row with an error is
+reported with its line-number and doesn't stop the rest of the import.
+"""
+
+from collections.abc import AsyncIterable, AsyncIterator
+import csv
+from dataclasses import dataclass, field
+import json
+
+from core.domain.card_repository import card_count_cache
+from core.domain.word_type import WordType
+from core.services.unit_of_work import AbstractAsyncUnitOfWork
+from core.utils.logging_utils import log_method
+
+
+IMPORT_CHUNK_SIZE = 1_000
+IMPORT_FIELDS = ["word_type", "relevance_id", "german", "italian"]
+
+
+@dataclass
+class ImportRow:
+    line: int  # first line of the row in the imported file
+    record: dict
+    error: str | None = None
+
+
+@dataclass(frozen=True)
+class ImportRowError:
+    line: int
+    error: str
+
+
+@dataclass
+class ImportResult:
+    count_imported: int = 0
+    errors: list[ImportRowError] = field(default_factory=list)
+
+
+async def iter_csv_rows(lines: AsyncIterable[str]) -> AsyncIterator[ImportRow]:
+    """
+    Reads CSV with a header-line. A quoted value may contain line-breaks, so
+    lines are joined as long as a quote is still open.
+    """
+    fieldnames = None
+    record_lines: list[str] = []
+    line_number = first_line = 0
+    async for line in lines:
+        line_number += 1
+        if not record_lines:
+            first_line = line_number
+        record_lines.append(line)
+        text = "\n".join(record_lines)
+        if text.count('"') % 2:
+            continue
+        record_lines = []
+        if not text.strip():
+            continue
+
+        values = next(csv.reader([text]))
+        if fieldnames is None:
+            fieldnames = [name.strip() for name in values]
+        elif len(values) != len(fieldnames):
+            yield ImportRow(
+                line=first_line,
+                record={},
+                error=f"Expected {len(fieldnames)} values, got {len(values)}.",
+            )
+        else:
+            yield ImportRow(line=first_line, record=dict(zip(fieldnames, values)))
+    if record_lines:
+        yield ImportRow(line=first_line, record={}, error="Unclosed quote.")
+
+
+async def iter_ndjson_rows(lines: AsyncIterable[str]) -> AsyncIterator[ImportRow]:
+    """Reads one JSON-object per line."""
+    line_number = 0
+    async for line in lines:
+        line_number += 1
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            yield ImportRow(line=line_number, record={}, error="Invalid JSON.")
+            continue
+        if not isinstance(record, dict):
+            yield ImportRow(
+                line=line_number,
+                record={},
+                error="Expected a JSON-object.",
+            )
+            continue
+        yield ImportRow(line=line_number, record=record)
+
+
+@log_method
+async def import_cards_in_db(
+    rows: AsyncIterable[ImportRow],
+    uow: AbstractAsyncUnitOfWork,
+    chunk_size: int = IMPORT_CHUNK_SIZE,
+) -> ImportResult:
+    result = ImportResult()
+    try:
+        async with uow:
+            async for chunk in _chunks(rows, chunk_size):
+                await _import_chunk(chunk, uow, result)
+                await uow.commit()
+    finally:
+        # the cards are inserted without the ORM, so the count is unknown:
+        card_count_cache.invalidate()
+    return result
+
+
+async def _chunks(
+    rows: AsyncIterable[ImportRow],
+    chunk_size: int,
+) -> AsyncIterator[list[ImportRow]]:
+    chunk = []
+    async for row in rows:
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+async def _import_chunk(
+    chunk: list[ImportRow],
+    uow: AbstractAsyncUnitOfWork,
+    result: ImportResult,
+) -> None:
+    for row in chunk:
+        if row.error is None:
+            row.error = _validate(row.record)
+
+    relevance_ids = {
+        row.record["relevance_id"].strip() for row in chunk if row.error is None
+    }
+    known_relevance_ids = await uow.relevance_levels.get_existing_ids(relevance_ids)
+
+    rows_to_insert: dict[tuple[str, str], ImportRow] = {}
+    for row in chunk:
+        if row.error is not None:
+            continue
+        relevance_id = row.record["relevance_id"].strip()
+        key = (row.record["german"].strip(), row.record["italian"].strip())
+        if relevance_id not in known_relevance_ids:
+            row.error = f"Relevance with ID {relevance_id} not found."
+        elif key in rows_to_insert:
+            row.error = "Identical Card already exists."
+        else:
+            rows_to_insert[key] = row
+
+    inserted = await uow.cards.insert_many(
+        [
+            {
+                "word_type": WordType[row.record["word_type"].strip()],
+                "id_relevance": row.record["relevance_id"].strip(),
+                "german": german,
+                "italian": italian,
+            }
+            for (german, italian), row in rows_to_insert.items()
+        ]
+    )
+    for key, row in rows_to_insert.items():
+        if key not in inserted:
+            row.error = "Identical Card already exists."
+
+    result.count_imported += len(inserted)
+    result.errors.extend(
+        ImportRowError(line=row.line, error=row.error)
+        for row in chunk
+        if row.error is not None
+    )
+
+
+def _validate(record: dict) -> str | None:
+    for name in IMPORT_FIELDS:
+        value = record.get(name)
+        if not isinstance(value, str) or not value.strip():
+            return f"Missing value for '{name}'."
+    word_type = record["word_type"].strip()
+    if word_type not in WordType.all():
+        return f"Invalid word_type '{word_type}'."
+    return None
@@ -1,11 +1,12 @@
 from sqlalchemy.exc import IntegrityError
 
 from core.domain.card import Card
+from core.domain.card_repository import Version
 from core.domain.relevance import Relevance
 from core.domain.word_type import WordType
 from core.exceptions import DuplicateResourceError, ResourceNotFoundError
 from core.services.unit_of_work import AbstractUnitOfWork
-from core.utils.pagination import PaginationResult
+from core.utils.pagination import Cursor, CursorPaginationResult, PaginationResult
 from core.utils.logging_utils import log_method
 
 
@@ -53,16 +54,41 @@ def read_card_from_db(
     return card
 
 
+@log_method
+def read_card_version_from_db(
+    id_card: int,
+    uow: AbstractUnitOfWork,
+) -> Version | None:
+    """
+    Use case: Returns the version of the card (None if it doesn't exist), to
+    tell whether a client's copy is still current without loading the card.
+    """
+    with uow:
+        return uow.cards.get_version(id=id_card)
+
+
+@log_method
+def read_deck_version_from_db(uow: AbstractUnitOfWork) -> Version | None:
+    """Use case: Returns the version of the deck, changed by each card-write."""
+    with uow:
+        return uow.cards.get_deck_version()
+
+
 @log_method
 def read_cards_from_db(
     uow: AbstractUnitOfWork,
     page: int = 1,
     page_size: int = 100,
+    with_count: bool = True,
 ) -> PaginationResult:
     """
     Use case: Returns detached objects to use them for templates or as a JSON-
     response.
 
+    Callers that don't show the number of pages pass with_count=False, then
+    no cards are counted at all and has_next_page is known from fetching one
+    card more than the page-size.
+
     This means that we need to ensure that the ORM-objects don't have expired
     attributes because this would lead to a reload once those are accessed. Since
     attributes always get expired if the session is closed or a rollback takes
@@ -113,12 +139,12 @@ def read_cards_from_db(
       issue of expired attributes/instances and detached objects.
     - So what now, how can we solve that? We need to take care of both
       situations above, the expiring of the instance due to the mechanisms of
-      sqlalchemy and the lazy-loading. The latter is no problem: We can simply
-      define the mapping of relationships to handle the lazy-loading with the
-      'immediate'-mode, which basically means that there is no lazy-loading but
-      eager-loading: problem solved! All relationship-objects get loaded
-      directly with their main instance-object, no further database-queries
-      are required. Done.
+      sqlalchemy and the lazy-loading. The latter is no problem: The repository
+      loads the relationships the use case needs eagerly with the query itself
+      (e.g. joinedload for the relevance of a list-page), all others are
+      mapped with lazy="raise" and fail loudly instead of lazy-loading. (The
+      'immediate'-mode we used before loaded every relationship of every card
+      with a query of its own - one page of cards meant hundreds of queries.)
     - Still, even those will get expired once any of the mechanisms described
       above will happen (rollback, closing, commiting). By the way, commiting a
       sessino usually sets all attributes to be expired as well. But in this
@@ -144,6 +170,17 @@ def read_cards_from_db(
 
     """
     skip = (page - 1) * page_size
+    if not with_count:
+        with uow:
+            cards, has_next_page = uow.cards.get_slice(skip=skip, limit=page_size)
+            uow.expunge_all()  # needs to be called!
+        return PaginationResult.build_without_count(
+            records=cards,
+            page_size=page_size,
+            current_page=page,
+            has_next_page=has_next_page,
+        )
+
     with uow:
         count_cards, cards = uow.cards.get_list(skip=skip, limit=page_size)
         uow.expunge_all()  # needs to be called!
@@ -164,6 +201,103 @@ def read_cards_from_db(
     )
 
 
+@log_method
+def search_cards_in_db(
+    query: str,
+    uow: AbstractUnitOfWork,
+    page: int = 1,
+    page_size: int = 100,
+) -> PaginationResult:
+    """
+    Use case: Returns the cards matching the search-query, best matches first.
+    The matches are not counted (see read_cards_from_db).
+    """
+    skip = (page - 1) * page_size
+    with uow:
+        cards, has_next_page = uow.cards.search(
+            query=query,
+            skip=skip,
+            limit=page_size,
+        )
+        uow.expunge_all()  # needs to be called!
+    return PaginationResult.build_without_count(
+        records=cards,
+        page_size=page_size,
+        current_page=page,
+        has_next_page=has_next_page,
+    )
+
+
+@log_method
+def filter_cards_by_tags_in_db(
+    tags: list[str],
+    uow: AbstractUnitOfWork,
+    match_all: bool = True,
+    page: int = 1,
+    page_size: int = 100,
+) -> PaginationResult:
+    """
+    Use case: Returns the cards with all (match_all) or any of the given tags,
+    sorted like read_cards_from_db. The matches are not counted.
+    """
+    skip = (page - 1) * page_size
+    with uow:
+        cards, has_next_page = uow.cards.filter_by_tags(
+            tags=tags,
+            match_all=match_all,
+            skip=skip,
+            limit=page_size,
+        )
+        uow.expunge_all()  # needs to be called!
+    return PaginationResult.build_without_count(
+        records=cards,
+        page_size=page_size,
+        current_page=page,
+        has_next_page=has_next_page,
+    )
+
+
+@log_method
+def fuzzy_search_cards_in_db(
+    query: str,
+    uow: AbstractUnitOfWork,
+    limit: int = 10,
+) -> list[tuple[Card, float]]:
+    """
+    Use case: Returns the cards most similar to the (maybe misspelled) query,
+    each with its similarity, best first.
+    """
+    with uow:
+        matches = uow.cards.fuzzy_search(query=query, limit=limit)
+        uow.expunge_all()  # needs to be called!
+    return matches
+
+
+@log_method
+def read_cards_after_cursor_from_db(
+    uow: AbstractUnitOfWork,
+    cursor: Cursor | None = None,
+    page_size: int = 100,
+) -> CursorPaginationResult:
+    """
+    Use case: Like read_cards_from_db, but with keyset-pagination. The cost of
+    a page stays the same no matter how deep the client pages, and there is
+    no count of all cards. Without a cursor the first page is returned.
+    """
+    with uow:
+        cards, next_cursor = uow.cards.get_page_after(
+            cursor=cursor,
+            limit=page_size,
+        )
+        uow.expunge_all()  # needs to be called, see read_cards_from_db!
+
+    return CursorPaginationResult(
+        records=cards,
+        page_size=page_size,
+        next_cursor=next_cursor.encode() if next_cursor else None,
+    )
+
+
 @log_method
 def update_card_in_db(
     id_card: int,
@@ -0,0 +1,45 @@
+"""
+Use case: Study the cards that are due (spaced repetition).
+
+Each answer moves its card into another box of the Leitner-system and sets
+when the card is due again (see Card.reschedule; the answers are written
+behind by core.services.cards.card_answers). The next cards to study are the
+ones due the longest. They are read as a range of the index on (due_at, id)
+of the cards, so picking them neither scans nor sorts the deck and costs the
+same with 1k or 1M cards - and as they are only read, any number of learners
+can pick their cards concurrently.
+
+Answers that are not written yet are taken into account: their cards are not
+offered again until they are due according to these answers.
+"""
+
+import datetime
+
+from core.domain.card import Card
+from core.services.cards.card_answers import AnswerBuffer, answer_buffer
+from core.services.unit_of_work import AbstractAsyncUnitOfWork
+from core.utils.logging_utils import log_method
+
+MAX_NEXT_CARDS = 100
+
+
+@log_method
+async def read_next_cards_to_study(
+    n: int,
+    uow: AbstractAsyncUnitOfWork,
+    buffer: AnswerBuffer = answer_buffer,
+    now: datetime.datetime | None = None,
+) -> list[Card]:
+    """
+    Use case: Returns up to n cards (detached) that are due now, the ones due
+    the longest first.
+    """
+    now = now or datetime.datetime.now()
+    async with uow:
+        cards = await uow.cards.get_due(
+            now=now,
+            limit=min(n, MAX_NEXT_CARDS),
+            exclude_ids=buffer.ids_not_due(now),
+        )
+        uow.expunge_all()
+    return cards
@@ -2,28 +2,74 @@ from abc import ABC, abstractmethod
 import logging
 from typing import Self
 
+from sqlalchemy import event, inspect
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from sqlalchemy.orm import Session, sessionmaker
 
+import core.db.statement_stats as statement_stats
 from core.domain.card_repository import (
+    AbstractAsyncCardRepository,
     AbstractCardRepository,
+    AsyncDbCardRepository,
+    FakeAsyncCardRepository,
     FakeCardRepository,
     DbCardRepository,
+    apply_card_changes,
+    collect_card_changes,
+    pop_card_changes,
 )
 from core.domain.relevance_repository import (
+    AbstractAsyncRelevanceRepository,
     AbstractRelevanceRepository,
+    AsyncCachedRelevanceRepository,
+    AsyncDbRelevanceRepository,
+    CachedRelevanceRepository,
+    FakeAsyncRelevanceRepository,
     FakeRelevanceRepository,
     DbRelevanceRepository,
+    collect_relevance_changes,
 )
 from core.domain.tag_repository import (
+    AbstractAsyncTagRepository,
     AbstractTagRepository,
+    AsyncCachedTagRepository,
+    AsyncDbTagRepository,
+    CachedTagRepository,
+    FakeAsyncTagRepository,
     FakeTagRepository,
     DbTagRepository,
+    collect_tag_changes,
 )
+from core.utils.caching import apply_invalidations, pop_pending_invalidations
 
 
 logger = logging.getLogger(__name__)
 
 
+def _listen_to_changes(session: Session) -> None:
+    event.listen(session, "after_flush", collect_card_changes)
+    event.listen(session, "after_flush", collect_relevance_changes)
+    event.listen(session, "after_flush", collect_tag_changes)
+
+
+def _apply_changes(session: Session) -> None:
+    # write the changes through to the process-local caches (see
+    # core.domain.card_repository and core.utils.caching):
+    apply_card_changes(pop_card_changes(session))
+    apply_invalidations(pop_pending_invalidations(session))
+
+
+def _drop_changes(session: Session) -> None:
+    pop_card_changes(session)
+    pop_pending_invalidations(session)
+
+
+def _all_attribute_names(instance) -> list[str]:
+    # Relationships are mapped with lazy="raise", a refresh only loads them if
+    # they are named explicitly (with one query per relationship).
+    return list(inspect(instance).mapper.attrs.keys())
+
+
 class AbstractUnitOfWork(ABC):
     session: Session
     cards: AbstractCardRepository
@@ -85,39 +131,190 @@ class DbUnitOfWork(AbstractUnitOfWork):
         self,
         session_factory: sessionmaker,
         session_shall_expire_on_commit: bool = True,
+        read_only: bool = False,
     ):
-        """The session_factory decides which database to use."""
+        """
+        The session_factory decides which database to use. With read_only the
+        unit of work is meant for a read-session-factory (see
+        core.db.get_read_session_factory): there is nothing to roll back then
+        and committing is not allowed.
+        """
         self.session_factory = session_factory
         self.session_shall_expire_on_commit = session_shall_expire_on_commit
+        self.read_only = read_only
 
     def __enter__(self):
         logger.debug("DB UOW: Entered, start session.")
         self.session = self.session_factory()
         self.session.expire_on_commit = self.session_shall_expire_on_commit
+        _listen_to_changes(self.session)
 
         self.cards = DbCardRepository(self.session)
-        self.relevance_levels = DbRelevanceRepository(self.session)
-        self.tags = DbTagRepository(self.session)
+        # (reference-data, read through process-local caches)
+        self.relevance_levels = CachedRelevanceRepository(
+            DbRelevanceRepository(self.session)
+        )
+        self.tags = CachedTagRepository(DbTagRepository(self.session))
+
+        # the statements of this unit of work (see core.db.statement_stats):
+        self._statements_scope = statement_stats.track_statements()
+        self.statements = self._statements_scope.__enter__()
 
         return super().__enter__()
 
     def __exit__(self, *args) -> None:
-        super().__exit__(*args)
-        self.session.close()
-        logger.debug("DB UOW: Exited, session closed.")
-        engine = self.session.get_bind()
-        logger.debug(f"Status connection-pool: {engine.pool.status()}")
+        try:
+            if not self.read_only:
+                super().__exit__(*args)
+            self.session.close()
+        finally:
+            self._statements_scope.__exit__(None, None, None)
+        logger.debug("DB UOW: Exited, session closed (%s).", self.statements)
 
     def commit(self) -> None:
+        if self.read_only:
+            raise RuntimeError("A read-only unit of work can not commit.")
         self.session.commit()
+        _apply_changes(self.session)
         logger.debug("DB UOW: Session committed.")
 
     def rollback(self) -> None:
         self.session.rollback()
+        _drop_changes(self.session)
         logger.debug("DB UOW: Session rolled back.")
 
     def refresh(self, instance) -> None:
-        self.session.refresh(instance)
+        self.session.refresh(instance, attribute_names=_all_attribute_names(instance))
+
+    def expunge(self, instance) -> None:
+        self.session.expunge(instance)
+
+    def expunge_all(self) -> None:
+        self.session.expunge_all()
+
+
+class AbstractAsyncUnitOfWork(ABC):
+    """
+    Async counterpart of AbstractUnitOfWork, used with "async with". It offers
+    the same methods, but all methods that might talk to the database are
+    coroutines.
+    """
+
+    session: AsyncSession
+    cards: AbstractAsyncCardRepository
+    relevance_levels: AbstractAsyncRelevanceRepository
+    tags: AbstractAsyncTagRepository
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.rollback()
+
+    @abstractmethod
+    async def commit(self) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def rollback(self) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def refresh(self, instance) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def expunge(self, instance) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def expunge_all(self) -> None:
+        raise NotImplementedError
+
+
+class FakeAsyncUnitOfWork(AbstractAsyncUnitOfWork):
+    def __init__(self):
+        self.cards = FakeAsyncCardRepository(set())
+        self.relevance_levels = FakeAsyncRelevanceRepository(set())
+        self.tags = FakeAsyncTagRepository(set())
+        self.committed = False
+
+    async def commit(self) -> None:
+        self.committed = True
+
+    async def rollback(self) -> None:
+        pass
+
+    async def refresh(self, instance) -> None:
+        pass
+
+    def expunge(self, instance) -> None:
+        pass
+
+    def expunge_all(self) -> None:
+        pass
+
+
+class AsyncDbUnitOfWork(AbstractAsyncUnitOfWork):
+    def __init__(
+        self,
+        session_factory: async_sessionmaker,
+        session_shall_expire_on_commit: bool = True,
+        read_only: bool = False,
+    ):
+        """
+        The session_factory decides which database to use. See DbUnitOfWork
+        for the read_only-mode.
+        """
+        self.session_factory = session_factory
+        self.session_shall_expire_on_commit = session_shall_expire_on_commit
+        self.read_only = read_only
+
+    async def __aenter__(self):
+        logger.debug("Async DB UOW: Entered, start session.")
+        self.session = self.session_factory()
+        self.session.sync_session.expire_on_commit = (
+            self.session_shall_expire_on_commit
+        )
+        _listen_to_changes(self.session.sync_session)
+
+        self.cards = AsyncDbCardRepository(self.session)
+        self.relevance_levels = AsyncCachedRelevanceRepository(
+            AsyncDbRelevanceRepository(self.session)
+        )
+        self.tags = AsyncCachedTagRepository(AsyncDbTagRepository(self.session))
+
+        self._statements_scope = statement_stats.track_statements()
+        self.statements = self._statements_scope.__enter__()
+
+        return await super().__aenter__()
+
+    async def __aexit__(self, *args) -> None:
+        try:
+            if not self.read_only:
+                await super().__aexit__(*args)
+            await self.session.close()
+        finally:
+            self._statements_scope.__exit__(None, None, None)
+        logger.debug("Async DB UOW: Exited, session closed (%s).", self.statements)
+
+    async def commit(self) -> None:
+        if self.read_only:
+            raise RuntimeError("A read-only unit of work can not commit.")
+        await self.session.commit()
+        _apply_changes(self.session.sync_session)
+        logger.debug("Async DB UOW: Session committed.")
+
+    async def rollback(self) -> None:
+        await self.session.rollback()
+        _drop_changes(self.session.sync_session)
+        logger.debug("Async DB UOW: Session rolled back.")
+
+    async def refresh(self, instance) -> None:
+        await self.session.refresh(
+            instance,
+            attribute_names=_all_attribute_names(instance),
+        )
 
     def expunge(self, instance) -> None:
         self.session.expunge(instance)
@@ -0,0 +1,156 @@
+"""
+Process-local caches. Each worker-process of the web-app has its own, so
+everything cached here needs a time-to-live as an upper bound for how stale
+it can get through writes of other processes.
+"""
+
+from collections import OrderedDict
+from collections.abc import Hashable
+import threading
+import time
+from typing import Any
+
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+
+class CountCache:
+    """
+    Caches one count (e.g. the number of all cards), to be maintained by the
+    writers: adjust() it for inserts, invalidate() it if the change is not
+    known exactly (deletes, bulk-imports, ...).
+    """
+
+    def __init__(self, ttl: float) -> None:
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._count: int | None = None
+        self._expires_at = 0.0
+
+    def get(self) -> int | None:
+        with self._lock:
+            if self._count is None or time.monotonic() >= self._expires_at:
+                return None
+            return self._count
+
+    def set(self, count: int) -> None:
+        with self._lock:
+            self._count = count
+            self._expires_at = time.monotonic() + self.ttl
+
+    def adjust(self, delta: int) -> None:
+        """Only adjusts a cached count, an unknown count stays unknown."""
+        with self._lock:
+            if self._count is not None:
+                self._count += delta
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._count = None
+
+
+class LruCache:
+    """
+    Read-through cache for small reference-data (e.g. relevance-levels): the
+    caller looks up get() and on a miss reads the database and set()s the
+    result. Entries expire after the ttl, the least recently used ones are
+    evicted beyond maxsize. Writers invalidate() what they change.
+
+    The hits and misses of get() are counted to verify the cache actually
+    saves queries ("in" only tests for an entry and isn't counted).
+    """
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[Hashable, tuple[Any, float]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Any | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() >= entry[1]:
+                self._entries.pop(key, None)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and time.monotonic() < entry[1]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key: Hashable | None = None) -> None:
+        """Removes the entry of the key, or all entries without a key."""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._entries),
+            }
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+
+# Writes invalidate the entries they change only after the commit: before, a
+# concurrent reader would put the old row right back into the cache (for the
+# whole ttl), and a rolled back write would drop a valid entry. Until then the
+# session itself bypasses the cache for these keys. Like the changes of cards
+# (see core.domain.card_repository) they are collected in the info of the
+# session and applied or dropped by the units of work.
+_PENDING_INVALIDATIONS = "pending_invalidations"
+
+
+def invalidate_after_commit(session: Session, cache: LruCache, key: Hashable) -> None:
+    session.info.setdefault(_PENDING_INVALIDATIONS, set()).add((cache, key))
+
+
+def is_invalidation_pending(session: Session, cache: LruCache, key: Hashable) -> bool:
+    return (cache, key) in session.info.get(_PENDING_INVALIDATIONS, ())
+
+
+def pop_pending_invalidations(session: Session) -> set[tuple[LruCache, Hashable]]:
+    return session.info.pop(_PENDING_INVALIDATIONS, None) or set()
+
+
+def apply_invalidations(invalidations: set[tuple[LruCache, Hashable]]) -> None:
+    """Called after a commit."""
+    for cache, key in invalidations:
+        cache.invalidate(key)
+
+
+def detached_copy(instance):
+    """
+    Returns a copy of the column-attributes of a mapped instance, detached and
+    without history. Such a copy can be cached and handed to session.merge(
+    copy, load=False) of any session, which returns an instance of that session
+    without a query - the cached copy itself never becomes part of a session,
+    so it can be shared between threads.
+    """
+    mapper = inspect(instance).mapper
+    copy = mapper.class_manager.new_instance()
+    for attribute in mapper.column_attrs:
+        setattr(copy, attribute.key, getattr(instance, attribute.key))
+    make_transient_to_detached(copy)
+    return copy
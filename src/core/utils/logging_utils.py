@@ -1,8 +1,14 @@
+import atexit
+import dataclasses
 from functools import wraps
+import inspect
 import json
 import logging
 import logging.config
+from logging.handlers import QueueHandler, QueueListener
 import os
+import queue
+import reprlib
 import sys
 import traceback
 
@@ -28,6 +34,26 @@ def setup_logging(
             logging.config.dictConfig(config)
     else:
         logging.basicConfig(level=default_level)
+    log_in_background(logging.getLogger())
+
+
+def log_in_background(logger: logging.Logger) -> QueueListener:
+    """
+    Moves the handlers of the logger behind a queue: logging only puts the
+    records into the queue, a QueueListener passes them on to the handlers
+    (writing to files or the console) in its own thread, so requests don't
+    wait for the I/O. The listener is stopped - after handling all records
+    left in the queue - when the process exits.
+    """
+    handlers = list(logger.handlers)
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    for handler in handlers:
+        logger.removeHandler(handler)
+    logger.addHandler(QueueHandler(log_queue))
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
 
 
 def global_exception_hook(type, value, traceback_obj):
@@ -40,23 +66,72 @@ def global_exception_hook(type, value, traceback_obj):
     sys.exit(1)
 
 
+class _ShortRepr(reprlib.Repr):
+    """
+    Like repr(), but long strings and collections are abbreviated ("...") and
+    dataclasses (e.g. a PaginationResult holding a page of cards) are shown
+    field by field with the same limits, instead of their full repr.
+    """
+
+    def repr_instance(self, obj, level: int) -> str:
+        if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+            if level <= 0:
+                return f"{type(obj).__name__}(...)"
+            fields = ", ".join(
+                f"{field.name}={self.repr1(getattr(obj, field.name), level - 1)}"
+                for field in dataclasses.fields(obj)
+                if field.repr
+            )
+            return f"{type(obj).__name__}({fields})"
+        return super().repr_instance(obj, level)
+
+
+short_repr = _ShortRepr(maxlevel=3, maxlist=3, maxdict=5, maxstring=80, maxother=200)
+
+
+def _log_call(func, args, kwargs) -> None:
+    logger.info(
+        "Calling method: %s, arguments: %s, keyword arguments: %s",
+        func.__name__,
+        short_repr.repr(args) if args else "None",
+        short_repr.repr(kwargs) if kwargs else "None",
+    )
+
+
+def _log_result(func, result) -> None:
+    logger.info("Return value of %s: %s", func.__name__, short_repr.repr(result))
+
+
 def log_method(func):
-    """Decorator to log method-calls and return-values."""
+    """
+    Decorator to log method-calls and return-values. Works for plain functions
+    and for coroutine-functions (the awaited result is logged then).
 
-    @wraps(func)
-    def wrapper(*args, **kwargs):
-        # Log the method name
-        logger.info(f"Calling method: {func.__name__}")
+    Nothing is formatted if the logger doesn't log INFO, and arguments and
+    return-values are abbreviated (see short_repr), so logging a large result
+    stays cheap.
+    """
 
-        # Log the positional and keyword arguments
-        logger.info(f"Arguments: {args if args else 'None'}")
-        logger.info(f"Keyword arguments: {kwargs if kwargs else 'None'}")
+    if inspect.iscoroutinefunction(func):
 
-        # Call the original function
-        result = func(*args, **kwargs)
+        @wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            if not logger.isEnabledFor(logging.INFO):
+                return await func(*args, **kwargs)
+            _log_call(func, args, kwargs)
+            result = await func(*args, **kwargs)
+            _log_result(func, result)
+            return result
 
-        # Log the return value
-        logger.info(f"Return value: {result}")
+        return async_wrapper
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        if not logger.isEnabledFor(logging.INFO):
+            return func(*args, **kwargs)
+        _log_call(func, args, kwargs)
+        result = func(*args, **kwargs)
+        _log_result(func, result)
         return result
 
     return wrapper
@@ -1,4 +1,7 @@
+import base64
+import binascii
 from dataclasses import dataclass
+import json
 import math
 from typing import Self
 
@@ -10,9 +13,9 @@ class PaginationResult:
     """
 
     records: list
-    count_records: int
+    count_records: int | None  # None if the query skipped counting
     page_size: int
-    count_pages: int
+    count_pages: int | None
     current_page: int
     has_next_page: bool
     has_previous_page: bool
@@ -39,5 +42,73 @@ class PaginationResult:
             has_previous_page=has_previous_page,
         )
 
+    @classmethod
+    def build_without_count(
+        cls,
+        records: list,
+        page_size: int,
+        current_page: int,
+        has_next_page: bool,
+    ) -> Self:
+        """
+        For queries that don't count all records: they know if there is a next
+        page by fetching one record more than the page-size.
+        """
+        return cls(
+            records=records,
+            count_records=None,
+            page_size=page_size,
+            count_pages=None,
+            current_page=current_page,
+            has_next_page=has_next_page,
+            has_previous_page=current_page > 1,
+        )
+
+    def serialize_records(self, converter_func) -> None:
+        self.records = list(map(converter_func, self.records))
+
+
+@dataclass(frozen=True)
+class Cursor:
+    """
+    Position of the last record of a page for keyset-pagination: the sort-key
+    of that record and its id (as a tie-breaker for equal sort-keys).
+    """
+
+    sort_key: str
+    id: int
+
+    def encode(self) -> str:
+        raw = json.dumps([self.sort_key, self.id]).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    @classmethod
+    def decode(cls, value: str) -> Self:
+        """Raises a ValueError if the value is no valid cursor."""
+        try:
+            raw = base64.urlsafe_b64decode(value + "=" * (-len(value) % 4))
+            sort_key, id = json.loads(raw)
+        except (binascii.Error, TypeError, UnicodeDecodeError) as e:
+            raise ValueError(f"Invalid cursor: {value}") from e
+        if not isinstance(sort_key, str) or not isinstance(id, int):
+            raise ValueError(f"Invalid cursor: {value}")
+        return cls(sort_key=sort_key, id=id)
+
+
+@dataclass
+class CursorPaginationResult:
+    """
+    This class is used to store the result of a keyset-paginated query. There
+    is no count of records or pages, only a cursor to the next page.
+    """
+
+    records: list
+    page_size: int
+    next_cursor: str | None
+
+    @property
+    def has_next_page(self) -> bool:
+        return self.next_cursor is not None
+
     def serialize_records(self, converter_func) -> None:
         self.records = list(map(converter_func, self.records))
@@ -0,0 +1,26 @@
+"""
+Helpers to process request- or file-bodies as a stream of chunks instead of
+loading them into memory completely.
+"""
+
+from collections.abc import AsyncIterable, AsyncIterator
+import codecs
+
+
+async def iter_lines(
+    chunks: AsyncIterable[bytes],
+    encoding: str = "utf-8-sig",  # also strips the BOM of Excel-files
+) -> AsyncIterator[str]:
+    """
+    Splits a stream of byte-chunks into lines (without line-endings). A chunk
+    may end anywhere, even in the middle of a multi-byte character.
+    """
+    decoder = codecs.getincrementaldecoder(encoding)()
+    rest = ""
+    async for chunk in chunks:
+        *lines, rest = (rest + decoder.decode(chunk)).split("\n")
+        for line in lines:
+            yield line.removesuffix("\r")
+    rest += decoder.decode(b"", final=True)
+    if rest:
+        yield rest.removesuffix("\r")
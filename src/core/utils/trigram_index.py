@@ -0,0 +1,139 @@
+"""
+In-process trigram-index for fuzzy lookups, similar to pg_trgm of Postgres.
+
+A text is split into words and each word - lowercased and padded with two
+spaces before and one after it - into its trigrams. The similarity of two
+texts is the number of shared trigrams divided by the number of trigrams in
+either of them (1.0 for identical texts). The index maps each trigram to the
+keys of the texts that contain it, so a lookup only looks at texts sharing
+trigrams with the query.
+"""
+
+from collections.abc import Iterable
+import heapq
+import math
+import re
+import threading
+
+
+def similarity(text: str, other: str) -> float:
+    text_trigrams, other_trigrams = trigrams(text), trigrams(other)
+    if not text_trigrams or not other_trigrams:
+        return 0.0
+    shared = len(text_trigrams & other_trigrams)
+    return shared / (len(text_trigrams) + len(other_trigrams) - shared)
+
+
+def trigrams(text: str) -> set[str]:
+    result = set()
+    for word in re.findall(r"\w+", text.lower()):
+        padded = f"  {word} "
+        result.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return result
+
+
+class TrigramIndex:
+    """
+    Thread-safe index of texts by integer-keys. It is built once from all
+    texts and then maintained with apply(). Changes applied while a build is
+    running are replayed on the built index, so none of them gets lost.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._postings: dict[str, set[int]] = {}
+        self._texts: dict[int, str] = {}
+        self._sizes: dict[int, int] = {}  # number of trigrams per key
+        self._builds_running = 0
+        self._pending: list[dict[int, str | None]] | None = None
+        self.is_built = False
+
+    def begin_build(self) -> None:
+        with self._lock:
+            self._builds_running += 1
+            if self._pending is None:
+                self._pending = []
+
+    def finish_build(self, items: Iterable[tuple[int, str]]) -> None:
+        postings: dict[str, set[int]] = {}
+        texts: dict[int, str] = {}
+        sizes: dict[int, int] = {}
+        for key, text in items:
+            texts[key] = text
+            text_trigrams = trigrams(text)
+            sizes[key] = len(text_trigrams)
+            for trigram in text_trigrams:
+                postings.setdefault(trigram, set()).add(key)
+        with self._lock:
+            self._postings = postings
+            self._texts = texts
+            self._sizes = sizes
+            for changes in self._pending or []:
+                self._apply(changes)
+            self._builds_running -= 1
+            if not self._builds_running:
+                self._pending = None
+            self.is_built = True
+
+    def abort_build(self) -> None:
+        with self._lock:
+            self._builds_running -= 1
+            if not self._builds_running:
+                self._pending = None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._postings = {}
+            self._texts = {}
+            self._sizes = {}
+            self.is_built = False
+
+    def apply(self, changes: dict[int, str | None]) -> None:
+        """Sets the text of each key, or removes the key if its text is None."""
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append(changes)
+            if self.is_built:
+                self._apply(changes)
+
+    def _apply(self, changes: dict[int, str | None]) -> None:
+        for key, text in changes.items():
+            old_text = self._texts.pop(key, None)
+            if old_text is not None:
+                for trigram in trigrams(old_text):
+                    self._postings[trigram].discard(key)
+                del self._sizes[key]
+            if text is not None:
+                text_trigrams = trigrams(text)
+                self._texts[key] = text
+                self._sizes[key] = len(text_trigrams)
+                for trigram in text_trigrams:
+                    self._postings.setdefault(trigram, set()).add(key)
+
+    def search(
+        self,
+        text: str,
+        limit: int,
+        threshold: float,
+    ) -> list[tuple[int, float]]:
+        """Returns (key, similarity) of the most similar texts, best first."""
+        query = trigrams(text)
+        if not query:
+            return []
+        # A text needs at least this many shared trigrams to reach the
+        # threshold. So it must be in one of the (len(query) - min_shared + 1)
+        # shortest posting-lists, only these are scanned for candidates.
+        min_shared = max(1, math.ceil(threshold * len(query)))
+        with self._lock:
+            postings = sorted(
+                (self._postings.get(trigram, set()) for trigram in query),
+                key=len,
+            )
+            candidates = set().union(*postings[: len(query) - min_shared + 1])
+            matches = []
+            for key in candidates:
+                shared = sum(key in keys for keys in postings)
+                similarity = shared / (len(query) + self._sizes[key] - shared)
+                if similarity >= threshold:
+                    matches.append((similarity, key))
+        return [(key, similarity) for similarity, key in heapq.nlargest(limit, matches)]
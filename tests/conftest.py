@@ -1,16 +1,28 @@
 from fastapi.testclient import TestClient
 import pytest
-from sqlalchemy import Engine
+from sqlalchemy import Engine, NullPool
+from sqlalchemy.ext.asyncio import async_sessionmaker
 from sqlalchemy.orm import sessionmaker, clear_mappers
 
 from app.main import app
-from app.dependencies import get_session_factory
+from app.dependencies import (
+    get_async_read_session_factory,
+    get_async_session_factory,
+    get_read_session_factory,
+    get_session_factory,
+)
 import core.db as db
 import core.db.orm as orm
+from core.domain.card_repository import card_count_cache, card_trigram_index
+from core.domain.relevance_repository import relevance_cache
+from core.domain.tag_repository import tag_cache
 
 
 @pytest.fixture(name="client")
-def client_fixture(session_factory: sessionmaker):
+def client_fixture(
+    session_factory: sessionmaker,
+    async_session_factory: async_sessionmaker,
+):
     # Overwrite the get_session_factory-dependency from our FastAPI-app
     # to ensure we alway use our unit_test_db with this Testclient. Thus,
     # since dependencies must be callables, create a local function that
@@ -19,7 +31,18 @@ def client_fixture(session_factory: sessionmaker):
     def get_session_factory_override():
         return session_factory
 
+    def get_async_session_factory_override():
+        return async_session_factory
+
     app.dependency_overrides[get_session_factory] = get_session_factory_override
+    app.dependency_overrides[get_async_session_factory] = (
+        get_async_session_factory_override
+    )
+    # the unit-test-database has no separate read-database:
+    app.dependency_overrides[get_read_session_factory] = get_session_factory_override
+    app.dependency_overrides[get_async_read_session_factory] = (
+        get_async_session_factory_override
+    )
     # by that we ensured that we can use the normal app-code for testing
     # but for sure always use the session_factory from our test-suite (which
     # points to a testing database).
@@ -39,9 +62,14 @@ def unit_test_engine() -> Engine:
     # in_memory_db doesn't work with e2e-tests (FastAPI create multiple threads,
     # this seems to be part of the problem)
 
-    engine = db._get_engine(url_key=url_key, echo=True)
+    engine = db._get_engine(url_key=url_key)
     db.metadata.drop_all(bind=engine)
     db.metadata.create_all(bind=engine)
+    # what is cached for the previous test's database is wrong now:
+    card_count_cache.invalidate()
+    card_trigram_index.clear()
+    relevance_cache.invalidate()
+    tag_cache.invalidate()
 
     # the approach of using a fresh sqlite database (so with drop all and create
     # all) makes as well sense in terms of database-migrations with alembic:
@@ -65,3 +93,23 @@ def session(unit_test_engine):
     with sessionmaker(bind=unit_test_engine)() as session:
         yield session
     clear_mappers()
+
+
+@pytest.fixture
+def anyio_backend():
+    # async tests run with the anyio-plugin (shipped with FastAPI) on asyncio:
+    return "asyncio"
+
+
+@pytest.fixture
+def async_session_factory(unit_test_engine):
+    # Points to the same database-file as unit_test_engine. No pooling, since
+    # the TestClient may run each request in another event-loop and pooled
+    # async connections are bound to the loop they were created in.
+    async_engine = db._get_async_engine(
+        url_key="local_db_unit_tests",
+        poolclass=NullPool,
+    )
+    orm.start_mappers()
+    yield async_sessionmaker(bind=async_engine)
+    clear_mappers()
@@ -1,9 +1,17 @@
+import json
+
 from fastapi.testclient import TestClient
+from sqlalchemy import delete, insert, select
 
+from app.dependencies import get_answer_buffer
+from app.main import app
+from core.db.tables.card_has_tag_table import card_has_tag_table
+from core.services.cards.card_answers import AnswerBuffer
 from core.services.unit_of_work import DbUnitOfWork
 from core.domain.word_type import WordType
 from core.domain.card import Card
 from core.domain.relevance import Relevance
+from core.domain.tag import Tag
 
 
 def test_create_card_happy_path(client: TestClient, session_factory):
@@ -103,6 +111,144 @@ def test_read_card_happy_path(client: TestClient, session_factory):
     assert data["italian"] == "vecchio"
 
 
+def test_read_cards_answers_304_until_a_card_changes(
+    client: TestClient, session_factory
+):
+    # arrange:
+    with session_factory() as session:
+        relevance = Relevance(id="A", description="Beginner")
+        session.add(
+            Card(
+                word_type=WordType.VERB,
+                relevance=relevance,
+                german="haben",
+                italian="avere",
+            )
+        )
+        session.commit()
+    first_response = client.get("/cards")
+    etag = first_response.headers["etag"]
+    html_etag = client.get("/cards", headers={"accept": "text/html"}).headers["etag"]
+
+    # act:
+    unchanged_response = client.get("/cards", headers={"if-none-match": etag})
+    since_response = client.get(
+        "/cards",
+        headers={"if-modified-since": first_response.headers["last-modified"]},
+    )
+    client.post(
+        "/cards",
+        json={
+            "word_type": "ADJECTIVE",
+            "relevance_id": "A",
+            "german": "alt",
+            "italian": "vecchio",
+        },
+    )
+    changed_response = client.get("/cards", headers={"if-none-match": etag})
+
+    # assert:
+    assert html_etag != etag
+    assert unchanged_response.status_code == 304
+    assert unchanged_response.content == b""
+    assert unchanged_response.headers["etag"] == etag
+    assert since_response.status_code == 304
+    assert changed_response.status_code == 200
+    assert changed_response.headers["etag"] != etag
+    assert len(changed_response.json()) == 2
+
+
+def test_read_card_etag_follows_changes_of_the_card(
+    client: TestClient, session_factory
+):
+    # arrange:
+    with session_factory() as session:
+        relevance = Relevance(id="A", description="Beginner")
+        for german, italian in [("haben", "avere"), ("alt", "vecchio")]:
+            session.add(
+                Card(
+                    word_type=WordType.VERB,
+                    relevance=relevance,
+                    german=german,
+                    italian=italian,
+                )
+            )
+        session.commit()
+    etags = {id: client.get(f"/cards/{id}").headers["etag"] for id in (1, 2)}
+
+    # act & assert: only the changed card gets a new version
+    client.put(
+        "/cards/1",
+        json={
+            "word_type": "NOUN",
+            "relevance_id": "A",
+            "german": "haben",
+            "italian": "avere",
+        },
+    )
+    response_1 = client.get("/cards/1", headers={"if-none-match": etags[1]})
+    response_2 = client.get("/cards/2", headers={"if-none-match": etags[2]})
+    assert response_1.status_code == 200
+    assert response_1.json()["word_type"] == "NOUN"
+    assert response_2.status_code == 304
+
+    # ... and a card shows the description of its relevance:
+    with session_factory() as session:
+        session.get(Relevance, "A").description = "Anfänger"
+        session.commit()
+    response_2 = client.get("/cards/2", headers={"if-none-match": etags[2]})
+    assert response_2.status_code == 200
+    assert response_2.json()["relevance"]["description"] == "Anfänger"
+
+
+def test_tagging_a_card_changes_the_etags(client: TestClient, session_factory):
+    # arrange:
+    with session_factory() as session:
+        relevance = Relevance(id="A", description="Beginner")
+        session.add(
+            Card(
+                word_type=WordType.NOUN,
+                relevance=relevance,
+                german="der Koffer",
+                italian="la valigia",
+            )
+        )
+        session.add(Tag(value="Reise"))
+        session.commit()
+    list_etag = client.get("/cards?tag=Reise").headers["etag"]
+    card_etag = client.get("/cards/1").headers["etag"]
+    unchanged_response = client.get(
+        "/cards?tag=Reise", headers={"if-none-match": list_etag}
+    )
+    assert unchanged_response.status_code == 304
+
+    # act & assert: tagging (e.g. by a script) ...
+    with session_factory() as session:
+        session.execute(insert(card_has_tag_table).values(id_card=1, id_tag=1))
+        session.commit()
+    tagged_response = client.get(
+        "/cards?tag=Reise", headers={"if-none-match": list_etag}
+    )
+    assert tagged_response.status_code == 200
+    assert [card["german"] for card in tagged_response.json()] == ["der Koffer"]
+    card_response = client.get("/cards/1", headers={"if-none-match": card_etag})
+    assert card_response.status_code == 200
+
+    # ... and untagging change the versions:
+    list_etag = tagged_response.headers["etag"]
+    card_etag = client.get("/cards/1").headers["etag"]
+    with session_factory() as session:
+        session.execute(delete(card_has_tag_table))
+        session.commit()
+    untagged_response = client.get(
+        "/cards?tag=Reise", headers={"if-none-match": list_etag}
+    )
+    assert untagged_response.status_code == 200
+    assert untagged_response.json() == []
+    card_response = client.get("/cards/1", headers={"if-none-match": card_etag})
+    assert card_response.status_code == 200
+
+
 def test_read_card_unhappy_path_throws_404(client: TestClient, session_factory):
     # arrange:
     with session_factory() as session:
@@ -372,3 +518,452 @@ def test_delete_card_unhappy_path_returns_404_when_card_not_found(
     with uow:
         all_cards = uow.cards.all()
         assert all_cards
+
+
+def test_read_cards_with_cursor(client: TestClient, session_factory):
+    # arrange:
+    with session_factory() as session:
+        relevance = Relevance(id="A", description="Beginner")
+        for german, italian in [
+            ("haben", "avere"),
+            ("alt", "vecchio"),
+            ("das Haus", "la casa"),
+        ]:
+            session.add(
+                Card(
+                    word_type=WordType.NOUN,
+                    relevance=relevance,
+                    german=german,
+                    italian=italian,
+                )
+            )
+        session.commit()
+
+    # act:
+    first_response = client.get("/cards?cursor=&page_size=2")
+    next_cursor = first_response.headers["X-Next-Cursor"]
+    second_response = client.get(f"/cards?cursor={next_cursor}&page_size=2")
+
+    # assert:
+    assert first_response.status_code == 200
+    assert [card["german"] for card in first_response.json()] == [
+        "das Haus",
+        "alt",
+    ]
+    assert second_response.status_code == 200
+    assert [card["german"] for card in second_response.json()] == ["haben"]
+    assert "X-Next-Cursor" not in second_response.headers
+
+
+def test_read_cards_with_invalid_cursor_returns_400(client: TestClient):
+    response = client.get("/cards?cursor=not-a-cursor")
+    assert response.status_code == 400
+
+
+def test_import_cards_from_csv_reports_erroneous_rows(
+    client: TestClient, session_factory
+):
+    # arrange:
+    with session_factory() as session:
+        relevance = Relevance(id="A", description="Beginner")
+        session.add(
+            Card(
+                word_type=WordType.VERB,
+                relevance=relevance,
+                german="haben",
+                italian="avere",
+            )
+        )
+        session.commit()
+
+    body = (
+        "word_type,relevance_id,german,italian\n"
+        "NOUN,A,das Haus,la casa\n"
+        "VERB,A,haben,avere\n"  # already exists
+        "NOUN,A,das Haus,la casa\n"  # duplicate within the import
+        'ADJECTIVE,A,alt,"vecchio,\nanziano"\n'  # quoted line-break
+        "NOUN,X,der Baum,l'albero\n"  # unknown relevance
+        "THING,A,das Boot,la barca\n"  # invalid word_type
+        "NOUN,A,die Antwort\n"  # value missing
+    )
+
+    # act:
+    response = client.post(
+        "/cards/import",
+        content=body.encode(),
+        headers={"content-type": "text/csv"},
+    )
+
+    # assert:
+    assert response.status_code == 200
+    result = response.json()
+    assert result["count_imported"] == 2
+    assert [row_error["line"] for row_error in result["errors"]] == [3, 4, 7, 8, 9]
+
+    uow = DbUnitOfWork(session_factory=session_factory)
+    with uow:
+        germans = sorted(card.german for card in uow.cards.all())
+    assert germans == ["alt", "das Haus", "haben"]
+
+
+def test_import_cards_from_ndjson_in_chunks(client: TestClient, session_factory):
+    # arrange:
+    with session_factory() as session:
+        session.add(Relevance(id="A", description="Beginner"))
+        session.commit()
+
+    lines = [
+        f'{{"word_type": "NOUN", "relevance_id": "A", "german": "Wort {i}",'
+        f' "italian": "parola {i}"}}'
+        for i in range(2_500)  # more than one chunk
+    ]
+    lines.insert(10, "not json")
+
+    # act:
+    response = client.post(
+        "/cards/import",
+        content="\n".join(lines).encode(),
+        headers={"content-type": "application/x-ndjson"},
+    )
+
+    # assert:
+    assert response.status_code == 200
+    assert response.json() == {
+        "count_imported": 2_500,
+        "errors": [{"line": 11, "error": "Invalid JSON."}],
+    }
+    with session_factory() as session:
+        assert len(session.scalars(select(Card.id)).all()) == 2_500
+
+
+def test_import_cards_with_unknown_content_type_returns_415(client: TestClient):
+    response = client.post(
+        "/cards/import",
+        content=b"{}",
+        headers={"content-type": "application/json"},
+    )
+    assert response.status_code == 415
+
+
+def test_export_cards_as_csv_can_be_imported_again(
+    client: TestClient, session_factory
+):
+    # arrange:
+    with session_factory() as session:
+        relevance = Relevance(id="A", description="Beginner")
+        for word_type, german, italian in [
+            (WordType.VERB, "haben", "avere"),
+            (WordType.ADJECTIVE, "schön", 'bello, "bella"'),
+            (WordType.NOUN, "das Haus", "la casa"),
+        ]:
+            session.add(
+                Card(
+                    word_type=word_type,
+                    relevance=relevance,
+                    german=german,
+                    italian=italian,
+                )
+            )
+        session.commit()
+
+    # act:
+    response = client.get("/cards/export?format=csv")
+
+    # assert:
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert response.text == (
+        "word_type,relevance_id,german,italian\n"
+        "NOUN,A,das Haus,la casa\n"
+        "VERB,A,haben,avere\n"
+        'ADJECTIVE,A,schön,"bello, ""bella"""\n'
+    )
+
+    with session_factory() as session:
+        session.execute(delete(Card))
+        session.commit()
+    import_response = client.post(
+        "/cards/import",
+        content=response.content,
+        headers={"content-type": "text/csv"},
+    )
+    assert import_response.json() == {"count_imported": 3, "errors": []}
+
+
+def test_export_cards_without_word_type(client: TestClient, session_factory):
+    # arrange:
+    with session_factory() as session:
+        relevance = Relevance(id="A", description="Beginner")
+        for word_type, german, italian in [
+            (None, "das Haus", "la casa"),
+            (WordType.VERB, "haben", "avere"),
+        ]:
+            session.add(
+                Card(
+                    word_type=word_type,
+                    relevance=relevance,
+                    german=german,
+                    italian=italian,
+                )
+            )
+        session.commit()
+
+    # act:
+    csv_response = client.get("/cards/export?format=csv")
+    ndjson_response = client.get("/cards/export")
+
+    # assert: the whole deck is exported, the word type is empty
+    assert csv_response.status_code == 200
+    assert csv_response.text == (
+        "word_type,relevance_id,german,italian\n"
+        ",A,das Haus,la casa\n"
+        "VERB,A,haben,avere\n"
+    )
+    assert [
+        json.loads(line)["word_type"] for line in ndjson_response.text.splitlines()
+    ] == ["", "VERB"]
+
+    # ... and the import reports that card instead of failing:
+    with session_factory() as session:
+        session.execute(delete(Card))
+        session.commit()
+    import_response = client.post(
+        "/cards/import",
+        content=csv_response.content,
+        headers={"content-type": "text/csv"},
+    )
+    assert import_response.json() == {
+        "count_imported": 1,
+        "errors": [{"line": 2, "error": "Missing value for 'word_type'."}],
+    }
+
+
+def test_export_cards_as_ndjson(client: TestClient, session_factory):
+    # arrange:
+    with session_factory() as session:
+        session.add(
+            Card(
+                word_type=WordType.VERB,
+                relevance=Relevance(id="A", description="Beginner"),
+                german="haben",
+                italian="avere",
+            )
+        )
+        session.commit()
+
+    # act:
+    response = client.get("/cards/export")
+
+    # assert:
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert [json.loads(line) for line in response.text.splitlines()] == [
+        {
+            "word_type": "VERB",
+            "relevance_id": "A",
+            "german": "haben",
+            "italian": "avere",
+        }
+    ]
+
+
+def test_read_cards_with_search(client: TestClient, session_factory):
+    # arrange:
+    with session_factory() as session:
+        relevance = Relevance(id="A", description="Beginner")
+        for german, italian in [
+            ("das Haus", "la casa"),
+            ("der Baum", "l'albero"),
+            ("die Haustür", "la porta di casa"),
+        ]:
+            session.add(
+                Card(
+                    word_type=WordType.NOUN,
+                    relevance=relevance,
+                    german=german,
+                    italian=italian,
+                )
+            )
+        session.commit()
+
+    # act:
+    response = client.get("/cards?search=casa")
+    html_response = client.get(
+        "/cards?search=baum",
+        headers={"accept": "text/html"},
+    )
+
+    # assert:
+    assert response.status_code == 200
+    assert [card["german"] for card in response.json()] == ["das Haus", "die Haustür"]
+    assert html_response.status_code == 200
+    assert "der Baum" in html_response.text
+    assert "das Haus" not in html_response.text
+
+
+def test_read_cards_filtered_by_tags(client: TestClient, session_factory):
+    # arrange:
+    with session_factory() as session:
+        relevance = Relevance(id="A", description="Beginner")
+        travel, home = Tag(value="Reise"), Tag(value="Zuhause")
+        for german, italian, tags in [
+            ("das Haus", "la casa", {home}),
+            ("der Koffer", "la valigia", {travel}),
+            ("der Schlüssel", "la chiave", {home, travel}),
+            ("der Baum", "l'albero", set()),
+        ]:
+            card = Card(
+                word_type=WordType.NOUN,
+                relevance=relevance,
+                german=german,
+                italian=italian,
+            )
+            card.tags = tags
+            session.add(card)
+        session.commit()
+
+    # act:
+    all_tags_response = client.get("/cards?tag=Reise&tag=Zuhause")
+    any_tag_response = client.get("/cards?tag=Reise&tag=Zuhause&tag_mode=any")
+    html_response = client.get(
+        "/cards?tag=Reise&page_size=1",
+        headers={"accept": "text/html"},
+    )
+
+    # assert:
+    assert [card["german"] for card in all_tags_response.json()] == [
+        "der Schlüssel"
+    ]
+    assert [card["german"] for card in any_tag_response.json()] == [
+        "das Haus",
+        "der Koffer",
+        "der Schlüssel",
+    ]
+    assert html_response.status_code == 200
+    assert "der Koffer" in html_response.text
+    # (the next page keeps the filter, "&amp;" is the escaped "&")
+    assert "page=2&page_size=1&amp;tag=Reise" in html_response.text
+
+
+def test_fuzzy_search_finds_imported_cards(client: TestClient, session_factory):
+    # arrange:
+    with session_factory() as session:
+        session.add(Relevance(id="A", description="Beginner"))
+        session.commit()
+    client.get("/cards/fuzzy?query=Haus")  # builds the (still empty) index
+    client.post(
+        "/cards/import",
+        content=(
+            "word_type,relevance_id,german,italian\n"
+            "NOUN,A,das Haus,la casa\n"
+            "NOUN,A,der Hausschlüssel,la chiave di casa\n"
+            "NOUN,A,der Baum,l'albero\n"
+        ).encode(),
+        headers={"content-type": "text/csv"},
+    )
+
+    # act:
+    response = client.get("/cards/fuzzy?query=Hauss&limit=1")
+    response_italian = client.get("/cards/fuzzy?query=alberro")
+
+    # assert:
+    assert response.status_code == 200
+    matches = response.json()
+    assert [match["card"]["german"] for match in matches] == ["das Haus"]
+    assert 0 < matches[0]["similarity"] < 1
+    assert [match["card"]["german"] for match in response_italian.json()] == [
+        "der Baum"
+    ]
+
+
+def test_read_cards_streams_html_page(client: TestClient, session_factory):
+    # arrange:
+    with session_factory() as session:
+        relevance = Relevance(id="A", description="Beginner")
+        session.add_all(
+            Card(
+                word_type=WordType.NOUN,
+                relevance=relevance,
+                german=f"das Wort {i:03}",
+                italian=f"la parola {i:03}",
+            )
+            for i in range(300)
+        )
+        session.commit()
+
+    # act:
+    response = client.get(
+        "/cards?page_size=300",
+        headers={"accept": "text/html", "accept-encoding": "identity"},
+    )
+
+    # assert:
+    html = response.text
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "text/html; charset=utf-8"
+    assert "content-length" not in response.headers
+    assert "etag" in response.headers
+    assert "das Wort 000" in html
+    assert "das Wort 299" in html
+    assert html.rstrip().endswith("</html>")
+
+
+def test_answer_card_is_checked_and_recorded(client: TestClient, session_factory):
+    # arrange:
+    with session_factory() as session:
+        relevance = Relevance(id="A", description="Beginner")
+        session.add(
+            Card(
+                word_type=WordType.VERB,
+                relevance=relevance,
+                german="haben",
+                italian="avere",
+            )
+        )
+        session.commit()
+    buffer = AnswerBuffer()
+    app.dependency_overrides[get_answer_buffer] = lambda: buffer
+
+    # act:
+    right = client.post("/cards/1/answer", json={"guess": "avere"})
+    wrong = client.post(
+        "/cards/1/answer",
+        json={"solve_italian": False, "guess": "sein"},
+    )
+    missing = client.post("/cards/2/answer", json={"guess": "avere"})
+
+    # assert:
+    assert right.json() == {"correct": True, "solution": "avere"}
+    assert wrong.json() == {"correct": False, "solution": "haben"}
+    assert missing.status_code == 404
+    assert buffer.drain()[1].times_played == 2
+
+
+def test_study_next_returns_due_cards(client: TestClient, session_factory):
+    # arrange: new cards are due right away
+    with session_factory() as session:
+        relevance = Relevance(id="A", description="Beginner")
+        for german, italian in [("haben", "avere"), ("alt", "vecchio")]:
+            session.add(
+                Card(
+                    word_type=WordType.VERB,
+                    relevance=relevance,
+                    german=german,
+                    italian=italian,
+                )
+            )
+        session.commit()
+    buffer = AnswerBuffer()
+    app.dependency_overrides[get_answer_buffer] = lambda: buffer
+
+    # act & assert:
+    response = client.get("/study/next", params={"n": 20})
+    assert response.status_code == 200
+    assert [card["id"] for card in response.json()] == [1, 2]
+    assert response.json()[0]["box"] == 0
+
+    client.post("/cards/1/answer", json={"guess": "avere"})
+    response = client.get("/study/next")
+    assert [card["id"] for card in response.json()] == [2]
+
+    assert client.get("/study/next", params={"n": 0}).status_code == 422
@@ -0,0 +1,85 @@
+from fastapi.testclient import TestClient
+
+from app.metrics import CONTENT_TYPE, Histogram, route_of
+from core.domain.card import Card
+from core.domain.relevance import Relevance
+from core.domain.word_type import WordType
+
+
+def sample(metrics_text: str, name_and_labels: str) -> float:
+    """The value of a sample of the metrics, 0 if it doesn't exist (yet)."""
+    for line in metrics_text.splitlines():
+        if line.startswith(name_and_labels + " "):
+            return float(line.rsplit(" ", 1)[1])
+    return 0.0
+
+
+def test_metrics_record_latency_and_sql_statements_per_route(
+    client: TestClient, session_factory
+):
+    # arrange:
+    with session_factory() as session:
+        session.add(
+            Card(
+                word_type=WordType.VERB,
+                relevance=Relevance(id="A", description="Beginner"),
+                german="haben",
+                italian="avere",
+            )
+        )
+        session.commit()
+    route_labels = 'method="GET",route="/cards/{id_card}"'
+    before = client.get("/metrics").text
+
+    # act:
+    client.get("/cards/1")
+    client.get("/cards/1")
+    client.get("/cards/1000")
+    client.get("/no/such/route")
+    response = client.get("/metrics")
+
+    # assert:
+    after = response.text
+    assert response.status_code == 200
+    assert response.headers["content-type"] == CONTENT_TYPE
+
+    def increase(name_and_labels: str) -> float:
+        return sample(after, name_and_labels) - sample(before, name_and_labels)
+
+    duration = "http_request_duration_seconds"
+    assert increase(f'{duration}_count{{{route_labels},status="200"}}') == 2
+    assert increase(f'{duration}_count{{{route_labels},status="404"}}') == 1
+    assert increase(
+        f'{duration}_bucket{{{route_labels},status="200",le="+Inf"}}'
+    ) == 2
+    assert increase(
+        f'{duration}_count{{method="GET",route="<unmatched>",status="404"}}'
+    ) == 1
+    # the version of the card, the card and its tags (for a missing card only
+    # the version and the card):
+    assert increase(f"http_request_sql_statements_sum{{{route_labels}}}") == 8
+    assert increase(f"http_request_sql_statements_count{{{route_labels}}}") == 3
+    # (the scrape itself is in flight)
+    assert sample(after, "http_requests_in_flight") == 1
+    assert 'db_pool_checkouts_total{pool="local_db_unit_tests_async"}' in after
+
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = Histogram("latency", "Latency.", ("route",), (0.1, 1))
+    for value in (0.05, 0.1, 0.5, 3):
+        histogram.observe(("/cards",), value)
+
+    assert histogram.render() == [
+        "# HELP latency Latency.",
+        "# TYPE latency histogram",
+        'latency_bucket{route="/cards",le="0.1"} 2',
+        'latency_bucket{route="/cards",le="1"} 3',
+        'latency_bucket{route="/cards",le="+Inf"} 4',
+        'latency_sum{route="/cards"} 3.65',
+        'latency_count{route="/cards"} 4',
+    ]
+
+
+def test_static_files_are_recorded_with_their_mount():
+    assert route_of({"root_path": "/static", "app_root_path": ""}) == "/static"
+    assert route_of({"root_path": ""}) == "<unmatched>"
@@ -0,0 +1,140 @@
+import gzip
+import shutil
+
+from fastapi.testclient import TestClient
+
+from app.static_files import (
+    CACHE_IMMUTABLE,
+    CACHE_REVALIDATE,
+    PATH_STATIC,
+    FingerprintedStaticFiles,
+    static_files,
+)
+from core.domain.card import Card
+from core.domain.relevance import Relevance
+from core.domain.word_type import WordType
+
+
+def test_fingerprinted_static_url_is_immutable(client: TestClient):
+    # arrange:
+    url = static_files.url("css/style.css")
+
+    # act:
+    response = client.get(url)
+    unversioned_response = client.get("/static/css/style.css")
+    outdated_response = client.get("/static/css/style.0123456789.css")
+
+    # assert:
+    assert url != "/static/css/style.css"
+    assert response.status_code == 200
+    assert response.headers["cache-control"] == CACHE_IMMUTABLE
+    assert response.text == unversioned_response.text
+    assert unversioned_response.headers["cache-control"] == CACHE_REVALIDATE
+    assert outdated_response.status_code == 200
+    assert outdated_response.headers["cache-control"] == CACHE_REVALIDATE
+
+
+def test_cards_page_links_fingerprinted_static_files(client: TestClient):
+    response = client.get("/cards", headers={"accept": "text/html"})
+
+    assert static_files.url("css/style.css") in response.text
+    assert static_files.url("fonts/Inter-Regular.woff2") in response.text
+
+
+def test_precompressed_variant_is_served(tmp_path):
+    # arrange: a copy of the static files with a gzip-variant of the css
+    shutil.copytree(PATH_STATIC, tmp_path, dirs_exist_ok=True)
+    css = (tmp_path / "css" / "style.css").read_bytes()
+    (tmp_path / "css" / "style.css.gz").write_bytes(gzip.compress(css))
+    files = FingerprintedStaticFiles(directory=tmp_path)
+    client = TestClient(files)
+
+    # act:
+    response = client.get(
+        files.url("css/style.css").removeprefix("/static"),
+        headers={"accept-encoding": "gzip"},
+    )
+    plain_response = client.get(
+        "/css/style.css",
+        headers={"accept-encoding": "identity"},
+    )
+
+    # assert: (the client decodes the body)
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["content-type"].startswith("text/css")
+    assert response.headers["cache-control"] == CACHE_IMMUTABLE
+    assert response.content == css
+    assert "content-encoding" not in plain_response.headers
+    assert plain_response.content == css
+
+
+def test_large_responses_are_compressed(client: TestClient, session_factory):
+    # arrange:
+    with session_factory() as session:
+        relevance = Relevance(id="A", description="Beginner")
+        for i in range(50):
+            session.add(
+                Card(
+                    word_type=WordType.NOUN,
+                    relevance=relevance,
+                    german=f"Wort {i}",
+                    italian=f"parola {i}",
+                )
+            )
+        session.commit()
+
+    # act:
+    response = client.get("/cards", headers={"accept-encoding": "gzip"})
+    small_response = client.get("/cards/1", headers={"accept-encoding": "gzip"})
+    font_response = client.get(
+        "/static/fonts/Inter-Regular.woff2",
+        headers={"accept-encoding": "gzip"},
+    )
+    streamed_response = client.get(
+        "/cards/export",
+        headers={"accept-encoding": "gzip"},
+    )
+
+    # assert:
+    assert response.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert len(response.json()) == 50
+    assert "content-encoding" not in small_response.headers
+    assert "content-encoding" not in font_response.headers
+    assert streamed_response.headers["content-encoding"] == "gzip"
+    assert len(streamed_response.text.splitlines()) == 50
+
+
+def test_compressed_responses_have_weak_etags(client: TestClient, session_factory):
+    # arrange:
+    with session_factory() as session:
+        relevance = Relevance(id="A", description="Beginner")
+        for i in range(50):
+            session.add(
+                Card(
+                    word_type=WordType.NOUN,
+                    relevance=relevance,
+                    german=f"Wort {i}",
+                    italian=f"parola {i}",
+                )
+            )
+        session.commit()
+
+    # act:
+    plain_response = client.get("/cards", headers={"accept-encoding": "identity"})
+    gzip_response = client.get("/cards", headers={"accept-encoding": "gzip"})
+    not_modified_response = client.get(
+        "/cards",
+        headers={
+            "accept-encoding": "gzip",
+            "if-none-match": gzip_response.headers["etag"],
+        },
+    )
+
+    # assert: the identity-body keeps its strong ETag
+    strong_etag = plain_response.headers["etag"]
+    assert not strong_etag.startswith("W/")
+    assert gzip_response.headers["content-encoding"] == "gzip"
+    assert gzip_response.headers["etag"] == f"W/{strong_etag}"
+    assert not_modified_response.status_code == 304
+    assert not_modified_response.headers["etag"] == f"W/{strong_etag}"
@@ -1,4 +1,7 @@
-from sqlalchemy import text
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+from sqlalchemy import Engine, event, text
 from sqlalchemy.orm import Session
 
 
@@ -40,3 +43,20 @@ def select_all_tags(session: Session) -> list:
 def select_all_card_has_tag_associations(session: Session) -> list:
     stmt = text("SELECT id_card, id_tag FROM Card_has_Tag")
     return list(session.execute(stmt).all())
+
+
+@contextmanager
+def count_queries(engine: Engine) -> Iterator[list[str]]:
+    """
+    Collects the SQL-statements the engine executes within the with-block.
+    """
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, *args) -> None:
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
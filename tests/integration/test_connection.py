@@ -1,5 +1,8 @@
+import pytest
 from sqlalchemy import Engine, text
 
+import core.db as db
+
 
 def test_connection_can_persist_data_in_unit_test_db(unit_test_engine: Engine):
     """
@@ -114,3 +117,25 @@ def test_connection_does_not_persist_without_commit(unit_test_engine: Engine):
         result = connection_2.execute(stmt_select_cards).all()
 
         assert not result  # since not commited
+
+
+def test_engines_are_created_once_per_url():
+    engine = db._get_engine(url_key="local_db_unit_tests")
+    assert db._get_engine(url_key="local_db_unit_tests") is engine
+    assert db._get_engine(url_key="local_db_unit_tests", echo=True) is not engine
+    assert db._get_async_engine(url_key="local_db_unit_tests") is not engine
+
+
+def test_engines_with_nested_options_are_created_once():
+    engine = db._get_engine(url_key="local_db_unit_tests", connect_args={"timeout": 5})
+    assert (
+        db._get_engine(url_key="local_db_unit_tests", connect_args={"timeout": 5})
+        is engine
+    )
+    assert (
+        db._get_engine(url_key="local_db_unit_tests", connect_args={"timeout": 6})
+        is not engine
+    )
+    assert engine is not db._get_engine(url_key="local_db_unit_tests")
+    with pytest.raises(TypeError, match="not hashable"):
+        db._get_engine(url_key="local_db_unit_tests", connect_args={"x": bytearray()})
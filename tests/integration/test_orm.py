@@ -1,5 +1,5 @@
 from sqlalchemy import select
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 
 from core.domain.card import Card
 from core.domain.relevance import Relevance
@@ -141,7 +141,8 @@ def test_session_can_load_card_has_tag_association(session: Session):
     session.commit()
 
     # Act:
-    orm_stmt_select = select(Card)
+    # (relationships are never loaded implicitly, see core.db.orm)
+    orm_stmt_select = select(Card).options(selectinload(Card.tags))
     result = session.scalars(orm_stmt_select).all()
 
     # Assert:
@@ -0,0 +1,93 @@
+import pytest
+from sqlalchemy import QueuePool, create_engine, text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+import core.db as db
+from core.db.pool import (
+    PoolMetrics,
+    get_pool_settings,
+    instrument_pool,
+    timed_pool_class,
+)
+
+
+def test_pool_settings_are_read_from_environment(monkeypatch):
+    monkeypatch.setenv("DB_POOL_SIZE", "7")
+    monkeypatch.setenv("DB_POOL_SIZE_STAGE", "20")
+    monkeypatch.setenv("DB_POOL_PRE_PING", "true")
+    monkeypatch.setenv("DB_POOL_TIMEOUT_PRODUCTION", "2.5")
+
+    stage_settings = get_pool_settings("stage")
+    assert stage_settings.pool_size == 20  # target-specific value wins
+    assert stage_settings.pool_pre_ping is True
+    assert stage_settings.pool_recycle == 1800  # default of target stage
+
+    production_settings = get_pool_settings("production")
+    assert production_settings.pool_size == 7
+    assert production_settings.pool_timeout == 2.5
+
+
+def _get_instrumented_engine(metrics: PoolMetrics, **kwargs):
+    url_object = db.CONNECTION_URLS["local_db_unit_tests"]
+    engine = create_engine(
+        url_object,
+        poolclass=timed_pool_class(QueuePool, metrics),
+        **kwargs,
+    )
+    instrument_pool(engine, metrics)
+    return engine
+
+
+def test_pool_metrics_count_checkouts_and_checkins():
+    metrics = PoolMetrics("test")
+    engine = _get_instrumented_engine(metrics)
+
+    for _ in range(3):
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+
+    snapshot = metrics.snapshot()
+    assert snapshot["count_connects"] == 1  # connection is reused by the pool
+    assert snapshot["count_checkouts"] == 3
+    assert snapshot["count_checkins"] == 3
+    assert snapshot["checked_out"] == 0
+    assert snapshot["pool_size"] == 5
+
+
+def test_pool_metrics_record_waiting_and_timeouts():
+    metrics = PoolMetrics("test")
+    engine = _get_instrumented_engine(
+        metrics,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.1,
+    )
+
+    blocking_connection = engine.connect()
+    assert metrics.snapshot()["checked_out"] == 1
+
+    with pytest.raises(PoolTimeoutError):
+        engine.connect()
+
+    blocking_connection.close()
+
+    snapshot = metrics.snapshot()
+    assert snapshot["count_timeouts"] == 1
+    assert snapshot["wait_time_max"] >= 0.1
+    assert snapshot["checked_out"] == 0
+
+
+def test_pool_metrics_survive_recreation_of_pool():
+    metrics = PoolMetrics("test")
+    engine = _get_instrumented_engine(metrics)
+    with engine.connect():
+        pass
+
+    engine.dispose()  # creates a new pool-instance of the same class
+    with engine.connect():
+        pass
+
+    snapshot = metrics.snapshot()
+    assert snapshot["count_checkouts"] == 2
+    assert snapshot["count_connects"] == 2
+    assert snapshot["wait_time_total"] > 0
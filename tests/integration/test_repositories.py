@@ -1,9 +1,20 @@
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
-from core.domain.card_repository import DbCardRepository
+import pytest
+
+from core.domain.card_repository import (
+    DbCardRepository,
+    _page_after_stmt,
+    _tags_stmt,
+    card_count_cache,
+    strip_article,
+)
 from core.domain.card import Card
 from core.domain.relevance import Relevance
 from core.domain.word_type import WordType
+from core.services.unit_of_work import DbUnitOfWork
+from core.utils.pagination import Cursor
 import tests.integration.integration_utils as plain_sql_utils
 
 
@@ -93,3 +104,322 @@ def test_db_card_repo_can_save_card_with_tags(session: Session):
     expected_id_couples = [(1, 1), (1, 2)]
     for id_couple in result_associations:
         assert id_couple in expected_id_couples
+
+
+def _insert_cards_for_paging(session: Session):
+    germans = ["das Haus", "alt", "der Baum", "haben", "die Antwort", "Berg"]
+    card_records = [
+        {
+            "id": id,
+            "word_type": "NOUN",
+            "id_relevance": "A",
+            "german": german,
+            "italian": f"italiano {id}",
+        }
+        for id, german in enumerate(germans, start=1)
+    ]
+    plain_sql_utils.insert_cards(session=session, records=card_records)
+    session.commit()
+
+
+def test_db_card_repo_pages_through_cards_with_cursor(session: Session):
+    # Arrange:
+    _insert_cards_for_paging(session)
+    card_repo = DbCardRepository(session)
+
+    # Act:
+    pages = []
+    cursor = None
+    while True:
+        cards, cursor = card_repo.get_page_after(cursor=cursor, limit=4)
+        pages.append([card.german for card in cards])
+        if cursor is None:
+            break
+
+    # Assert:
+    # (sorted without articles, uppercase before lowercase as in the DB):
+    assert pages == [
+        ["die Antwort", "der Baum", "Berg", "das Haus"],
+        ["alt", "haben"],
+    ]
+
+
+def test_db_card_repo_seeks_cursor_via_index(session: Session):
+    # Arrange:
+    _insert_cards_for_paging(session)
+    stmt = _page_after_stmt(cursor=Cursor(sort_key="Baum", id=3), limit=2)
+    compiled = stmt.compile(session.get_bind())
+
+    # Act:
+    parameters = tuple(compiled.params[name] for name in compiled.positiontup)
+    plan = (
+        session.connection()
+        .exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}", parameters)
+        .all()
+    )
+
+    # Assert: a range-search on the index and no sorting of the whole table
+    details = " ".join(row[-1] for row in plan)
+    assert "ix_card_german_sort_id" in details
+    assert "TEMP B-TREE" not in details
+
+
+def test_db_sort_key_strips_articles_like_python(session: Session):
+    # Arrange:
+    germans = ["Der Hund", "DAS Auto", "die Tür", "dieser", "Das", "der  Baum"]
+    plain_sql_utils.insert_cards(
+        session=session,
+        records=[
+            {
+                "id": id,
+                "word_type": "NOUN",
+                "id_relevance": "A",
+                "german": german,
+                "italian": f"italiano {id}",
+            }
+            for id, german in enumerate(germans, start=1)
+        ],
+    )
+    session.commit()
+
+    # Act:
+    sort_keys = dict(session.execute(select(Card.german, Card.german_sort)).all())
+
+    # Assert: the fake repository and the trigram-index use strip_article
+    assert sort_keys == {german: strip_article(german) for german in germans}
+    assert sort_keys["Der Hund"] == "Hund"
+
+
+def _insert_cards_with_relations(session: Session, count_cards: int):
+    plain_sql_utils.insert_relevance_levels(
+        session=session,
+        records=[
+            {"id": "A", "description": "Beginner"},
+            {"id": "B", "description": "Intermediate"},
+        ],
+    )
+    plain_sql_utils.insert_tags(
+        session=session,
+        records=[{"id_tag": 1, "value": "Urlaub"}, {"id_tag": 2, "value": "Arbeit"}],
+    )
+    plain_sql_utils.insert_cards(
+        session=session,
+        records=[
+            {
+                "id": id,
+                "word_type": "NOUN",
+                "id_relevance": "A" if id % 2 else "B",
+                "german": f"Wort {id}",
+                "italian": f"parola {id}",
+            }
+            for id in range(1, count_cards + 1)
+        ],
+    )
+    plain_sql_utils.insert_associations(
+        session=session,
+        records=[{"id_card": id, "id_tag": 1 + id % 2} for id in range(1, 11)],
+    )
+    session.commit()
+
+
+@pytest.mark.parametrize("page_size", [5, 50])
+def test_db_card_repo_query_count_does_not_depend_on_page_size(
+    session: Session, page_size: int
+):
+    # Arrange:
+    _insert_cards_with_relations(session, count_cards=60)
+    card_repo = DbCardRepository(session)
+    engine = session.get_bind()
+
+    # Act & Assert: one query per list, the relevance is joined ...
+    with plain_sql_utils.count_queries(engine) as statements:
+        cards, has_more = card_repo.get_slice(skip=0, limit=page_size)
+        cards_after, _ = card_repo.get_page_after(cursor=None, limit=page_size)
+        relevances = {card.relevance.id for card in cards + cards_after}
+    assert len(cards) == page_size and has_more
+    assert relevances == {"A", "B"}
+    assert len(statements) == 2
+
+    # ... plus the count, as long as it isn't cached:
+    card_count_cache.invalidate()
+    with plain_sql_utils.count_queries(engine) as statements:
+        count, _ = card_repo.get_list(skip=0, limit=page_size)
+        card_repo.get_list(skip=page_size, limit=page_size)
+    assert count == 60
+    assert len(statements) == 3
+    session.expunge_all()
+
+    # ... and a second one for the tags of completely loaded cards:
+    with plain_sql_utils.count_queries(engine) as statements:
+        all_cards = card_repo.all()
+        count_tags = sum(len(card.tags) for card in all_cards)
+    assert count_tags == 10
+    assert len(statements) == 2
+
+
+def test_db_card_repo_filters_cards_by_tags(session: Session):
+    # Arrange: even cards are tagged "Urlaub", odd ones "Arbeit", 5 has both
+    _insert_cards_with_relations(session, count_cards=12)
+    plain_sql_utils.insert_associations(
+        session=session,
+        records=[{"id_card": 5, "id_tag": 1}],
+    )
+    session.commit()
+    repo = DbCardRepository(session=session)
+
+    def filter_by_tags(tags, match_all, skip=0, limit=100):
+        cards, has_next_page = repo.filter_by_tags(tags, match_all, skip, limit)
+        return [card.id for card in cards], has_next_page
+
+    # Act & Assert:
+    assert filter_by_tags(["Urlaub", "Arbeit"], match_all=True) == ([5], False)
+    assert filter_by_tags(["Urlaub", "Urlaub"], match_all=True) == (
+        [10, 2, 4, 5, 6, 8],
+        False,
+    )
+    assert filter_by_tags(["Urlaub", "Arbeit"], match_all=False, limit=4) == (
+        [1, 10, 2, 3],
+        True,
+    )
+    assert filter_by_tags(["Urlaub", "Reise"], match_all=True) == ([], False)
+    assert filter_by_tags(["Urlaub", "Reise"], match_all=False, skip=4) == (
+        [6, 8],
+        False,
+    )
+    assert filter_by_tags([], match_all=False) == ([], False)
+
+
+def test_db_card_repo_filters_tags_via_index(session: Session):
+    # Arrange:
+    stmt = _tags_stmt(["Urlaub", "Arbeit"], match_all=True, skip=0, limit=10)
+    compiled = stmt.compile(
+        session.get_bind(),
+        compile_kwargs={"render_postcompile": True},
+    )
+
+    # Act:
+    parameters = tuple(compiled.params[name] for name in compiled.positiontup)
+    plan = (
+        session.connection()
+        .exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}", parameters)
+        .all()
+    )
+
+    # Assert: the cards of a tag come from the index, not a scan of the table
+    details = " ".join(row[-1] for row in plan)
+    assert "ix_card_has_tag_id_tag_id_card" in details
+    assert "SCAN Card_has_Tag" not in details
+
+
+def test_db_card_repo_search_index_follows_writes(session: Session):
+    # Arrange:
+    plain_sql_utils.insert_cards(
+        session=session,
+        records=[
+            {
+                "id": 1,
+                "word_type": "NOUN",
+                "id_relevance": "A",
+                "german": "das Haus",
+                "italian": "la casa",
+            },
+            {
+                "id": 2,
+                "word_type": "NOUN",
+                "id_relevance": "A",
+                "german": "die Haustür",
+                "italian": "la porta di casa",
+            },
+            {
+                "id": 3,
+                "word_type": "NOUN",
+                "id_relevance": "A",
+                "german": "der Baum",
+                "italian": "l'albero",
+            },
+        ],
+    )
+    session.commit()
+    card_repo = DbCardRepository(session)
+
+    def search(query: str) -> list[int]:
+        cards, _ = card_repo.search(query=query)
+        return [card.id for card in cards]
+
+    # Act & Assert: prefixes of words in both languages, best match first ...
+    assert search("haus") == [1, 2]
+    assert search("casa") == [1, 2]
+    assert search("porta casa") == [2]
+    assert search("HAUSTUR") == [2]  # case and diacritics are ignored
+    assert search("*") == []  # no syntax of the full-text-search
+
+    # ... and the index is updated by the database itself:
+    card = card_repo.get(id=3)
+    assert card
+    card.german = "der Haushalt"
+    card_repo.delete(card_repo.get(id=1))
+    session.commit()
+    assert search("baum") == []
+    assert sorted(search("haus")) == [2, 3]
+
+
+def test_db_card_repo_search_pages_through_matches(session: Session):
+    # Arrange:
+    _insert_cards_with_relations(session, count_cards=30)
+    card_repo = DbCardRepository(session)
+
+    # Act:
+    first_page, has_more_after_first = card_repo.search("wort", skip=0, limit=20)
+    second_page, has_more_after_second = card_repo.search("wort", skip=20, limit=20)
+
+    # Assert:
+    assert len(first_page) == 20 and has_more_after_first
+    assert len(second_page) == 10 and not has_more_after_second
+    assert {card.id for card in first_page + second_page} == set(range(1, 31))
+
+
+def test_db_card_repo_fuzzy_search_follows_writes(session_factory):
+    # Arrange:
+    with session_factory() as session:
+        relevance = Relevance(id="A", description="Beginner")
+        for german, italian in [
+            ("die Antwort", "la risposta"),
+            ("die Frage", "la domanda"),
+        ]:
+            session.add(
+                Card(
+                    word_type=WordType.NOUN,
+                    relevance=relevance,
+                    german=german,
+                    italian=italian,
+                )
+            )
+        session.commit()
+    uow = DbUnitOfWork(session_factory)
+
+    def fuzzy_search(query: str) -> list[str]:
+        with uow:
+            return [card.german for card, _ in uow.cards.fuzzy_search(query)]
+
+    # Act & Assert: the index is built on the first lookup ...
+    assert fuzzy_search("Antwrot") == ["die Antwort"]
+    assert fuzzy_search("domada") == ["die Frage"]
+
+    # ... and then maintained by the commits of units of work:
+    with uow:
+        card = uow.cards.get(id=2)
+        assert card
+        card.italian = "la questione"
+        uow.cards.add(
+            Card(
+                word_type=WordType.VERB,
+                relevance=card.relevance,
+                german="antworten",
+                italian="rispondere",
+            )
+        )
+        uow.cards.delete(uow.cards.get(id=1))
+        uow.commit()
+    assert fuzzy_search("domada") == []
+    assert fuzzy_search("questone") == ["die Frage"]
+    assert fuzzy_search("antworen") == ["antworten"]
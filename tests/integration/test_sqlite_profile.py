@@ -0,0 +1,49 @@
+import pytest
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from core.db.sqlite_profile import (
+    PRODUCTION_PROFILE,
+    SqliteProfile,
+    apply_sqlite_profile,
+)
+
+
+def test_profile_is_applied_to_each_new_connection(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'profile.db'}")
+    apply_sqlite_profile(engine, PRODUCTION_PROFILE)
+
+    with engine.connect() as connection:
+        assert connection.scalar(text("PRAGMA journal_mode")) == "wal"
+        assert connection.scalar(text("PRAGMA synchronous")) == 1  # NORMAL
+        assert connection.scalar(text("PRAGMA cache_size")) == -64_000
+        assert connection.scalar(text("PRAGMA busy_timeout")) == 5_000
+        assert connection.scalar(text("PRAGMA temp_store")) == 2  # MEMORY
+        assert connection.scalar(text("PRAGMA mmap_size")) == 256 * 1024 * 1024
+
+
+def test_optimize_runs_on_checkin_once_interval_passed(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'profile.db'}")
+    apply_sqlite_profile(engine, SqliteProfile(optimize_interval=0))
+
+    executed = []
+
+    def trace(dbapi_connection, connection_record):
+        dbapi_connection.set_trace_callback(executed.append)
+
+    event.listen(engine, "connect", trace)
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+
+    assert "PRAGMA optimize" in executed
+
+
+@pytest.mark.anyio
+async def test_profile_works_for_async_engines(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'profile.db'}")
+    apply_sqlite_profile(engine.sync_engine, PRODUCTION_PROFILE)
+
+    async with engine.connect() as connection:
+        assert await connection.scalar(text("PRAGMA journal_mode")) == "wal"
+        assert await connection.scalar(text("PRAGMA busy_timeout")) == 5_000
+    await engine.dispose()
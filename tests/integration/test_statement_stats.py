@@ -0,0 +1,100 @@
+import logging
+
+import pytest
+from sqlalchemy import Engine, create_engine, text
+
+import core.db as db
+from core.db.statement_stats import (
+    get_slow_query_threshold,
+    instrument_statements,
+    parameter_shape,
+    track_statements,
+)
+from core.services.unit_of_work import DbUnitOfWork
+from core.domain.card import Card
+from core.domain.relevance import Relevance
+from core.domain.word_type import WordType
+
+
+def test_statements_are_recorded_in_all_open_scopes(unit_test_engine: Engine):
+    with unit_test_engine.connect() as connection:
+        connection.execute(text("SELECT 1"))  # (outside of any scope)
+        with track_statements() as outer:
+            connection.execute(text("SELECT 2"))
+            with track_statements() as inner:
+                connection.execute(text("SELECT 3"))
+                connection.execute(text("SELECT 4"))
+            connection.execute(text("SELECT 5"))
+
+    assert outer.count == 4
+    assert inner.count == 2
+    assert 0 < inner.total_time <= outer.total_time
+    assert [timed.statement for timed in inner.slowest] in (
+        ["SELECT 3", "SELECT 4"],
+        ["SELECT 4", "SELECT 3"],
+    )
+    seconds = [timed.seconds for timed in outer.slowest]
+    assert seconds == sorted(seconds, reverse=True)
+
+
+def test_uow_records_its_statements(session_factory):
+    with session_factory() as session:
+        session.add(
+            Card(
+                word_type=WordType.NOUN,
+                relevance=Relevance(id="A", description="Beginner"),
+                german="das Haus",
+                italian="la casa",
+            )
+        )
+        session.commit()
+    uow = DbUnitOfWork(session_factory, read_only=True)
+
+    with uow:
+        uow.cards.get(1)  # the card and its tags
+
+    assert uow.statements.count == 2
+    assert uow.statements.total_time > 0
+    assert str(uow.statements).startswith("2 statements in ")
+
+
+def test_slow_statements_are_logged_with_parameter_shapes(caplog):
+    engine = create_engine("sqlite://")
+    instrument_statements(engine, slow_query_threshold=0.0)  # all are "slow"
+
+    with caplog.at_level(logging.WARNING, logger="core.db.statement_stats"):
+        with engine.connect() as connection:
+            connection.execute(
+                text("SELECT :id, :name"), {"id": 1, "name": "personal data"}
+            )
+
+    (message,) = caplog.messages
+    assert message.startswith("slow statement (")
+    assert message.endswith("SELECT ?, ?, parameters: (int, str)")
+    assert "personal data" not in message
+
+
+def test_parameter_shapes():
+    assert parameter_shape(("a", "b", "c", 1)) == "(str x 3, int)"
+    assert parameter_shape({"id_1": 7}) == "{id_1: int}"
+    assert parameter_shape([(1, "a"), (2, "b")], executemany=True) == "2 x (int, str)"
+    assert parameter_shape(None) == "()"
+
+
+def test_slow_query_threshold_is_read_from_environment(monkeypatch):
+    monkeypatch.delenv("DB_SLOW_QUERY_MS", raising=False)
+    monkeypatch.delenv("DB_SLOW_QUERY_MS_STAGE", raising=False)
+    assert get_slow_query_threshold("stage") == pytest.approx(0.2)
+
+    monkeypatch.setenv("DB_SLOW_QUERY_MS", "50")
+    monkeypatch.setenv("DB_SLOW_QUERY_MS_STAGE", "0")
+    assert get_slow_query_threshold("production") == pytest.approx(0.05)
+    assert get_slow_query_threshold("stage") is None
+
+
+def test_echo_is_opt_in(monkeypatch):
+    monkeypatch.delenv("DB_ECHO", raising=False)
+    assert db._get_engine(url_key="in_memory_db_unit_tests").echo is False
+
+    monkeypatch.setenv("DB_ECHO", "true")
+    assert db._get_engine(url_key="in_memory_db_unit_tests").echo is True
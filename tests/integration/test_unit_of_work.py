@@ -1,10 +1,17 @@
 import pytest
-from sqlalchemy import select
-from sqlalchemy.orm import Session
+from sqlalchemy import URL, create_engine, select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session, selectinload, sessionmaker
 
-from core.services.unit_of_work import DbUnitOfWork
+from core.services.cards import async_crud
+from core.services.cards.crud import create_card_in_db
+from core.services.unit_of_work import AsyncDbUnitOfWork, DbUnitOfWork
 from core.domain.card import Card
+from core.domain.card_repository import card_count_cache
+from core.domain.relevance import Relevance
+from core.domain.relevance_repository import relevance_cache
 from core.domain.tag import Tag
+from core.domain.word_type import WordType
 import tests.integration.integration_utils as plain_sql_utils
 
 
@@ -42,7 +49,7 @@ def test_uow_can_get_card_and_add_tags_to_it(session_factory):
         uow.commit()
 
     # Assert:
-    stmt_card = select(Card).where(Card.id == 7)
+    stmt_card = select(Card).where(Card.id == 7).options(selectinload(Card.tags))
     card = session.scalar(stmt_card)
     assert card
     expected_card_tag_values = ["Sprache", "Test-Tag"]
@@ -89,7 +96,7 @@ def test_uow_rolls_back_uncommitted_work_by_default(session_factory):
         # no commit!
 
     # Assert:
-    stmt = select(Card).where(Card.id == 7)
+    stmt = select(Card).where(Card.id == 7).options(selectinload(Card.tags))
     card = session.scalar(stmt)
     assert card
     assert list(card.tags) == []
@@ -125,3 +132,228 @@ def test_uow_rolls_back_on_error(session_factory):
     stmt = select(Card)
     cards = new_session.scalars(stmt).all()
     assert cards == []
+
+
+@pytest.mark.anyio
+async def test_async_uow_rolls_back_uncommitted_work_by_default(
+    session_factory, async_session_factory
+):
+    # Arrange:
+    uow = AsyncDbUnitOfWork(async_session_factory)
+
+    # Act:
+    async with uow:
+        uow.tags.add(Tag(value="Tiere"))
+        await uow.session.flush()
+        # no commit!
+
+    # Assert:
+    session: Session = session_factory()
+    tags = session.scalars(select(Tag)).all()
+    assert tags == []
+
+
+def test_read_only_uow_reads_from_read_only_connection(
+    session_factory, unit_test_engine
+):
+    # Arrange:
+    session: Session = session_factory()
+    records = [
+        {
+            "id": 7,
+            "word_type": "NOUN",
+            "id_relevance": 1,
+            "german": "die Frage",
+            "italian": "la domanda",
+        },
+    ]
+    plain_sql_utils.insert_cards(session=session, records=records)
+    session.commit()
+
+    # same database-file, but opened read-only like "production_read":
+    read_url = URL.create(
+        drivername="sqlite",
+        database=f"file:{unit_test_engine.url.database}",
+        query={"mode": "ro", "uri": "true"},
+    )
+    read_engine = create_engine(read_url, isolation_level="AUTOCOMMIT")
+    uow = DbUnitOfWork(sessionmaker(bind=read_engine), read_only=True)
+
+    # Act & Assert:
+    with uow:
+        card = uow.cards.get(id=7)
+        assert card
+        assert card.german == "die Frage"
+
+        with pytest.raises(RuntimeError):
+            uow.commit()
+
+        uow.tags.add(Tag(value="Tiere"))
+        with pytest.raises(OperationalError):  # readonly database
+            uow.session.flush()
+
+
+def test_uow_writes_card_count_through_on_commit(session_factory):
+    # Arrange:
+    session: Session = session_factory()
+    session.add(Relevance(id="A", description="Beginner"))
+    plain_sql_utils.insert_cards(
+        session=session,
+        records=[
+            {
+                "id": 7,
+                "word_type": "NOUN",
+                "id_relevance": "A",
+                "german": "die Frage",
+                "italian": "la domanda",
+            },
+        ],
+    )
+    session.commit()
+
+    uow = DbUnitOfWork(session_factory)
+    with uow:
+        assert uow.cards.count() == 1  # counted once, then cached
+    assert card_count_cache.get() == 1
+
+    # Act & Assert: inserts adjust the cached count ...
+    with uow:
+        relevance = uow.relevance_levels.get_by_id("A")
+        uow.cards.add(
+            Card(
+                word_type=WordType.NOUN,
+                relevance=relevance,
+                german="die Antwort",
+                italian="la risposta",
+            )
+        )
+        uow.session.flush()  # changes of earlier flushes count as well
+        uow.cards.add(
+            Card(
+                word_type=WordType.VERB,
+                relevance=relevance,
+                german="haben",
+                italian="avere",
+            )
+        )
+        uow.commit()
+    assert card_count_cache.get() == 3
+
+    # ... a rollback doesn't change it ...
+    with uow:
+        uow.cards.add(
+            Card(
+                word_type=WordType.VERB,
+                relevance=uow.relevance_levels.get_by_id("A"),
+                german="sein",
+                italian="essere",
+            )
+        )
+        uow.session.flush()
+    assert card_count_cache.get() == 3
+
+    # ... and deletes invalidate it:
+    with uow:
+        card = uow.cards.get(id=7)
+        assert card
+        uow.cards.delete(card)
+        uow.commit()
+    assert card_count_cache.get() is None
+    with uow:
+        assert uow.cards.count() == 2
+
+
+def test_uow_reads_relevance_through_cache(session_factory, unit_test_engine):
+    # Arrange:
+    session: Session = session_factory()
+    session.add(Relevance(id="A", description="Beginner"))
+    session.commit()
+    relevance_cache.reset_stats()
+    uow = DbUnitOfWork(session_factory)
+
+    def create_card(german: str, italian: str) -> list[str]:
+        with plain_sql_utils.count_queries(unit_test_engine) as statements:
+            card = create_card_in_db(
+                word_type=WordType.NOUN,
+                relevance_id="A",
+                german=german,
+                italian=italian,
+                uow=uow,
+            )
+        assert card.relevance == Relevance(id="A", description="Beginner")
+        return statements
+
+    # Act:
+    statements_cold = create_card("die Frage", "la domanda")
+    statements_warm = create_card("die Antwort", "la risposta")
+
+    # Assert: the second write saves the query of the relevance
+    assert relevance_cache.stats()["hits"] == 1
+    assert relevance_cache.stats()["misses"] == 1
+    assert len(statements_warm) == len(statements_cold) - 1
+
+    # deleting the relevance invalidates its entry:
+    with uow:
+        relevance = uow.relevance_levels.get_by_id("A")
+        uow.relevance_levels.delete(relevance)
+        uow.session.flush()
+        assert uow.relevance_levels.get_by_id("A") is None
+
+
+def test_uow_invalidates_cached_relevance_only_after_commit(session_factory):
+    # Arrange:
+    session: Session = session_factory()
+    session.add(Relevance(id="A", description="Beginner"))
+    session.commit()
+    with DbUnitOfWork(session_factory) as uow:
+        uow.relevance_levels.get_by_id("A")
+    assert "A" in relevance_cache
+
+    # Act & Assert: a rolled back delete keeps the entry ...
+    with DbUnitOfWork(session_factory) as uow:
+        uow.relevance_levels.delete(uow.relevance_levels.get_by_id("A"))
+        uow.session.flush()
+        uow.rollback()
+    assert "A" in relevance_cache
+
+    # ... a reader before the commit of a delete can't bring the entry back:
+    with DbUnitOfWork(session_factory) as uow:
+        uow.relevance_levels.delete(uow.relevance_levels.get_by_id("A"))
+        uow.session.flush()
+        assert uow.relevance_levels.get_by_id("A") is None
+        with DbUnitOfWork(session_factory, read_only=True) as other_uow:
+            relevance_cache.invalidate("A")  # (e.g. expired)
+            assert other_uow.relevance_levels.get_by_id("A") is not None
+        uow.commit()
+    assert "A" not in relevance_cache
+
+
+@pytest.mark.anyio
+async def test_async_uow_reads_relevance_through_cache(
+    session_factory, async_session_factory
+):
+    # Arrange:
+    session: Session = session_factory()
+    session.add(Relevance(id="A", description="Beginner"))
+    session.commit()
+    relevance_cache.reset_stats()
+    uow = AsyncDbUnitOfWork(async_session_factory)
+
+    # Act:
+    for german, italian in [("die Frage", "la domanda"), ("sein", "essere")]:
+        card = await async_crud.create_card_in_db(
+            word_type=WordType.NOUN,
+            relevance_id="A",
+            german=german,
+            italian=italian,
+            uow=uow,
+        )
+
+    # Assert:
+    assert card.relevance.description == "Beginner"
+    assert relevance_cache.stats()["hits"] == 1
+    async with uow:
+        assert await uow.relevance_levels.get_existing_ids({"A", "B"}) == {"A"}
+    # (testing for entries is no lookup)
+    assert relevance_cache.stats()["hits"] == 1
+    assert relevance_cache.stats()["misses"] == 1
@@ -1,4 +1,4 @@
-from core.domain.card import Card
+from core.domain.card import BOX_INTERVALS, NEW_CARD_DUE_AT, Card
 from core.domain.relevance import Relevance
 from core.domain.word_type import WordType
 
@@ -48,6 +48,31 @@ def test_card_can_calculate_statistics_after_solving():
     assert card.last_played is not None
 
 
+def test_card_is_rescheduled_in_leitner_boxes():
+    card = Card(
+        word_type=WordType.NOUN,
+        relevance=Relevance(id="A", description="Beginner"),
+        german="die Antwort",
+        italian="la risposta",
+    )
+    assert (card.box, card.due_at) == (0, NEW_CARD_DUE_AT)
+
+    # each correct answer moves the card into the next box ...
+    for box in (1, 2, 3):
+        card.solve(solve_italian=True, guess="la risposta")
+        assert card.box == box
+        assert card.due_at == card.last_played + BOX_INTERVALS[box]
+    # ... a wrong answer back into the first one:
+    card.solve(solve_italian=True, guess="la domanda")
+    assert card.box == 1
+    assert card.due_at == card.last_played + BOX_INTERVALS[1]
+
+    # the last box is the last one:
+    for _ in range(len(BOX_INTERVALS) + 1):
+        card.solve(solve_italian=True, guess="la risposta")
+    assert card.box == len(BOX_INTERVALS) - 1
+
+
 def test_card_can_add_and_remove_tags():
     card = Card(
         word_type=WordType.NOUN,
@@ -0,0 +1,211 @@
+import pytest
+
+from core.domain.card import Card
+from core.domain.relevance import Relevance
+from core.domain.word_type import WordType
+from core.exceptions import DuplicateResourceError, ResourceNotFoundError
+from core.services.cards.async_crud import (
+    create_card_in_db,
+    delete_card_in_db,
+    read_cards_from_db,
+    update_card_in_db,
+)
+from core.services.cards.card_export import (
+    export_cards_as_csv,
+    export_cards_as_ndjson,
+)
+from core.services.cards.card_import import import_cards_in_db, iter_csv_rows
+from core.services.unit_of_work import AsyncDbUnitOfWork, FakeAsyncUnitOfWork
+from core.utils.streaming import iter_lines
+
+
+@pytest.mark.anyio
+async def test_new_card_can_be_added_async(session_factory, async_session_factory):
+    # insert relevance:
+    with session_factory() as session:
+        relevance = Relevance(id="A", description="Beginner")
+        session.add(relevance)
+        session.commit()
+
+    uow = AsyncDbUnitOfWork(session_factory=async_session_factory)
+    new_card = await create_card_in_db(
+        word_type=WordType.NOUN,
+        relevance_id="A",
+        german="das Haus",
+        italian="la casa",
+        uow=uow,
+    )
+    assert new_card.id == 1
+    assert new_card.relevance.description == "Beginner"  # detached, but loaded
+
+    async with uow:
+        all_cards = await uow.cards.all()
+        assert len(all_cards) == 1
+        assert all_cards[0].german == "das Haus"
+
+
+@pytest.mark.anyio
+async def test_duplicate_card_can_not_be_added_async(
+    session_factory, async_session_factory
+):
+    with session_factory() as session:
+        session.add(Relevance(id="A", description="Beginner"))
+        session.commit()
+
+    uow = AsyncDbUnitOfWork(session_factory=async_session_factory)
+    await create_card_in_db(
+        word_type=WordType.NOUN,
+        relevance_id="A",
+        german="das Haus",
+        italian="la casa",
+        uow=uow,
+    )
+    with pytest.raises(DuplicateResourceError):
+        await create_card_in_db(
+            word_type=WordType.NOUN,
+            relevance_id="A",
+            german="das Haus",
+            italian="la casa",
+            uow=uow,
+        )
+
+
+@pytest.mark.anyio
+async def test_cards_can_be_updated_listed_and_deleted_async(
+    session_factory, async_session_factory
+):
+    with session_factory() as session:
+        session.add(Relevance(id="A", description="Beginner"))
+        session.add(Relevance(id="B", description="Intermediate"))
+        session.commit()
+
+    uow = AsyncDbUnitOfWork(session_factory=async_session_factory)
+    card = await create_card_in_db(
+        word_type=WordType.ADJECTIVE,
+        relevance_id="A",
+        german="der Baum",
+        italian="l'albero",
+        uow=uow,
+    )
+
+    updated_card = await update_card_in_db(
+        id_card=card.id,
+        word_type=WordType.NOUN,
+        relevance_id="B",
+        german="der Baum",
+        italian="l'albero",
+        uow=uow,
+    )
+    assert updated_card.word_type == WordType.NOUN
+    assert updated_card.relevance.description == "Intermediate"
+
+    result = await read_cards_from_db(uow=uow, page=1, page_size=10)
+    assert result.count_records == 1
+    assert result.records[0].relevance.id == "B"
+
+    await delete_card_in_db(id_card=card.id, uow=uow)
+    with pytest.raises(ResourceNotFoundError):
+        await delete_card_in_db(id_card=card.id, uow=uow)
+
+
+@pytest.mark.anyio
+async def test_export_streams_cards_batch_by_batch(
+    session_factory, async_session_factory
+):
+    with session_factory() as session:
+        relevance = Relevance(id="A", description="Beginner")
+        for i in range(5):
+            session.add(
+                Card(
+                    word_type=WordType.NOUN,
+                    relevance=relevance,
+                    german=f"Wort {i}",
+                    italian=f"parola {i}",
+                )
+            )
+        session.commit()
+
+    uow = AsyncDbUnitOfWork(session_factory=async_session_factory, read_only=True)
+    chunks = [chunk async for chunk in export_cards_as_ndjson(uow, batch_size=2)]
+
+    assert [chunk.count("\n") for chunk in chunks] == [2, 2, 1]
+    assert '"german": "Wort 4"' in chunks[-1]
+
+
+@pytest.mark.anyio
+async def test_crud_with_fake_unit_of_work():
+    uow = FakeAsyncUnitOfWork()
+    uow.relevance_levels.add(Relevance(id="A", description="Beginner"))
+    uow.relevance_levels.add(Relevance(id="B", description="Intermediate"))
+
+    await create_card_in_db(
+        word_type=WordType.NOUN,
+        relevance_id="A",
+        german="der Baum",
+        italian="l'albero",
+        uow=uow,
+    )
+    with pytest.raises(DuplicateResourceError):
+        await create_card_in_db(
+            word_type=WordType.NOUN,
+            relevance_id="A",
+            german="der Baum",
+            italian="l'albero",
+            uow=uow,
+        )
+    with pytest.raises(ResourceNotFoundError):
+        await create_card_in_db(
+            word_type=WordType.NOUN,
+            relevance_id="X",
+            german="das Haus",
+            italian="la casa",
+            uow=uow,
+        )
+    (card,) = await uow.cards.all()
+    card.id = 4711
+
+    updated_card = await update_card_in_db(
+        id_card=4711,
+        word_type=WordType.NOUN,
+        relevance_id="B",
+        german="der Baum",
+        italian="l'albero",
+        uow=uow,
+    )
+    assert updated_card.relevance.description == "Intermediate"
+    assert uow.committed
+
+    await delete_card_in_db(id_card=4711, uow=uow)
+    assert await uow.cards.all() == []
+    with pytest.raises(ResourceNotFoundError):
+        await delete_card_in_db(id_card=4711, uow=uow)
+
+
+@pytest.mark.anyio
+async def test_import_and_export_with_fake_unit_of_work():
+    uow = FakeAsyncUnitOfWork()
+    uow.relevance_levels.add(Relevance(id="A", description="Beginner"))
+    data = (
+        "word_type,relevance_id,german,italian\n"
+        "VERB,A,haben,avere\n"
+        "NOUN,B,das Haus,la casa\n"
+        "NOUN,A,das Haus,la casa\n"
+        "VERB,A,haben,avere\n"
+    )
+
+    async def chunks():
+        yield data.encode()
+
+    result = await import_cards_in_db(iter_csv_rows(iter_lines(chunks())), uow=uow)
+    exported = [chunk async for chunk in export_cards_as_csv(uow, batch_size=1)]
+
+    assert result.count_imported == 2
+    assert [(error.line, error.error) for error in result.errors] == [
+        (3, "Relevance with ID B not found."),
+        (5, "Identical Card already exists."),
+    ]
+    assert exported == [
+        "word_type,relevance_id,german,italian\n",
+        "NOUN,A,das Haus,la casa\n",
+        "VERB,A,haben,avere\n",
+    ]
@@ -0,0 +1,178 @@
+import asyncio
+import datetime
+
+import pytest
+
+from core.domain.card import Card, CardAnswers
+from core.domain.relevance import Relevance
+from core.domain.word_type import WordType
+from core.exceptions import ResourceNotFoundError
+from core.services.cards.card_answers import (
+    AnswerBuffer,
+    AnswerWriter,
+    answer_card,
+    write_answers_to_db,
+)
+from core.services.unit_of_work import AsyncDbUnitOfWork, DbUnitOfWork
+
+
+def _insert_cards(session_factory) -> None:
+    with session_factory() as session:
+        relevance = Relevance(id="A", description="Beginner")
+        for german, italian in [("haben", "avere"), ("alt", "vecchio")]:
+            session.add(
+                Card(
+                    word_type=WordType.VERB,
+                    relevance=relevance,
+                    german=german,
+                    italian=italian,
+                )
+            )
+        session.commit()
+
+
+def _answer(correct: bool, played_at: datetime.datetime) -> CardAnswers:
+    box = 2 if correct else 1
+    return CardAnswers(1, int(correct), correct, played_at, box, played_at)
+
+
+def test_answer_buffer_combines_answers_per_card():
+    buffer = AnswerBuffer(max_pending=2)
+    full = []
+    buffer.on_full = lambda: full.append(len(buffer))
+    first = datetime.datetime(2026, 1, 1, 12, 0)
+    second = first + datetime.timedelta(minutes=1)
+    third = second + datetime.timedelta(minutes=1)
+
+    buffer.add(1, _answer(True, first))
+    buffer.add(1, _answer(False, second))
+    assert full == []
+    buffer.add(2, _answer(True, first))
+    assert full == [2]
+    assert buffer.ids_not_due(now=first) == [1]
+
+    answers = buffer.drain()
+    assert len(buffer) == 0
+    assert answers[1] == CardAnswers(2, 1, False, second, 1, second)
+    assert answers[2] == CardAnswers(1, 1, True, first, 2, first)
+
+    # answers that couldn't be written are combined with newer ones:
+    buffer.add(1, _answer(True, third))
+    buffer.put_back(answers)
+    assert buffer.get(1) == CardAnswers(3, 2, True, third, 2, third)
+
+    # a buffer that is over-full after a put_back stays full:
+    buffer.add(3, _answer(True, third))
+    assert len(buffer) == 3
+    assert full == [2, 3]
+
+
+@pytest.mark.anyio
+async def test_answers_are_written_in_one_batch(
+    session_factory, async_session_factory
+):
+    _insert_cards(session_factory)
+    with DbUnitOfWork(session_factory=session_factory) as uow:
+        deck_version = uow.cards.get_deck_version()
+    buffer = AnswerBuffer()
+
+    # act: answering only reads the cards ...
+    for id_card, guess in [(1, "avere"), (1, "essere"), (2, "vecchio")]:
+        read_uow = AsyncDbUnitOfWork(
+            session_factory=async_session_factory,
+            read_only=True,
+        )
+        await answer_card(
+            id_card=id_card,
+            solve_italian=True,
+            guess=guess,
+            uow=read_uow,
+            buffer=buffer,
+        )
+    with DbUnitOfWork(session_factory=session_factory) as uow:
+        assert uow.cards.get(id=1).times_played == 0
+
+    # ... until the buffer is written:
+    uow = AsyncDbUnitOfWork(session_factory=async_session_factory)
+    assert await write_answers_to_db(uow=uow, buffer=buffer) == 2
+    assert await write_answers_to_db(uow=uow, buffer=buffer) == 0
+
+    with DbUnitOfWork(session_factory=session_factory) as uow:
+        card_1 = uow.cards.get(id=1)
+        card_2 = uow.cards.get(id=2)
+        assert (card_1.times_played, card_1.correct_answers) == (2, 1)
+        assert card_1.last_answer_correct is False
+        assert card_1.last_played is not None
+        assert (card_2.times_played, card_2.correct_answers) == (1, 1)
+        assert card_2.last_answer_correct is True
+        # the statistics are no content, cached pages of the deck stay valid:
+        assert uow.cards.get_deck_version() == deck_version
+        assert uow.cards.get_version(id=1).version == 1
+
+
+@pytest.mark.anyio
+async def test_answers_of_several_processes_add_up(
+    session_factory, async_session_factory
+):
+    _insert_cards(session_factory)
+    first = datetime.datetime(2026, 1, 1, 12, 0)
+    second = first + datetime.timedelta(minutes=1)
+
+    # act: the later answer is written first
+    for answers in (
+        CardAnswers(2, 2, True, second, 2, second),
+        CardAnswers(1, 0, False, first, 1, first),
+    ):
+        uow = AsyncDbUnitOfWork(session_factory=async_session_factory)
+        async with uow:
+            await uow.cards.add_answers({1: answers, 3: answers})  # (no card 3)
+            await uow.commit()
+
+    with DbUnitOfWork(session_factory=session_factory) as uow:
+        card = uow.cards.get(id=1)
+        assert (card.times_played, card.correct_answers) == (3, 2)
+        assert (card.last_answer_correct, card.last_played) == (True, second)
+        assert (card.box, card.due_at) == (2, second)
+
+
+@pytest.mark.anyio
+async def test_answer_to_unknown_card_raises(async_session_factory):
+    uow = AsyncDbUnitOfWork(session_factory=async_session_factory, read_only=True)
+    buffer = AnswerBuffer()
+    with pytest.raises(ResourceNotFoundError):
+        await answer_card(
+            id_card=1,
+            solve_italian=True,
+            guess="avere",
+            uow=uow,
+            buffer=buffer,
+        )
+    assert len(buffer) == 0
+
+
+@pytest.mark.anyio
+async def test_answer_writer_writes_once_the_buffer_is_full(
+    session_factory, async_session_factory
+):
+    _insert_cards(session_factory)
+    buffer = AnswerBuffer(max_pending=2)
+    writer = AnswerWriter(
+        lambda: AsyncDbUnitOfWork(session_factory=async_session_factory),
+        buffer=buffer,
+        interval=60,
+    )
+    played_at = datetime.datetime(2026, 1, 1, 12, 0)
+    writer.start()
+
+    buffer.add(1, _answer(True, played_at))
+    await asyncio.sleep(0.05)
+    assert len(buffer) == 1  # (the interval isn't over)
+    buffer.add(2, _answer(True, played_at))
+    await asyncio.sleep(0.05)
+    assert len(buffer) == 0
+    buffer.add(1, _answer(False, played_at))
+    await writer.stop()  # writes the rest
+
+    with DbUnitOfWork(session_factory=session_factory) as uow:
+        assert uow.cards.get(id=1).times_played == 2
+        assert uow.cards.get(id=2).times_played == 1
@@ -0,0 +1,38 @@
+import pytest
+
+from core.services.cards.card_import import iter_csv_rows
+from core.utils.streaming import iter_lines
+
+
+async def _chunked(data: bytes, size: int):
+    for start in range(0, len(data), size):
+        yield data[start : start + size]
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("chunk_size", [1, 3, 1024])
+async def test_csv_rows_do_not_depend_on_chunk_boundaries(chunk_size: int):
+    data = (
+        "﻿word_type,relevance_id,german,italian\r\n"
+        "NOUN,A,die Tür,la porta\r\n"
+        'ADJECTIVE,A,schön,"bello,\r\nbella"\r\n'
+        "VERB,A,lügen"
+    ).encode()
+
+    rows = [
+        row
+        async for row in iter_csv_rows(iter_lines(_chunked(data, chunk_size)))
+    ]
+
+    assert [(row.line, row.error) for row in rows] == [
+        (2, None),
+        (3, None),
+        (5, "Expected 4 values, got 3."),
+    ]
+    assert rows[0].record == {
+        "word_type": "NOUN",
+        "relevance_id": "A",
+        "german": "die Tür",
+        "italian": "la porta",
+    }
+    assert rows[1].record["italian"] == "bello,\nbella"
@@ -8,9 +8,13 @@ from core.exceptions import DuplicateResourceError, ResourceNotFoundError
 from core.services.cards.crud import (
     create_card_in_db,
     delete_card_in_db,
+    read_cards_after_cursor_from_db,
+    read_cards_from_db,
+    search_cards_in_db,
     update_card_in_db,
 )
 from core.services.unit_of_work import FakeUnitOfWork, DbUnitOfWork
+from core.utils.pagination import Cursor
 
 
 def test_new_card_can_be_added(session_factory):
@@ -182,3 +186,91 @@ def test_missing_card_can_not_be_deleted():
         assert len(cards) == 1
         result_card = cards[0]
         assert result_card.id == 4711
+
+
+def test_cards_can_be_read_page_by_page_with_cursor():
+    uow = FakeUnitOfWork()
+    relevance = Relevance(id="A", description="Beginner")
+    germans = ["das Haus", "alt", "der Baum", "haben", "die Antwort"]
+    for id, german in enumerate(germans, start=1):
+        uow.cards.add(
+            Card(
+                id=id,
+                word_type=WordType.NOUN,
+                relevance=relevance,
+                german=german,
+                italian=f"italiano {id}",
+            )
+        )
+
+    first_page = read_cards_after_cursor_from_db(uow=uow, page_size=2)
+    assert [card.german for card in first_page.records] == [
+        "die Antwort",
+        "der Baum",
+    ]
+    assert first_page.has_next_page
+
+    second_page = read_cards_after_cursor_from_db(
+        uow=uow,
+        cursor=Cursor.decode(first_page.next_cursor),
+        page_size=2,
+    )
+    assert [card.german for card in second_page.records] == ["das Haus", "alt"]
+
+    last_page = read_cards_after_cursor_from_db(
+        uow=uow,
+        cursor=Cursor.decode(second_page.next_cursor),
+        page_size=2,
+    )
+    assert [card.german for card in last_page.records] == ["haben"]
+    assert not last_page.has_next_page
+
+
+def test_cards_can_be_read_page_by_page_without_count():
+    uow = FakeUnitOfWork()
+    relevance = Relevance(id="A", description="Beginner")
+    germans = ["das Haus", "alt", "der Baum"]
+    for id, german in enumerate(germans, start=1):
+        uow.cards.add(
+            Card(
+                id=id,
+                word_type=WordType.NOUN,
+                relevance=relevance,
+                german=german,
+                italian=f"italiano {id}",
+            )
+        )
+
+    first_page = read_cards_from_db(uow=uow, page=1, page_size=2, with_count=False)
+    # sorted like the database without articles (and binary: upper case first)
+    assert [card.german for card in first_page.records] == ["der Baum", "das Haus"]
+    assert first_page.count_records is None
+    assert first_page.has_next_page
+
+    last_page = read_cards_from_db(uow=uow, page=2, page_size=2, with_count=False)
+    assert [card.german for card in last_page.records] == ["alt"]
+    assert not last_page.has_next_page
+    assert last_page.has_previous_page
+
+
+def test_cards_can_be_searched():
+    uow = FakeUnitOfWork()
+    relevance = Relevance(id="A", description="Beginner")
+    for id, (german, italian) in enumerate(
+        [("das Haus", "la casa"), ("der Baum", "l'albero"), ("haben", "avere")],
+        start=1,
+    ):
+        uow.cards.add(
+            Card(
+                id=id,
+                word_type=WordType.NOUN,
+                relevance=relevance,
+                german=german,
+                italian=italian,
+            )
+        )
+
+    result = search_cards_in_db(query="ha", uow=uow)
+    assert [card.german for card in result.records] == ["das Haus", "haben"]
+    assert not result.has_next_page
+    assert search_cards_in_db(query="  ", uow=uow).records == []
@@ -0,0 +1,96 @@
+import datetime
+
+import pytest
+from sqlalchemy import update
+
+from core.db.tables import card_table
+from core.domain.card import Card, CardAnswers
+from core.domain.card_repository import _due_stmt
+from core.domain.relevance import Relevance
+from core.domain.word_type import WordType
+from core.services.cards.card_answers import AnswerBuffer, answer_card
+from core.services.cards.study import read_next_cards_to_study
+from core.services.unit_of_work import AsyncDbUnitOfWork
+
+NOW = datetime.datetime(2026, 1, 1, 12, 0)
+
+
+def _insert_cards_with_due_dates(session_factory) -> None:
+    # card i is due i hours from now (in the past for negative i):
+    hours_due = {1: 5, 2: -1, 3: -30, 4: 0, 5: -2}
+    with session_factory() as session:
+        relevance = Relevance(id="A", description="Beginner")
+        for id, hours in hours_due.items():
+            session.add(
+                Card(
+                    word_type=WordType.NOUN,
+                    relevance=relevance,
+                    german=f"das Wort {id}",
+                    italian=f"la parola {id}",
+                )
+            )
+        session.flush()
+        for id, hours in hours_due.items():
+            session.execute(
+                update(card_table)
+                .where(card_table.c.id == id)
+                .values(due_at=NOW + datetime.timedelta(hours=hours), box=1)
+            )
+        session.commit()
+
+
+@pytest.mark.anyio
+async def test_next_cards_are_the_ones_due_the_longest(
+    session_factory, async_session_factory
+):
+    _insert_cards_with_due_dates(session_factory)
+
+    def read_uow():
+        return AsyncDbUnitOfWork(session_factory=async_session_factory, read_only=True)
+
+    # act & assert: only due cards, the ones due the longest first
+    async def next_ids(n: int, buffer: AnswerBuffer) -> list[int]:
+        cards = await read_next_cards_to_study(
+            n=n, uow=read_uow(), buffer=buffer, now=NOW
+        )
+        return [card.id for card in cards]
+
+    buffer = AnswerBuffer()
+    assert await next_ids(20, buffer) == [3, 5, 2, 4]
+    assert await next_ids(2, buffer) == [3, 5]
+
+    # ... an answered card isn't offered again, even before it is written:
+    buffer.add(3, CardAnswers(1, 1, True, NOW, 2, NOW + datetime.timedelta(days=2)))
+    assert await next_ids(2, buffer) == [5, 2]
+
+    # ... and a card that is answered again moves on from its pending box:
+    await answer_card(
+        id_card=3,
+        solve_italian=True,
+        guess="la parola 3",
+        uow=read_uow(),
+        buffer=buffer,
+    )
+    assert buffer.get(3).box == 3
+    assert buffer.get(3).times_played == 2
+
+
+def test_due_cards_are_read_from_the_index(session_factory):
+    _insert_cards_with_due_dates(session_factory)
+    stmt = _due_stmt(now=NOW, limit=20, exclude_ids=[1, 2])
+
+    with session_factory() as session:
+        compiled = stmt.compile(
+            session.get_bind(),
+            compile_kwargs={"literal_binds": True},
+        )
+        plan = (
+            session.connection()
+            .exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}")
+            .all()
+        )
+
+    # a range-search on the index and no sorting of the whole table:
+    details = " ".join(row[-1] for row in plan)
+    assert "ix_card_due_at_id" in details
+    assert "TEMP B-TREE" not in details
@@ -0,0 +1,44 @@
+import time
+
+from core.utils.caching import LruCache
+
+
+def test_lru_cache_evicts_least_recently_used_entry():
+    cache = LruCache(maxsize=2, ttl=60)
+    cache.set("A", "Beginner")
+    cache.set("B", "Intermediate")
+    assert cache.get("A") == "Beginner"  # now "B" is the least recently used
+
+    cache.set("C", "Professional")
+
+    assert cache.get("B") is None
+    assert cache.get("A") == "Beginner"
+    assert cache.get("C") == "Professional"
+    assert cache.stats() == {"hits": 3, "misses": 1, "size": 2}
+
+
+def test_lru_cache_entries_expire_and_can_be_invalidated():
+    cache = LruCache(maxsize=10, ttl=0.01)
+    cache.set("A", "Beginner")
+    time.sleep(0.02)
+    assert cache.get("A") is None
+
+    cache.ttl = 60
+    cache.set("A", "Beginner")
+    cache.set("B", "Intermediate")
+    cache.invalidate("A")
+    assert cache.get("A") is None
+    assert cache.get("B") == "Intermediate"
+    cache.invalidate()
+    assert cache.get("B") is None
+
+
+def test_lru_cache_membership_is_not_counted():
+    cache = LruCache(maxsize=10, ttl=0.01)
+    cache.set("A", "Beginner")
+
+    assert "A" in cache
+    assert "B" not in cache
+    time.sleep(0.02)
+    assert "A" not in cache
+    assert cache.stats() == {"hits": 0, "misses": 0, "size": 1}
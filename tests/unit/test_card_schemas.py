@@ -0,0 +1,34 @@
+import json
+
+from pydantic import TypeAdapter
+
+import app.schemas.card as card_schemas
+from core.domain.card import Card
+from core.domain.relevance import Relevance
+from core.domain.word_type import WordType
+
+
+def test_dump_cards_json_matches_response_model():
+    beginner = Relevance(id="A", description="Beginner")
+    cards = [
+        Card(WordType.NOUN, beginner, "die Straße", "la strada", id=1),
+        Card(WordType.VERB, beginner, "gehen", "andare", id=2),
+        Card(WordType.ADJECTIVE, Relevance(id="B"), "schön", "bello", id=3),
+    ]
+    adapter = TypeAdapter(list[card_schemas.PydCardResponse])
+    expected = adapter.dump_json(
+        adapter.validate_python(
+            [card_schemas.convert_to_pydantic(card).model_dump() for card in cards]
+        )
+    )
+
+    dumped = card_schemas.dump_cards_json(cards)
+
+    assert dumped == expected
+    assert json.loads(dumped)[2] == {
+        "word_type": "ADJECTIVE",
+        "relevance": {"id": "B", "description": ""},
+        "german": "schön",
+        "italian": "bello",
+    }
+    assert card_schemas.dump_cards_json([]) == b"[]"
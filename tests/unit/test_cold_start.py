@@ -0,0 +1,59 @@
+"""
+Keeps the cold start of the web-app measurable: importing app.main must not
+touch the database, and the import-time has a budget. Both are checked in a
+fresh interpreter, since the test-session itself has imported everything
+already.
+"""
+
+import os
+from pathlib import Path
+import subprocess
+import sys
+
+# generous on purpose (CI-runners are slow), it shall catch regressions like
+# creating engines or importing drivers at import-time, not measure noise:
+IMPORT_TIME_BUDGET_MS = int(os.environ.get("IMPORT_TIME_BUDGET_MS", 3000))
+
+PATH_ROOT = Path(__file__).parents[2]
+
+
+def _run_python(
+    code: str,
+    *options: str,
+    **environ: str,
+) -> subprocess.CompletedProcess:
+    env = dict(os.environ, PYTHONPATH=str(PATH_ROOT / "src"), **environ)
+    return subprocess.run(
+        [sys.executable, *options, "-c", code],
+        cwd=PATH_ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def test_importing_app_has_no_database_side_effects():
+    # (USE_DB is only read once the app starts, so not even an invalid value
+    # fails the import)
+    result = _run_python(
+        "import sys\n"
+        "import app.main\n"
+        "import core.db as db\n"
+        "print(len(db._engines), 'aiosqlite' in sys.modules, "
+        "'core.db.orm' in sys.modules, db.get_use_db.cache_info().currsize)",
+        USE_DB="bogus",
+    )
+    assert result.stdout.split() == ["0", "False", "False", "0"]
+
+
+def test_import_time_of_app_stays_within_budget():
+    result = _run_python("import app.main", "-X", "importtime")
+
+    # the last line of "-X importtime" is the top-level import of app.main:
+    # "import time: <self [us]> | <cumulative [us]> | app.main"
+    last_line = result.stderr.strip().splitlines()[-1]
+    assert last_line.endswith("app.main")
+    cumulative_ms = int(last_line.split("|")[1]) / 1000
+
+    assert cumulative_ms < IMPORT_TIME_BUDGET_MS
@@ -0,0 +1,85 @@
+import logging
+
+import pytest
+
+from core.domain.card import Card
+from core.domain.relevance import Relevance
+from core.domain.word_type import WordType
+import core.utils.logging_utils as logging_utils
+from core.utils.pagination import PaginationResult
+
+
+class CountingRepr:
+    def __init__(self) -> None:
+        self.count_repr = 0
+
+    def __repr__(self) -> str:
+        self.count_repr += 1
+        return "CountingRepr()"
+
+
+def _read_page(argument, count_cards: int) -> PaginationResult:
+    relevance = Relevance(id="A", description="Beginner")
+    records = [
+        Card(WordType.NOUN, relevance, f"das Wort {i}", f"la parola {i}", id=i)
+        for i in range(count_cards)
+    ]
+    return PaginationResult.build(records, count_cards, count_cards, 1)
+
+
+def test_log_method_abbreviates_large_return_values(caplog):
+    read_page = logging_utils.log_method(_read_page)
+
+    with caplog.at_level(logging.INFO, logger="method_logger"):
+        result = read_page(CountingRepr(), count_cards=1000)
+
+    call_message, result_message = caplog.messages
+    assert len(result.records) == 1000
+    assert call_message == (
+        "Calling method: _read_page, arguments: (CountingRepr(),), "
+        "keyword arguments: {'count_cards': 1000}"
+    )
+    assert "das Wort 2" in result_message
+    assert "das Wort 3" not in result_message
+    assert "count_records=1000" in result_message
+    assert len(result_message) < 1000
+
+
+def test_log_method_formats_nothing_if_info_is_disabled(caplog):
+    read_page = logging_utils.log_method(_read_page)
+    argument = CountingRepr()
+
+    with caplog.at_level(logging.WARNING, logger="method_logger"):
+        read_page(argument, count_cards=10)
+
+    assert caplog.messages == []
+    assert argument.count_repr == 0
+
+
+@pytest.mark.anyio
+async def test_log_method_logs_awaited_result(caplog):
+    async def read_number() -> int:
+        return 42
+
+    with caplog.at_level(logging.INFO, logger="method_logger"):
+        assert await logging_utils.log_method(read_number)() == 42
+
+    assert caplog.messages[-1] == "Return value of read_number: 42"
+
+
+def test_log_in_background_passes_records_to_handlers():
+    logger = logging.getLogger("test_log_in_background")
+    logger.propagate = False
+    records = []
+    handler = logging.Handler()
+    handler.emit = records.append
+    logger.addHandler(handler)
+
+    listener = logging_utils.log_in_background(logger)
+    logger.warning("written by %s", "the listener")
+    listener.stop()
+
+    assert handler not in logger.handlers
+    assert [record.getMessage() for record in records] == [
+        "written by the listener"
+    ]
@@ -0,0 +1,36 @@
+import pytest
+from starlette.requests import Request
+
+import app.templates as app_templates
+from core.domain.word_type import WordType
+from core.utils.pagination import PaginationResult
+
+
+@pytest.mark.anyio
+async def test_stream_template_sends_page_in_chunks():
+    cards = [
+        {"id": i, "word_type": WordType.NOUN, "german": f"Wort {i}", "italian": ""}
+        for i in range(500)
+    ]
+    request = Request({"type": "http", "method": "GET", "path": "/cards"})
+    response = app_templates.stream_template(
+        request=request,
+        name="cards/cards.html",
+        context={
+            "pagination_result": PaginationResult.build_without_count(
+                records=cards, page_size=500, current_page=1, has_next_page=False
+            ),
+            "last_search": "",
+            "last_tags": [],
+            "last_tag_mode": "all",
+        },
+    )
+
+    chunks = [chunk async for chunk in response.body_iterator]
+
+    assert len(chunks) > 1
+    assert all(
+        len(chunk) >= app_templates.STREAM_CHUNK_SIZE for chunk in chunks[:-1]
+    )
+    assert "<title>Cards</title>" in chunks[0]
+    assert "Wort 499" in "".join(chunks)
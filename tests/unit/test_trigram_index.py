@@ -0,0 +1,38 @@
+import pytest
+
+from core.utils.trigram_index import TrigramIndex, similarity, trigrams
+
+
+def test_trigrams_are_padded_per_word_like_pg_trgm():
+    assert trigrams("Cat") == {"  c", " ca", "cat", "at "}
+    assert trigrams("a, b") == {"  a", " a ", "  b", " b "}
+    assert similarity("Haus", "haus") == 1.0
+    assert similarity("Haus", "Baum") == 0.0
+
+
+def test_index_finds_the_most_similar_texts():
+    index = TrigramIndex()
+    index.begin_build()
+    index.finish_build([(1, "die Antwort"), (2, "die Frage"), (3, "antworten")])
+
+    matches = index.search("Antwrt", limit=10, threshold=0.3)
+
+    assert [key for key, _ in matches] == [1, 3]
+    assert matches[0][1] == pytest.approx(similarity("Antwrt", "die Antwort"))
+    assert index.search("Antwrt", limit=1, threshold=0.3) == matches[:1]
+    assert index.search("xyz", limit=10, threshold=0.3) == []
+
+
+def test_changes_during_a_build_are_not_lost():
+    index = TrigramIndex()
+    index.begin_build()
+    # a commit while the texts are still being read from the database:
+    index.apply({1: "das Boot", 2: None})
+    index.finish_build([(1, "das Haus"), (2, "der Baum")])
+
+    assert [key for key, _ in index.search("Boot", limit=10, threshold=0.3)] == [1]
+    assert index.search("Haus", limit=10, threshold=0.3) == []
+    assert index.search("Baum", limit=10, threshold=0.3) == []
+
+    index.apply({2: "der Bauch"})
+    assert [key for key, _ in index.search("Bauch", limit=10, threshold=0.3)] == [2]